@@ -21,14 +21,10 @@ thread_id = assistant.user_chat_swap_Thread()
 
 
 
-#check for messages in the thread
-history = assistant.list_thread_history()
-#message_user(f"History: {history}")
-if history is not None:
-    for message in reversed(history):
+#show the messages in the thread, read from the local message store
+if thread_id is not None:
+    for data in assistant.get_thread_messages(thread_id):
         assistant.message_user("------------")
-        data = assistant.retrieve_message(thread_id=thread_id, message_id=message)
-        #data.content[0].text.value
         assistant.message_user(f"{data.role}: {data.content[0].text.value}")
 
 
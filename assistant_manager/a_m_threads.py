@@ -1,5 +1,6 @@
 from assistant_manager.assistant_manager_update import Assistant_manager_update
-from assistant_manager.utils.file_operations import save_json, read_json
+from assistant_manager.utils.thread_cursor import ThreadCursor
+from assistant_manager.utils.thread_registry import ThreadRegistry
 import logging
 
 class OAI_Threads(Assistant_manager_update):
@@ -18,6 +19,8 @@ class OAI_Threads(Assistant_manager_update):
             None
         """
         super().__init__(api_key=api_key, organization=organization, timeout=timeout, log_level=log_level)
+        # Thread names and IDs, imports thread_ids.json on first use
+        self.thread_registry = ThreadRegistry()
 
 
     def list_threads(self):
@@ -34,19 +37,35 @@ class OAI_Threads(Assistant_manager_update):
     
     def list_thread_history(self):
         """
-        Returns a list of messages in the current thread.
+        Returns the IDs of the messages seen in the current thread.
 
         Args:
             None
 
         Returns:
-            list: A list of messages.
+            list: A list of message IDs, oldest first, or None if none were seen.
         """
-        if self.chat_ids == []:
+        seen = self.get_thread_cursor(self.current_thread).list_seen()
+        if seen == []:
             self.logger.debug(f"No messages in thread {self.current_thread}")
             return None
         else:
-            return self.chat_ids
+            return seen
+
+    def get_thread_cursor(self, thread_id):
+        """
+        Returns the cursor tracking the messages seen on a thread, creating it on first use.
+
+        Args:
+            thread_id (str): The ID of the thread.
+
+        Returns:
+            ThreadCursor: The cursor of the thread.
+        """
+        cursor = self.thread_cursors.get(thread_id)
+        if cursor is None:
+            cursor = self.thread_cursors.setdefault(thread_id, ThreadCursor())
+        return cursor
     
     
     
@@ -60,17 +79,63 @@ class OAI_Threads(Assistant_manager_update):
         Returns:
             None
         """
-        #get the thread history
-        thread_history = self.list_messages(thread_id=thread_id)
+        #get the thread history, only messages we haven't stored yet come from the API
+        messages = self.get_thread_messages(thread_id)
         #save the thread history to the current thread history
-        self.current_thread_history = thread_history
-        #SyncCursorPage
-        #get the list of messages
-        messages = thread_history.data
-        #loop through the messages and add them to the chat_ids list
-        for message in messages:
-            self.chat_ids.append(message.id)
+        self.current_thread_history = messages
+        #everything in the history has been seen, move the cursor past it
+        self.get_thread_cursor(thread_id).take_unseen(messages)
         self.logger.debug(f"Prepared thread history for thread {thread_id}")
+
+    def sync_thread_messages(self, thread_id):
+        """
+        Pulls the messages added to a thread since the last sync into the local message store.
+
+        Args:
+            thread_id (str): The ID of the thread to sync.
+
+        Returns:
+            list: The new messages, oldest first.
+        """
+        new_messages = self.message_store.sync(thread_id, self.list_messages)
+        self.logger.debug(f"Synced {len(new_messages)} new messages for thread {thread_id}")
+        return new_messages
+
+    def fetch_new_messages(self, thread_id, run_id=None):
+        """
+        Returns the messages added to a thread that have not been seen yet, and marks them seen.
+        The store is synced first, then read after the cursor, so messages another manager or
+        get_thread_messages already stored are still returned. A cursor that has not moved yet
+        starts from what the store held before this sync, not from the start of the thread.
+
+        Args:
+            thread_id (str): The ID of the thread.
+            run_id (str): If given, only the unseen messages of this run are returned.
+
+        Returns:
+            list: The unseen messages, oldest first.
+        """
+        cursor = self.get_thread_cursor(thread_id)
+        start = cursor.cursor if cursor.cursor is not None else self.message_store.get_high_water(thread_id)
+        self.sync_thread_messages(thread_id)
+        unseen = cursor.take_unseen(self.message_store.get_messages_after(thread_id, start))
+        if run_id is not None:
+            unseen = [message for message in unseen if message.run_id == run_id]
+        return unseen
+
+    def get_thread_messages(self, thread_id, limit=None):
+        """
+        Returns the messages of a thread, oldest first, served from the local message store.
+
+        Args:
+            thread_id (str): The ID of the thread.
+            limit (int): If given, only the newest `limit` messages are returned.
+
+        Returns:
+            list: The messages of the thread.
+        """
+        self.sync_thread_messages(thread_id)
+        return self.message_store.get_messages(thread_id, limit=limit)
          
     def create_blank_thread(self):
         """
@@ -86,9 +151,7 @@ class OAI_Threads(Assistant_manager_update):
         blank_thread = self.create_thread()
         #get the thread ID
         thread_id = blank_thread.id
-        #add the thread to the list of threads
-        self.threads[thread_id] = "Blank Thread"
-        #save the thread ID to the thread_ids.json file
+        #save the thread ID to the thread registry
         self.add_thread("Blank Thread", thread_id)
         self.current_thread = thread_id
         #return the thread ID
@@ -107,16 +170,12 @@ class OAI_Threads(Assistant_manager_update):
         """
         # A compact function that checks if the thread name or ID is None and handles it
         if thread_name is not None:
-            #if the thread name is not None, get the thread ID from the thread_ids.json file
-            threads = self.get_threads()
+            #if the thread name is not None, get the thread ID from the thread registry
+            registered_id = self.get_thread_id(thread_name)
 
-            if thread_name in threads:
-                thread_id = threads[thread_name]
-                #if we have seen this thread before, get the thread history
-                self.prepare_thread_history(thread_id)
-                self.current_thread = thread_id
+            if registered_id is not None:
+                thread_id = registered_id
                 self.logger.debug(f"Thread {thread_name} found. Changing thread...")
-                return thread_id
 
             else:
                 self.logger.debug(f"Thread {thread_name} not found. Creating new thread...")
@@ -124,29 +183,18 @@ class OAI_Threads(Assistant_manager_update):
                 new_thread = self.create_thread()
                 #get the thread ID
                 thread_id = new_thread.id
-                #add the thread to the list of threads
-                # Define thread_id before assigning a thread name to it
-                #print(f"Thread ID: {thread_id}")
-                #print(f"Thread Name: {thread_name}")
-                #save the thread ID to the thread_ids.json file
+                #save the thread ID to the thread registry
                 self.add_thread(thread_name, thread_id)
-                self.current_thread = thread_id
-        
-            #get the thread history
+
+            #get the thread history, once per switch
             self.prepare_thread_history(thread_id)
             self.current_thread = thread_id
             self.logger.debug(f"Changed thread to {thread_id}")
             return thread_id
         elif thread_id is not None:
-            #if the thread ID is not None, get the thread name from the thread_ids.json file
+            #if the thread ID is not None, get the thread name from the thread registry
             print(f"Trying to change thread to ID {thread_id}")
-            threads = self.get_threads()
-            #Object with key as thread name and value as thread ID
-            thread_name = None
-            for key, value in threads.items():
-                 if value == thread_id:
-                    thread_name = key
-                    break
+            thread_name = self.get_thread_name(thread_id)
 
             if thread_name is not None:
                 #if we have seen this thread before, get the thread history
@@ -163,43 +211,53 @@ class OAI_Threads(Assistant_manager_update):
 
     def get_threads(self):
         """
-        Returns a list of threads.
+        Returns every registered thread. This reads the whole registry, prefer get_thread_id,
+        get_thread_name or search_threads.
 
         Args:
             None
 
         Returns:
-            list: A list of threads.
+            dict: Thread names and their IDs.
         """
         if self.threads is not None:
             return self.threads
-        else:
-             #attempt to read the thread_ids.json file
-            thread_ids = read_json('assistant_manager/thread_ids.json')
-            #if the file is empty, return an empty dict
-            if thread_ids is None:
-                return {}
-            else:
-                #if the file is not empty, return the dict
-                return thread_ids
+        return self.thread_registry.get_all()
+
+    def get_thread_id(self, thread_name):
+        """
+        Returns the ID of the thread registered under a name, or None.
+        """
+        return self.thread_registry.get_id(thread_name)
+
+    def get_thread_name(self, thread_id):
+        """
+        Returns the name a thread ID is registered under, or None if it is not registered.
+        """
+        return self.thread_registry.get_name(thread_id)
+
+    def search_threads(self, prefix="", limit=20):
+        """
+        Returns registered threads whose name starts with a prefix.
+
+        Args:
+            prefix (str): The start of the thread name, empty returns the most recently registered threads.
+            limit (int): The most threads to return.
+
+        Returns:
+            list: (name, thread_id) pairs.
+        """
+        return self.thread_registry.search(prefix, limit=limit)
 
     def add_thread(self, thread_name, thread_id):
         """
-        Adds a thread to the list of threads json file
+        Adds a thread to the thread registry, replacing any thread registered under the same name
 
         Args:
             thread_name (str): The name of the thread to add.
             thread_id (str): The ID of the thread to add.
         """
-
-        # Read the existing data from the file
-        data = read_json('assistant_manager/thread_ids.json')
-
-        # Add the new entry to the data
-        data[thread_name] = thread_id
-
-        # Write the updated data back to the file
-        save_json('assistant_manager/thread_ids.json', data)
+        self.thread_registry.add(thread_name, thread_id)
 
 
     
@@ -216,6 +274,6 @@ class OAI_Threads(Assistant_manager_update):
             thread_id = self.change_thread(thread_name="Default_Thread")
 
 
+        # change_thread already prepared the history
         self.current_thread = thread_id
-        self.prepare_thread_history(thread_id=thread_id)
         return thread_id
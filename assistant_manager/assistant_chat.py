@@ -2,6 +2,7 @@ import inspect
 import time
 from assistant_manager.runs_manager import Run_Manager
 from assistant_manager.assistant_tools import Tooling
+from assistant_manager.utils.tool_catalog import make_function_tool
 
 import logging
 import json
@@ -37,37 +38,11 @@ class AssistantChat(Run_Manager, Tooling):
         print(choices)
         #Collect the information about the selection. int has been returned which we need to use to grab the correct dict item
         tools_list = []
-        correct_info = [{
-            "type": "function",
-            "function": {}
-        }]
-        tool_metadata = None
-        #metadata = {}
-        #tools is a dict and choices is a int, we need to grab the correct item via the int
-        #grab the item from the dict in a way that uses the int. We need to convert the dict to a list first
         for choice in choices:
-            #grab the correct info from the list
-            tool_name = choice["tool_name"]
-            tool_required = choice["tool_required"]
-            tool_description = choice["tool_description"]
-            tool_properties = choice["tool_properties"]
-            if autogen:
-                tool_meta_description = choice["tool_meta_description"]
-                tool_metadata = self.make_autogen_tool_metadata(tool_name=tool_name, tool_required=tool_required, tool_description=tool_description, tool_properties=tool_properties, tool_meta_description=tool_meta_description)
-            else:
-                tool_metadata = self.make_tool_metadata(tool_name=tool_name, tool_required=tool_required, tool_description=tool_description, tool_properties=tool_properties)
-            # add the tool to the metadata dict
-
-            if tool_metadata is not None:
-                correct_info = {
-                "type": "function",
-                "function": tool_metadata
-                }
-                #add the tool to the tools list
-                tools_list.append(correct_info)
-            else:
-                self.message_user("Tool not added, there was an error with the metadata")
-            
+            #add the tool to the tools list, rendered the same way for autogen and assistants
+            #so enable_tools and the fleet reconciler see the same tools as unchanged
+            tools_list.append(make_function_tool(choice))
+
         #Check if the user wants to enable the tools
         self.message_user("Are you sure you want to enable these tools? (Y/N)")
         choice = self.get_multiple_choice_input(["Y", "N"])
@@ -85,7 +60,7 @@ class AssistantChat(Run_Manager, Tooling):
         
         
 
-    def main_run(self, assistant_id,thread_id):
+    def main_run(self, assistant_id,thread_id, stream=False):
         while True:
             check_updates = self.check_update_assistant()
             #
@@ -128,8 +103,8 @@ class AssistantChat(Run_Manager, Tooling):
 
             ThreadMessage = self.create_message(thread_id=thread_id, role="user", content=message)
             user_message_id = ThreadMessage.id
-            self.chat_ids.append(user_message_id)
-            self.perform_run(thread_id, None)
+            self.get_thread_cursor(thread_id).mark_seen(user_message_id)
+            self.perform_run(thread_id, None, stream=stream)
 
             
     
@@ -154,31 +129,25 @@ class AssistantChat(Run_Manager, Tooling):
             return thread_id
         # If the user selected Multiple Choice, Provide a list of threads and ask the user to select one
         elif selected == "Multiple Choice (Save Locally)":
-            #load the threads in teh json file
-            with open('assistant_manager/thread_ids.json') as json_file:
-                data = json.load(json_file)
-                local_threads = []
-                for thread_name, thread_id in data.items():
-                    local_threads.append(thread_name)
-
-                selected = self.get_multiple_choice_input(local_threads)
-                thread_id = data.get(selected)
-                if thread_id is None:
-                    self.message_user(f"No thread found with name {selected}")
-                    return
-
-                thread_id = self.setup_thread(input_thread_id=thread_id)
-
-                #check for messages in the thread
-                history = self.list_thread_history()
-                #message_user(f"History: {history}")
-                if history is not None:
-                    for message in reversed(history):
-                        self.message_user("------------")
-                        data = self.retrieve_message(thread_id=thread_id, message_id=message)
-                        #data.content[0].text.value
-                        self.message_user(f"{data.role}: {data.content[0].text.value}")
-                return thread_id
+            #narrow the saved threads down by the start of their name
+            self.message_user("Please enter the start of the thread name, or nothing for the most recent threads")
+            prefix = self.get_user_input()
+            matches = self.search_threads(prefix)
+            if not matches:
+                self.message_user(f"No thread found starting with {prefix}")
+                return
+
+            local_threads = [thread_name for thread_name, thread_id in matches]
+            selected = self.get_multiple_choice_input(local_threads)
+            thread_id = dict(matches)[selected]
+
+            thread_id = self.setup_thread(input_thread_id=thread_id)
+
+            #show the messages in the thread, read from the local message store
+            for data in self.get_thread_messages(thread_id):
+                self.message_user("------------")
+                self.message_user(f"{data.role}: {data.content[0].text.value}")
+            return thread_id
             
     def setup_assistant_chat(self):
         """
@@ -192,11 +161,10 @@ class AssistantChat(Run_Manager, Tooling):
         """
         # Lets start by getting the list of assistants
         assistants = self.assistants
-        # Print list in a readable format it is a SyncCursorPage
         #message_user('List of assistants:')
         #message_user(f"{assistants}")
         local_assistants = []
-        for i, assistant in enumerate(assistants.data):
+        for i, assistant in enumerate(assistants):
             local_assistants.append(assistant.name)
 
         # Lets ask the user to select an assistant
@@ -206,7 +174,7 @@ class AssistantChat(Run_Manager, Tooling):
         self.message_user("Lets begin the chat")
 
         # Lets grab the assistant ID
-        assistant_id = assistants.data[local_assistants.index(selected)].id
+        assistant_id = assistants[local_assistants.index(selected)].id
         self.assistant_id = assistant_id
         self.message_user(f"Assistant ID: {assistant_id}")
 
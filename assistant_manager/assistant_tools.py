@@ -1,5 +1,7 @@
 from assistant_manager.a_m_threads import OAI_Threads
 from assistant_manager.utils.file_operations import save_json, read_json
+from assistant_manager.utils.tool_catalog import get_tool_catalog, make_function_metadata, make_function_tool
+from assistant_manager.fleet import field_hash
 import json
 import logging
 
@@ -18,18 +20,19 @@ class Tooling(OAI_Threads):
             None
         """
         super().__init__(api_key=api_key, organization=organization, timeout=timeout, log_level=log_level)
+        # Shared cache of the tool metadata files, reloaded only when they change
+        self.tool_catalog = get_tool_catalog()
 
     def get_tool_by_name(self, tool_name):
         """
         Returns a tool object by name
         """
-        tools = self.load_tool_metadata()
         self.logger.info(f"Getting tool by name: {tool_name}")
-        for tool in tools:
-            if tool["tool_name"] == tool_name:
-                self.logger.debug(f"Tool found: {tool}")
-                return tool
-        
+        tool = self.tool_catalog.get_tool(tool_name)
+        if tool is not None:
+            self.logger.debug(f"Tool found: {tool}")
+            return tool
+
         self.logger.error(f"Tool not found: {tool_name}")
         return None
 
@@ -39,7 +42,7 @@ class Tooling(OAI_Threads):
         """
         assistants = self.assistants
         assistant_dict = {}
-        for i, assistant in enumerate(assistants.data):
+        for i, assistant in enumerate(assistants):
             assistant_dict[assistant.name] = assistant.id
         self.logger.debug(f"Listing Assistant names: {assistant_dict}")
         return assistant_dict
@@ -48,21 +51,8 @@ class Tooling(OAI_Threads):
         """
         returns a list of the tool names
         """
-        tools = self.load_tool_metadata()
-        tool_names = []
-
-        #tools is a dict of named dicts, we need to grab the name from each dict
-        #"list_system_tools": {
-        #    "tool_name": "list_system_tools",
-        #    "tool_required": "",
-        #    "tool_description": "Provides a list of all available system tool names",
-        #    "tool_properties": {},
-        #    "tool_meta_description": "Returns a list of all available tool names."
-        #}
+        tool_names = self.tool_catalog.get_tool_names()
 
-        for tool in tools:
-            tool_names.append(tool.get("tool_name"))
-        
         self.logger.debug(f"Listing System Tool names: {tool_names}")
 
         return tool_names
@@ -77,26 +67,16 @@ class Tooling(OAI_Threads):
         Returns:
             dict: A dict of tool metadata.
         """
-        #attempt to read the functions_metadata.json file
-        tool_metadata_dict0 = read_json('assistant_manager/functions/static/default_functions_metadata.json')
-        #print(tool_metadata_dict0)
-        #print("------")
-        tool_metadata_dict1 = read_json('assistant_manager/functions/dynamic/functions_metadata.json')
-        #print(tool_metadata_dict1)
-        # Merge the two dicts into a new dict
-        tool_metadata = {**tool_metadata_dict0, **tool_metadata_dict1}
-        
-
+        # The catalog only re-reads the metadata files when one of them changed
+        tool_metadata = self.tool_catalog.get_metadata()
 
         #if the file is empty, return an empty dict
-        if tool_metadata is None:
+        if not tool_metadata:
             self.logger.error("No tool metadata found assistant_tools.py")
             return {}
         else:
-            #if the file is not empty, return the dict
             self.tool_metadata = tool_metadata
-            self.logger.info("Tool metadata loaded")
-            self.logger.debug(f"Tool metadata: {tool_metadata}")
+            self.logger.debug("Tool metadata loaded")
             return self.tool_metadata
 
     def save_tool_metadata(self, tool_name, tool_required, tool_description, tool_schema):
@@ -143,15 +123,7 @@ class Tooling(OAI_Threads):
             None
         """
         # Define the metadata for the tool
-        metadata = {
-                "name": tool_name,
-                "description": tool_description,
-                "parameters": {
-                    "type": "object",
-                    "properties": tool_properties,
-                    "required": [tool_required]
-                }
-        }
+        metadata = make_function_metadata(tool_name, tool_required, tool_description, tool_properties)
         self.logger.info(f"Metadata for tool {tool_name} created")
         self.logger.debug(f"Metadata for tool {tool_name}: {metadata}")
         # Return the metadata
@@ -173,7 +145,13 @@ class Tooling(OAI_Threads):
         #enable the tools
         self.logger.info(f"Enabling tools for assistant {assistant_id}")
         self.logger.debug(f"Tools to enable: {tools_list}")
-        assistant = self.modify_assistant(assistant_id=assistant_id, tools=tools_list, )
+        # Fetched directly, a stale catalog entry could skip a write that is needed
+        assistant = self.retrieve_assistant(assistant_id)
+        if field_hash("tools", assistant.tools) == field_hash("tools", tools_list):
+            # Already has exactly these tools, nothing to write
+            self.logger.info(f"Assistant {assistant_id} already has these tools")
+        else:
+            assistant = self.modify_assistant(assistant_id=assistant_id, tools=tools_list, )
         #save the assistant to the current assistant
         self.current_assistant = assistant
         self.assistant_id = assistant.id
@@ -185,28 +163,11 @@ class Tooling(OAI_Threads):
         """
         Returns a list of tools from the tool names
         """
-        tools = []
         tools_list = []
         for tool_name in tool_names:
             tool = self.get_tool_by_name(tool_name)
-            tools.append(tool)
-
-        for selected_tool in tools:
-            #grab the correct info from the list
-            tool_name = selected_tool["tool_name"]
-            tool_required = selected_tool["tool_required"]
-            tool_description = selected_tool["tool_description"]
-            tool_properties = selected_tool["tool_properties"]
-            tool_meta_description = selected_tool["tool_meta_description"]
-            tool_metadata = self.make_autogen_tool_metadata(tool_name=tool_name, tool_required=tool_required, tool_description=tool_description, tool_properties=tool_properties, tool_meta_description=tool_meta_description)
-
-            if tool_metadata is not None:
-                correct_info = {
-                "type": "function",
-                "function": tool_metadata
-                }
-                #add the tool to the tools list
-                tools_list.append(correct_info)
+            if tool is not None:
+                #add the tool to the tools list, rendered like every other catalog tool
+                tools_list.append(make_function_tool(tool))
 
-        
         return tools_list
\ No newline at end of file
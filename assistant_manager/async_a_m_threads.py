@@ -0,0 +1,199 @@
+import asyncio
+import inspect
+import logging
+from assistant_manager.async_oai_base import AsyncOAI_Base
+from assistant_manager.assistant_manager_update import Assistant_manager_update
+from assistant_manager.a_m_threads import OAI_Threads
+from assistant_manager.utils.thread_registry import ThreadRegistry
+
+#
+# Async counterpart of a_m_threads.py.
+# The in-memory bookkeeping (cursors, the update queue) is shared with the sync classes.
+# The thread registry lookups are the sync methods too, but run in a worker thread so their
+# SQLite reads and writes never block the event loop.
+#
+
+
+class AsyncOAI_Threads(AsyncOAI_Base):
+
+    def __init__(self, api_key, organization, timeout=None, log_level=logging.INFO):
+        """
+        Initializes an instance of AsyncAssistantManager.
+
+        Args:
+            api_key (str): The OpenAI API key.
+            organization (str): The OpenAI organization ID.
+            timeout (Optional[int]): The timeout for API requests, in seconds.
+            log_level (Optional[int]): The logging level to use.
+
+        Returns:
+            None
+        """
+        super().__init__(api_key=api_key, organization=organization, timeout=timeout, log_level=log_level)
+        self.thread_registry = ThreadRegistry()
+
+    # In-memory bookkeeping shared with OAI_Threads
+    list_threads = OAI_Threads.list_threads
+    list_thread_history = OAI_Threads.list_thread_history
+    get_thread_cursor = OAI_Threads.get_thread_cursor
+
+    # Update queue shared with Assistant_manager_update
+    swap_assistant = Assistant_manager_update.swap_assistant
+    change_assistant = Assistant_manager_update.change_assistant
+    queue_update = Assistant_manager_update.queue_update
+    get_update_queue = Assistant_manager_update.get_update_queue
+
+    async def get_threads(self):
+        """
+        Returns every registered thread, see OAI_Threads.get_threads.
+        """
+        return await asyncio.to_thread(OAI_Threads.get_threads, self)
+
+    async def get_thread_id(self, thread_name):
+        """
+        Returns the ID of the thread registered under a name, or None.
+        """
+        return await asyncio.to_thread(OAI_Threads.get_thread_id, self, thread_name)
+
+    async def get_thread_name(self, thread_id):
+        """
+        Returns the name a thread ID is registered under, or None if it is not registered.
+        """
+        return await asyncio.to_thread(OAI_Threads.get_thread_name, self, thread_id)
+
+    async def search_threads(self, prefix="", limit=20):
+        """
+        Returns registered threads whose name starts with a prefix, see OAI_Threads.search_threads.
+        """
+        return await asyncio.to_thread(OAI_Threads.search_threads, self, prefix, limit)
+
+    async def add_thread(self, thread_name, thread_id):
+        """
+        Adds a thread to the thread registry, replacing any thread registered under the same name.
+        """
+        await asyncio.to_thread(OAI_Threads.add_thread, self, thread_name, thread_id)
+
+    async def check_update_assistant(self):
+        """
+        Runs the queued updates. Coroutine functions are awaited, others run in a worker thread.
+
+        Returns:
+            dict: Function name to output, or None if nothing was queued.
+        """
+        if len(self.update_queue) == 0:
+            return None
+        output_results = {}
+        for function_name, kwargs in self.update_queue:
+            function = getattr(self, function_name)
+            if inspect.iscoroutinefunction(function):
+                function_output = await function(**kwargs)
+            else:
+                function_output = await asyncio.to_thread(function, **kwargs)
+            output_results[function_name] = function_output
+            self.logger.debug(f"Function: {function_name} | Output: {function_output}")
+        self.update_queue = []
+        return output_results
+
+    async def prepare_thread_history(self, thread_id):
+        """
+        Prepares the thread history for the current thread.
+
+        Args:
+            thread_id (str): The ID of the thread to prepare the history for.
+
+        Returns:
+            None
+        """
+        self.current_thread_history = await self.fetch_new_messages(thread_id)
+        self.logger.debug(f"Prepared thread history for thread {thread_id}")
+
+    async def fetch_new_messages(self, thread_id, run_id=None):
+        """
+        Returns the messages added to a thread that have not been seen yet, and marks them seen.
+
+        Args:
+            thread_id (str): The ID of the thread.
+            run_id (str): If given, only the unseen messages of this run are returned.
+
+        Returns:
+            list: The unseen messages, oldest first.
+        """
+        cursor = self.get_thread_cursor(thread_id)
+        messages = [message async for message in self.iter_messages(thread_id, after=cursor.cursor)]
+        unseen = cursor.take_unseen(messages)
+        if run_id is not None:
+            unseen = [message for message in unseen if message.run_id == run_id]
+        return unseen
+
+    async def create_blank_thread(self):
+        """
+        Creates a blank thread.
+
+        Returns:
+            str: The ID of the blank thread.
+        """
+        blank_thread = await self.create_thread()
+        thread_id = blank_thread.id
+        await self.add_thread("Blank Thread", thread_id)
+        self.current_thread = thread_id
+        return thread_id
+
+    async def change_thread(self, thread_name: str or None = None, thread_id: str or None = None):
+        """
+        Changes the current thread.
+
+        Args:
+            thread_name (str): The name of the thread to change to.
+            thread_id (str): The ID of the thread to change to.
+
+        Returns:
+            str: thread_id if the thread was changed successfully, None otherwise.
+        """
+        if thread_name is not None:
+            registered_id = await self.get_thread_id(thread_name)
+
+            if registered_id is not None:
+                thread_id = registered_id
+                self.logger.debug(f"Thread {thread_name} found. Changing thread...")
+            else:
+                self.logger.debug(f"Thread {thread_name} not found. Creating new thread...")
+                new_thread = await self.create_thread()
+                thread_id = new_thread.id
+                await self.add_thread(thread_name, thread_id)
+
+            await self.prepare_thread_history(thread_id)
+            self.current_thread = thread_id
+            self.logger.debug(f"Changed thread to {thread_id}")
+            return thread_id
+        elif thread_id is not None:
+            thread_name = await self.get_thread_name(thread_id)
+            if thread_name is not None:
+                await self.prepare_thread_history(thread_id)
+                self.current_thread = thread_id
+                self.logger.debug(f"Thread {thread_id} found. Changing thread...")
+                return thread_id
+            return None
+        else:
+            #if both none, create a blank thread
+            return await self.create_blank_thread()
+
+    async def setup_thread(self, input_thread_name=None, input_thread_id=None):
+        """
+        Changes to the given thread, or to the default thread if none is given.
+
+        Args:
+            input_thread_name (str): The name of the thread to change to.
+            input_thread_id (str): The ID of the thread to change to.
+
+        Returns:
+            str: The ID of the thread.
+        """
+        if input_thread_name is not None:
+            thread_id = await self.change_thread(input_thread_name)
+        elif input_thread_id is not None:
+            thread_id = await self.change_thread(thread_id=input_thread_id)
+        else:
+            thread_id = await self.change_thread(thread_name="Default_Thread")
+
+        self.current_thread = thread_id
+        return thread_id
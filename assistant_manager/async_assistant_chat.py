@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from assistant_manager.async_runs_manager import AsyncRun_Manager
+
+#
+# Async counterpart of assistant_chat.py.
+# chat() is the entry point for services, main_run() keeps the terminal chat loop.
+#
+
+
+class AsyncAssistantChat(AsyncRun_Manager):
+    def __init__(self, api_key, organization, timeout=None, log_level=logging.INFO):
+        """
+        Initializes an instance of AsyncAssistantChat.
+
+        Args:
+            api_key (str): The OpenAI API key.
+            organization (str): The OpenAI organization ID.
+            timeout (Optional[int]): The timeout for API requests, in seconds.
+            log_level (Optional[int]): The logging level to use.
+
+        Returns:
+            None
+        """
+        super().__init__(api_key=api_key, organization=organization, timeout=timeout, log_level=log_level)
+
+    async def chat(self, thread_id, message, assistant_id=None, stream=False):
+        """
+        Sends a user message on a thread and waits for the assistant's reply.
+
+        Args:
+            thread_id (str): The ID of the thread to chat on.
+            message (str): The user's message.
+            assistant_id (str): The ID of the assistant to run, defaults to self.assistant_id.
+            stream (bool): Stream the reply to the user as it is generated.
+
+        Returns:
+            str: The assistant's reply, or None if the run failed.
+        """
+        thread_message = await self.create_message(thread_id=thread_id, role="user", content=message)
+        self.get_thread_cursor(thread_id).mark_seen(thread_message.id)
+        return await self.perform_run(thread_id, assistant_id, stream=stream)
+
+    async def main_run(self, assistant_id, thread_id, stream=False):
+        """
+        Runs the terminal chat loop without blocking the event loop on user input.
+
+        Args:
+            assistant_id (str): The ID of the assistant to chat with.
+            thread_id (str): The ID of the thread to chat on.
+            stream (bool): Stream replies to the user as they are generated.
+        """
+        while True:
+            check_updates = await self.check_update_assistant()
+            if check_updates is not None:
+                for function_name, function_output in check_updates.items():
+                    self.logger.debug(f"Function Dynamically updated: {function_name} | Output: {function_output}")
+
+            self.message_user("""------------
+            Your chat controls are as follows:
+            To quit the chat enter 'Q'/'q' | To start a new thread enter 'swapT' | To swap assistants enter 'swapA'
+            Please enter your message or a chat control.
+            ------------
+            """)
+            message = await asyncio.to_thread(self.get_user_input)
+
+            if message == "Q" or message == "q":
+                break
+            elif message == "swapT":
+                thread_swapped = await self.user_chat_swap_Thread()
+                if thread_swapped is not None:
+                    thread_id = thread_swapped
+                    self.current_thread = thread_id
+                continue
+            elif message == "swapA":
+                await self.setup_assistant_chat()
+                assistant_id = self.assistant_id
+                continue
+
+            await self.chat(thread_id, message, assistant_id, stream=stream)
+
+    async def user_chat_swap_Thread(self):
+        """
+        Asks the user for a thread by name or ID and changes to it.
+
+        Returns:
+            str: The ID of the selected thread.
+        """
+        options = ["Name", "ID", "Multiple Choice (Save Locally)"]
+        selected = await asyncio.to_thread(self.get_multiple_choice_input, options)
+        if selected == "Name":
+            self.message_user("Please enter the name of the thread")
+            thread_name = await asyncio.to_thread(self.get_user_input)
+            return await self.setup_thread(input_thread_name=thread_name)
+        elif selected == "ID":
+            self.message_user("Please enter the ID of the thread")
+            thread_id = await asyncio.to_thread(self.get_user_input)
+            return await self.setup_thread(input_thread_id=thread_id)
+        elif selected == "Multiple Choice (Save Locally)":
+            self.message_user("Please enter the start of the thread name, or nothing for the most recent threads")
+            prefix = await asyncio.to_thread(self.get_user_input)
+            matches = await self.search_threads(prefix)
+            if not matches:
+                self.message_user(f"No thread found starting with {prefix}")
+                return None
+            selected = await asyncio.to_thread(self.get_multiple_choice_input, [thread_name for thread_name, thread_id in matches])
+            return await self.setup_thread(input_thread_id=dict(matches)[selected])
+
+    async def setup_assistant_chat(self):
+        """
+        Asks the user to select an assistant and sets self.assistant_id.
+
+        Returns:
+            bool: True once an assistant is selected.
+        """
+        assistants = await self.load_assistants()
+        local_assistants = [assistant.name for assistant in assistants]
+
+        selected = await asyncio.to_thread(self.get_multiple_choice_input, local_assistants)
+        self.message_user(f"You selected {selected}")
+        self.message_user("Lets begin the chat")
+
+        self.assistant_id = assistants[local_assistants.index(selected)].id
+        self.message_user(f"Assistant ID: {self.assistant_id}")
+        return True
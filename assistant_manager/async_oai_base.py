@@ -0,0 +1,555 @@
+import functools
+import logging
+from typing import List, Optional
+from openai import AsyncOpenAI
+from openai._types import NotGiven, NOT_GIVEN
+from openai.types.beta.threads import Message as ThreadMessage
+from assistant_manager.interface_base import InterfaceBase
+from assistant_manager.chat_session import SessionManager
+from assistant_manager.utils.pagination import aiter_items
+from assistant_manager.utils.assistant_catalog import AssistantCatalog
+from assistant_manager.utils.rate_limiter import get_rate_limit_governor
+from assistant_manager.utils import transport
+from assistant_manager.utils.metrics import get_metrics, instrumented
+from assistant_manager.utils.tracing import get_tracer
+
+#
+# Async counterpart of oai_base.py built on AsyncOpenAI.
+# Every wrapper is awaitable so many conversations can make progress on one event loop.
+#
+
+
+class AsyncOAI_Base(SessionManager, InterfaceBase):
+    # Seconds before load_assistants() refetches the assistant catalog
+    assistant_catalog_ttl = 300.0
+
+    def __init__(self, api_key, organization, timeout, log_level) -> None:
+        # Per-conversation state lives on sessions, see chat_session.py
+        self.init_sessions()
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(log_level)
+        self.logger.info("Initializing AsyncAssistantManager")
+        # Every manager shares one connection pool, see utils/transport.py
+        # Every request is paced and retried by the shared rate limit governor, so the client itself doesn't retry
+        self.rate_limiter = get_rate_limit_governor()
+        # Call counts, errors and latency of the API wrappers and tools, see utils/metrics.py
+        self.metrics = get_metrics()
+        # Timing spans of each turn, see utils/tracing.py
+        self.tracer = get_tracer()
+        if timeout is None:
+            timeout = transport.get_timeout()
+        self.open_ai = AsyncOpenAI(api_key=api_key, organization=organization, timeout=timeout, max_retries=0, http_client=transport.get_async_http_client())
+        self.client = self.open_ai.beta
+        self.logger.debug(f"Initailized AsyncAssistantManager. self.client: {self.client}")
+
+        # Set up some defaults to keep track of the current assistant, thread and run
+        # These are per-conversation and are stored on the default session
+        # The assistants list needs the event loop, call load_assistants() to fill it
+        self.current_assistant = None
+        self.assistant_catalog = AssistantCatalog(ttl=self.assistant_catalog_ttl)
+        self.current_thread = None
+        self.current_thread_history = None
+        self.current_run = None
+        self.assistant_id = None
+        self.change_assistant_id = None
+        self.update_queue = []
+        self.assistant_files = {}
+        self.assistant_file_ids = {}
+        self.assistant_file_names = {}
+        self.tool_metadata = {}
+        self.threads = None
+        self.runs = {}
+        # Per thread cursor and seen messages, see utils/thread_cursor.py
+        self.thread_cursors = {}
+
+    @property
+    def assistants(self):
+        """
+        Every assistant on the account, newest first, or None before load_assistants() ran.
+        """
+        return self.assistant_catalog.assistants
+
+    async def load_assistants(self):
+        """
+        Loads every assistant into the assistant catalog, unless it is still fresh.
+
+        Returns:
+            list: The assistants.
+        """
+        if self.assistant_catalog.is_stale():
+            self.assistant_catalog.replace([assistant async for assistant in self.iter_assistants()])
+        return self.assistant_catalog.get_assistants()
+
+    @instrumented
+    async def create_assistant(self, model, instructions, name=None, tools=None, file_ids=None, metadata=None, description=NOT_GIVEN):
+        """
+        Create an assistant with a model and instructions.
+
+        Args:
+            model: ID of the model to use.
+            instructions: The system instructions that the assistant uses.
+            name: The name of the assistant.
+            tools: A list of tool enabled on the assistant.
+            file_ids: A list of file IDs attached to this assistant.
+            metadata: Set of 16 key-value pairs that can be attached to an object.
+            description: The description of the assistant.
+        """
+        assistant = await self.client.assistants.create(
+            model=model,
+            instructions=instructions,
+            name=name,
+            tools=tools,
+            file_ids=file_ids,
+            metadata=metadata,
+            description=description
+        )
+        self.assistant_catalog.upsert(assistant)
+        return assistant
+
+    @instrumented
+    async def modify_assistant(
+        self,
+        assistant_id: str,
+        *,
+        description: Optional[str] | NotGiven = NOT_GIVEN,
+        file_ids: List[str] | NotGiven = NOT_GIVEN,
+        instructions: Optional[str] | NotGiven = NOT_GIVEN,
+        metadata: Optional[object] | NotGiven = NOT_GIVEN,
+        model: str | NotGiven = NOT_GIVEN,
+        name: Optional[str] | NotGiven = NOT_GIVEN,
+        tools: List[object] | NotGiven = NOT_GIVEN,
+    ):
+        """
+        Modifies an assistant.
+
+        Args:
+            assistant_id: The ID of the assistant to modify.
+            description: The description of the assistant.
+            file_ids: A list of File IDs attached to this assistant.
+            instructions: The system instructions that the assistant uses.
+            metadata: Set of 16 key-value pairs that can be attached to an object.
+            model: ID of the model to use.
+            name: The name of the assistant.
+            tools: A list of tool enabled on the assistant.
+        """
+        assistant = await self.client.assistants.update(
+            assistant_id=assistant_id,
+            model=model,
+            name=name,
+            description=description,
+            instructions=instructions,
+            tools=tools,
+            file_ids=file_ids,
+            metadata=metadata,
+        )
+        self.assistant_catalog.upsert(assistant)
+        return assistant
+
+    async def get_assistant_id_by_name(self, assistant_name, id=None):
+        """
+        Returns an assistant ID, when searched by name
+        Takes a ID if given
+
+        Args:
+            assistant_name: The name of the assistant to search for.
+            id: The ID of the assistant to search for if you dont have a name.
+
+        Returns:
+            assistant_id: The ID of the assistant.
+        """
+        if id is not None:
+            self.logger.debug(f"Assistant ID found: {id}")
+            return id
+
+        await self.load_assistants()
+        assistant = self.assistant_catalog.get_by_name(assistant_name)
+        if assistant is not None:
+            self.logger.debug(f"Assistant ID found: {assistant.id}")
+            return assistant.id
+        self.logger.error(f"Assistant ID not found: {assistant_name}")
+        return None
+
+    @instrumented
+    async def list_assistants(self, limit=20, order="desc", after=None, before=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Returns a list of assistants.
+
+        Args:
+            limit: A limit on the number of objects to be returned, between 1 and 100.
+            order: Sort order by the `created_at` timestamp of the objects, `asc` or `desc`.
+            after: A cursor for use in pagination.
+            before: A cursor for use in pagination.
+        """
+        return await self.client.assistants.list(
+            limit=limit,
+            order=order,
+            after=after,
+            before=before,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    def iter_assistants(self, order="desc", until=None, prefetch=True):
+        """
+        Async-iterates every assistant, following the pagination cursor through all pages of 100.
+
+        Args:
+            order: Sort order by the `created_at` timestamp of the objects, `asc` or `desc`.
+            until: If given, stops after the first assistant for which until(assistant) is True.
+            prefetch: Fetch the next page in the background while the current one is consumed.
+        """
+        fetch_page = functools.partial(self.list_assistants, order=order)
+        return aiter_items(fetch_page, until=until, prefetch=prefetch)
+
+    @instrumented
+    async def upload_file(self, file_name, purpose="assistants"):
+        """
+        Uploads a local file to the Files API.
+
+        Args:
+            file_name (str): The path of the file to upload.
+            purpose (str): The purpose of the file, "assistants" for files assistants can use.
+        """
+        with open(file_name, 'rb') as f:
+            return await self.open_ai.files.create(file=f, purpose=purpose)
+
+    @instrumented
+    async def create_assistant_file(self, assistant_id, file_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Create an assistant file by attaching a File to an assistant.
+
+        Args:
+            assistant_id: The ID of the assistant to which the file should be attached.
+            file_id: A File ID (with `purpose="assistants"`) that the assistant should use.
+        """
+        return await self.client.assistants.files.create(
+            assistant_id=assistant_id,
+            file_id=file_id,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def retrieve_assistant_file(self, assistant_id, file_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Retrieves an AssistantFile.
+
+        Args:
+            assistant_id: The ID of the assistant from which the file should be retrieved.
+            file_id: The ID of the file to retrieve.
+        """
+        return await self.client.assistants.files.retrieve(
+            assistant_id=assistant_id,
+            file_id=file_id,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def delete_assistant_file(self, assistant_id, file_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Delete an assistant file.
+
+        Args:
+            assistant_id: The ID of the assistant from which the file should be deleted.
+            file_id: The ID of the file to delete.
+        """
+        return await self.client.assistants.files.delete(
+            assistant_id=assistant_id,
+            file_id=file_id,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def list_assistant_files(self, assistant_id, limit=20, order="desc", after=None, before=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Returns a list of assistant files.
+
+        Args:
+            assistant_id: The ID of the assistant for which the files should be listed.
+            limit: A limit on the number of objects to be returned, between 1 and 100.
+            order: Sort order by the `created_at` timestamp of the objects, `asc` or `desc`.
+            after: A cursor for use in pagination.
+            before: A cursor for use in pagination.
+        """
+        return await self.client.assistants.files.list(
+            assistant_id=assistant_id,
+            limit=limit,
+            order=order,
+            after=after,
+            before=before,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    def iter_assistant_files(self, assistant_id, order="desc", until=None, prefetch=True):
+        """
+        Async-iterates every file of an assistant, following the pagination cursor through all pages of 100.
+
+        Args:
+            assistant_id: The ID of the assistant for which the files should be listed.
+            order: Sort order by the `created_at` timestamp of the objects, `asc` or `desc`.
+            until: If given, stops after the first file for which until(file) is True.
+            prefetch: Fetch the next page in the background while the current one is consumed.
+        """
+        fetch_page = functools.partial(self.list_assistant_files, assistant_id=assistant_id, order=order)
+        return aiter_items(fetch_page, until=until, prefetch=prefetch)
+
+    @instrumented
+    async def create_thread(self, messages=None, metadata=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Create a thread.
+
+        Args:
+            messages: A list of messages to start the thread with.
+            metadata: Set of 16 key-value pairs that can be attached to an object.
+        """
+        return await self.client.threads.create(
+            messages=messages,
+            metadata=metadata,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def retrieve_thread(self, thread_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Retrieves a thread.
+
+        Args:
+            thread_id: The ID of the thread to retrieve.
+        """
+        return await self.client.threads.retrieve(
+            thread_id=thread_id,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def modify_thread(self, thread_id, metadata=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Modifies a thread.
+
+        Args:
+            thread_id: The ID of the thread to modify.
+            metadata: Set of 16 key-value pairs that can be attached to an object.
+        """
+        return await self.client.threads.update(
+            thread_id=thread_id,
+            metadata=metadata,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def delete_thread(self, thread_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Delete a thread.
+
+        Args:
+            thread_id: The ID of the thread to delete.
+        """
+        return await self.client.threads.delete(
+            thread_id=thread_id,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def create_message(self, thread_id, role, content, file_ids=NOT_GIVEN, metadata=NOT_GIVEN, timeout=NOT_GIVEN) -> ThreadMessage:
+        """
+        Create a message.
+
+        Args:
+            thread_id: The ID of the thread to create a message in.
+            role: The role of the entity that is creating the message. Currently only `user` is supported.
+            content: The content of the message.
+        """
+        return await self.client.threads.messages.create(
+            thread_id=thread_id,
+            role=role,
+            content=content,
+            file_ids=file_ids,
+            metadata=metadata,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def retrieve_message(self, thread_id, message_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Retrieve a message.
+
+        Args:
+            thread_id: The ID of the thread the message belongs to.
+            message_id: The ID of the message to retrieve.
+        """
+        try:
+            return await self.client.threads.messages.retrieve(
+                thread_id=thread_id,
+                message_id=message_id,
+                extra_headers=extra_headers,
+                extra_query=extra_query,
+                extra_body=extra_body,
+                timeout=timeout
+            )
+        except Exception as e:
+            print(f"Error retrieving message: {e}")
+            return None
+
+    @instrumented
+    async def modify_message(self, thread_id, message_id, metadata=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Modifies a message.
+
+        Args:
+            thread_id: The ID of the thread the message belongs to.
+            message_id: The ID of the message to modify.
+            metadata: Set of 16 key-value pairs that can be attached to an object.
+        """
+        return await self.client.threads.messages.update(
+            thread_id=thread_id,
+            message_id=message_id,
+            metadata=metadata,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def list_messages(self, thread_id, limit=20, order="desc", after=None, before=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Returns a list of messages for a given thread.
+
+        Args:
+            thread_id: The ID of the thread to list messages from.
+            limit: A limit on the number of objects to be returned, between 1 and 100.
+            order: Sort order by the `created_at` timestamp of the objects, `asc` or `desc`.
+            after: A cursor for use in pagination.
+            before: A cursor for use in pagination.
+        """
+        return await self.client.threads.messages.list(
+            thread_id=thread_id,
+            limit=limit,
+            order=order,
+            after=after,
+            before=before,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    def iter_messages(self, thread_id, order="asc", after=None, until=None, prefetch=True):
+        """
+        Async-iterates every message of a thread, following the pagination cursor through all pages of 100.
+
+        Args:
+            thread_id: The ID of the thread to list messages from.
+            order: Sort order by the `created_at` timestamp of the objects, `asc` or `desc`.
+            after: Start after this message ID, None starts at the beginning.
+            until: If given, stops after the first message for which until(message) is True.
+            prefetch: Fetch the next page in the background while the current one is consumed.
+        """
+        fetch_page = functools.partial(self.list_messages, thread_id=thread_id, order=order)
+        return aiter_items(fetch_page, after=after, until=until, prefetch=prefetch)
+
+    @instrumented
+    async def retrieve_message_file(self, thread_id, message_id, file_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Retrieves a message file.
+
+        Args:
+            thread_id: The ID of the thread the message belongs to.
+            message_id: The ID of the message the file is attached to.
+            file_id: The ID of the file to retrieve.
+        """
+        return await self.client.threads.messages.files.retrieve(
+            thread_id=thread_id,
+            message_id=message_id,
+            file_id=file_id,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def list_message_files(self, thread_id, message_id, limit=20, order="desc", after=None, before=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Returns a list of message files.
+
+        Args:
+            thread_id: The ID of the thread the message belongs to.
+            message_id: The ID of the message to list files from.
+            limit: A limit on the number of objects to be returned, between 1 and 100.
+            order: Sort order by the `created_at` timestamp of the objects, `asc` or `desc`.
+            after: A cursor for use in pagination.
+            before: A cursor for use in pagination.
+        """
+        return await self.client.threads.messages.files.list(
+            thread_id=thread_id,
+            message_id=message_id,
+            limit=limit,
+            order=order,
+            after=after,
+            before=before,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    def iter_message_files(self, thread_id, message_id, order="desc", until=None, prefetch=True):
+        """
+        Async-iterates every file of a message, following the pagination cursor through all pages of 100.
+
+        Args:
+            thread_id: The ID of the thread the message belongs to.
+            message_id: The ID of the message to list files from.
+            order: Sort order by the `created_at` timestamp of the objects, `asc` or `desc`.
+            until: If given, stops after the first file for which until(file) is True.
+            prefetch: Fetch the next page in the background while the current one is consumed.
+        """
+        fetch_page = functools.partial(self.list_message_files, thread_id=thread_id, message_id=message_id, order=order)
+        return aiter_items(fetch_page, until=until, prefetch=prefetch)
+
+    @instrumented
+    async def submit_tool_outputs(self, thread_id, run_id, tool_outputs, stream: bool | NotGiven = NOT_GIVEN):
+        """
+        Submits tool outputs for a run.
+
+        Args:
+            thread_id: The ID of the thread the run belongs to.
+            run_id: The ID of the run to submit tool outputs for.
+            tool_outputs: A list of tool outputs to submit. Each output should be a dictionary with a 'tool_call_id' and an 'output'.
+            stream: If True, returns a stream of the run's events instead of the run.
+        """
+        run = await self.client.threads.runs.submit_tool_outputs(
+            thread_id=thread_id,
+            run_id=run_id,
+            tool_outputs=tool_outputs,
+            stream=stream
+        )
+        self.logger.debug(f"Submitted tool outputs for run {run_id}")
+
+        return run
@@ -0,0 +1,344 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import time
+from openai._types import NotGiven, NOT_GIVEN
+from assistant_manager.async_a_m_threads import AsyncOAI_Threads
+from assistant_manager.tool_dispatch import ToolDispatch
+from assistant_manager.utils.poll_scheduler import PollScheduler, PollStats
+from assistant_manager.utils.metrics import instrumented
+from assistant_manager.utils.tracing import traced
+from assistant_manager.utils.python_workers import execution_key
+from assistant_manager.utils.output_spill import get_output_spill
+from assistant_manager.utils.pagination import aiter_items
+
+#
+# Async counterpart of runs_manager.py.
+# Tool functions are still plain sync functions, they run on the tool worker pool so a slow tool
+# never blocks the event loop.
+#
+
+
+class AsyncRun_Manager(AsyncOAI_Threads, ToolDispatch):
+
+    def __init__(self, api_key, organization, timeout=None, log_level=logging.INFO) -> None:
+        super().__init__(api_key=api_key, organization=organization, timeout=timeout, log_level=log_level)
+        # How long to wait between retrieve_run polls, can be overridden per run
+        self.poll_scheduler = PollScheduler()
+        self.poll_stats = PollStats()
+
+    @instrumented
+    async def create_run(self, thread_id, assistant_id, model=None, instructions=None, tools=None, metadata=None, stream: bool | NotGiven = NOT_GIVEN, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Create a run.
+
+        Args:
+            thread_id: The ID of the thread to create a run in.
+            assistant_id: The ID of the assistant to use to execute this run.
+            model: Overrides the model associated with the assistant for this run.
+            instructions: Override the default system message of the assistant.
+            tools: Override the tools the assistant can use for this run.
+            metadata: Set of 16 key-value pairs that can be attached to an object.
+            stream: If True, returns a stream of the run's events instead of the run.
+        """
+        return await self.client.threads.runs.create(
+            thread_id=thread_id,
+            assistant_id=assistant_id,
+            model=model,
+            instructions=instructions,
+            tools=tools,
+            metadata=metadata,
+            stream=stream,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def retrieve_run(self, thread_id, run_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Retrieves a run.
+
+        Args:
+            thread_id: The ID of the thread the run belongs to.
+            run_id: The ID of the run to retrieve.
+        """
+        return await self.client.threads.runs.retrieve(
+            thread_id=thread_id,
+            run_id=run_id,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def update_run(self, thread_id, run_id, metadata=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Modifies a run.
+
+        Args:
+            thread_id: The ID of the thread the run belongs to.
+            run_id: The ID of the run to update.
+            metadata: Set of 16 key-value pairs that can be attached to an object.
+        """
+        return await self.client.threads.runs.update(
+            thread_id=thread_id,
+            run_id=run_id,
+            metadata=metadata,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    @instrumented
+    async def list_runs(self, thread_id, limit=20, order="desc", after=None, before=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Returns a list of runs belonging to a thread.
+
+        Args:
+            thread_id: The ID of the thread to list runs from.
+            limit: A limit on the number of objects to be returned, between 1 and 100.
+            order: Sort order by the `created_at` timestamp of the objects, `asc` or `desc`.
+            after: A cursor for use in pagination.
+            before: A cursor for use in pagination.
+        """
+        return await self.client.threads.runs.list(
+            thread_id=thread_id,
+            limit=limit,
+            order=order,
+            after=after,
+            before=before,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    def iter_runs(self, thread_id, order="desc", until=None, prefetch=True):
+        """
+        Async-iterates every run of a thread, following the pagination cursor through all pages of 100.
+
+        Args:
+            thread_id: The ID of the thread to list runs from.
+            order: Sort order by the `created_at` timestamp of the objects, `asc` or `desc`.
+            until: If given, stops after the first run for which until(run) is True.
+            prefetch: Fetch the next page in the background while the current one is consumed.
+        """
+        fetch_page = functools.partial(self.list_runs, thread_id=thread_id, order=order)
+        return aiter_items(fetch_page, until=until, prefetch=prefetch)
+
+    @instrumented
+    async def cancel_run(self, thread_id, run_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Cancels a run.
+
+        Args:
+            thread_id: The ID of the thread the run belongs to.
+            run_id: The ID of the run to cancel.
+        """
+        return await self.client.threads.runs.cancel(
+            thread_id=thread_id,
+            run_id=run_id,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+
+    async def run_tool_call_async(self, tool_call):
+        """
+        Runs a single tool call on the tool worker pool.
+
+        Args:
+            tool_call: A tool call from run.required_action.submit_tool_outputs.tool_calls.
+
+        Returns:
+            dict: The tool output with a 'tool_call_id' and an 'output'.
+        """
+        context = contextvars.copy_context()
+        function_output = await asyncio.get_running_loop().run_in_executor(
+            self.get_tool_executor(), context.run, self.call_tool, tool_call.function.name, tool_call.function.arguments
+        )
+        # Tools registered on self are coroutines on the async manager
+        if inspect.isawaitable(function_output):
+            function_output = await function_output
+        return {"tool_call_id": tool_call.id, "output": await self.govern_output_async(tool_call.function.name, function_output)}
+
+    async def govern_output_async(self, function_name, function_output):
+        """
+        Like govern_output, uploading spilled outputs with the async client.
+        """
+        spill = get_output_spill()
+        text = str(function_output)
+        artifact = spill.spill(function_name, text, execution_key.get())
+        if artifact is None:
+            return text
+        file_id = None
+        if spill.settings["upload"]:
+            try:
+                file_id = (await self.upload_file(artifact.path)).id
+            except Exception as e:
+                self.logger.warning(f"Could not upload artifact {artifact.artifact_id}: {e}")
+        self.logger.info(f"Spilled {artifact.size_chars} characters of {function_name} output to {artifact.path}")
+        return artifact.summary(spill.settings["budget_chars"], file_id)
+
+    async def run_tool_calls_async(self, tool_calls, thread_id=None):
+        """
+        Runs all the tool calls of a required action concurrently.
+
+        Args:
+            tool_calls (list): The tool calls of the required action.
+            thread_id (str): The thread of the run, exec_python keeps its interpreter state per thread.
+
+        Returns:
+            list: The tool output dicts, in the same order as the tool calls.
+        """
+        token = execution_key.set(thread_id) if thread_id is not None else None
+        try:
+            return list(await asyncio.gather(*[self.run_tool_call_async(tool_call) for tool_call in tool_calls]))
+        finally:
+            if token is not None:
+                execution_key.reset(token)
+
+    async def process_run(self, thread_id, run_id, poll_scheduler=None):
+        """
+        Waits for a run to finish, running any tools it asks for.
+
+        Args:
+            thread_id (str): The ID of the thread the run belongs to.
+            run_id (str): The ID of the run to process.
+            poll_scheduler (PollScheduler): The poll schedule for this run, defaults to self.poll_scheduler.
+
+        Returns:
+            str: The text of the run's new assistant messages, or None if the run failed.
+        """
+        poll_scheduler = poll_scheduler or self.poll_scheduler
+        delays = poll_scheduler.delays()
+        polls = 0
+        started = time.monotonic()
+        while True:
+            with self.tracer.span("poll", run_id=run_id, poll=polls + 1) as span:
+                run = await self.retrieve_run(thread_id, run_id)
+                if span is not None:
+                    span.set_attribute("status", run.status)
+            polls += 1
+            self.logger.debug(f"Run {run_id} status: {run.status}")
+            if run.status == "completed":
+                self.poll_stats.record(run_id, polls, time.monotonic() - started, run.status)
+                with self.tracer.span("fetch_messages", thread_id=thread_id):
+                    new_messages = await self.fetch_new_messages(thread_id, run_id=run_id)
+                replies = [message.content[0].text.value for message in new_messages if message.role == "assistant"]
+                return "\n\n".join(replies)
+            elif run.status == "requires_action":
+                tool_calls = run.required_action.submit_tool_outputs.tool_calls
+                self.logger.debug(f"Required Actions: {tool_calls}")
+                with self.tracer.span("tool_calls", count=len(tool_calls)):
+                    tools_output = await self.run_tool_calls_async(tool_calls, thread_id=thread_id)
+                await self.submit_tool_outputs(thread_id, run.id, tools_output)
+                # The run is moving again, go back to polling fast
+                delays = poll_scheduler.delays()
+            elif run.status in ["failed", "cancelled", "expired"]:
+                self.poll_stats.record(run_id, polls, time.monotonic() - started, run.status)
+                self.logger.error(f"Run {run_id} ended with status {run.status}: {run.last_error}")
+                return None
+            else:
+                delay = next(delays)
+                with self.tracer.span("poll_sleep", seconds=delay):
+                    await asyncio.sleep(delay)
+
+    async def process_run_stream(self, thread_id, stream):
+        """
+        Consumes a run's event stream, sending text to the user as it arrives and
+        running any tools the run asks for without polling. The run is kept in self.runs
+        from its thread.run.created event until the stream ends.
+
+        Args:
+            thread_id (str): The ID of the thread the run belongs to.
+            stream: The event stream returned by create_run(..., stream=True).
+
+        Returns:
+            str: The text of the last assistant message, or None if the run failed.
+        """
+        reply = None
+        runs = self.runs
+        run_id = None
+        try:
+            while stream is not None:
+                next_stream = None
+                async for event in stream:
+                    if event.event == "thread.run.created":
+                        # Registered as soon as the API knows the run, so it can be looked up or cancelled
+                        run_id = event.data.id
+                        runs[run_id] = event.data
+                    elif event.event == "thread.message.created":
+                        self.message_user_delta(f"{event.data.role}: ")
+                    elif event.event == "thread.message.delta":
+                        for content in event.data.delta.content or []:
+                            if content.type == "text" and content.text is not None and content.text.value:
+                                self.message_user_delta(content.text.value)
+                    elif event.event == "thread.message.completed":
+                        self.message_user_delta("\n")
+                        self.get_thread_cursor(thread_id).mark_seen(event.data.id)
+                        reply = event.data.content[0].text.value
+                    elif event.event == "thread.run.requires_action":
+                        run = event.data
+                        tool_calls = run.required_action.submit_tool_outputs.tool_calls
+                        with self.tracer.span("tool_calls", count=len(tool_calls)):
+                            tools_output = await self.run_tool_calls_async(tool_calls, thread_id=thread_id)
+                        # The run carries on in a new stream once the outputs are in
+                        next_stream = await self.submit_tool_outputs(thread_id, run.id, tools_output, stream=True)
+                        break
+                    elif event.event in ["thread.run.failed", "thread.run.cancelled", "thread.run.expired"]:
+                        self.logger.error(f"Run {event.data.id} ended with status {event.data.status}: {event.data.last_error}")
+                        return None
+                    elif event.event == "error":
+                        self.logger.error(f"Run stream error: {event.data}")
+                        return None
+                await stream.close()
+                stream = next_stream
+            return reply
+        finally:
+            if run_id is not None:
+                runs.pop(run_id, None)
+
+    @traced("turn", "thread_id", "assistant_id", "stream")
+    async def perform_run(self, thread_id, assistant_id=None, poll_scheduler=None, stream=False):
+        """
+        Creates a run and messages the user with the new messages once it completes.
+
+        Args:
+            thread_id (str): The ID of the thread to run.
+            assistant_id (str): The ID of the assistant to run, defaults to self.assistant_id.
+            poll_scheduler (PollScheduler): The poll schedule for this run, defaults to self.poll_scheduler.
+            stream (bool): Stream the reply to the user as it is generated instead of polling the run.
+
+        Returns:
+            str: The text of the assistant's reply, or None if the run failed.
+        """
+        if assistant_id is None:
+            assistant_id = self.assistant_id
+
+        if stream:
+            run_stream = await self.create_run(thread_id=thread_id, assistant_id=assistant_id, stream=True)
+            run_done = await self.process_run_stream(thread_id=thread_id, stream=run_stream)
+            if run_done is None:
+                self.logger.error(f"Streamed run failed on thread {thread_id}")
+            return run_done
+
+        run = await self.create_run(thread_id=thread_id, assistant_id=assistant_id)
+        self.logger.debug(f"Run created: {run}")
+
+        run_done = await self.process_run(thread_id=thread_id, run_id=run.id, poll_scheduler=poll_scheduler)
+        self.logger.debug(f"Run processed: {run_done}")
+        if run_done is None:
+            self.logger.error(f"Run failed: {run}")
+            return None
+
+        if run_done:
+            self.message_user(f'assistant: {run_done}')
+        return run_done
@@ -1,5 +1,6 @@
 from assistant_tools import Tooling
 from assistant_manager.interface_base import InterfaceBase
+from assistant_manager.utils.tool_catalog import make_function_metadata
 import logging
 
 class AutogenAssistantManager(Tooling, InterfaceBase):
@@ -43,17 +44,8 @@ class AutogenAssistantManager(Tooling, InterfaceBase):
         Returns:
             None
         """
-        # Define the metadata for the tool
-        metadata = {
-                "name": tool_name,
-                "description": tool_description,
-                "parameters": {
-                    "type": "object",
-                    "properties": tool_properties,
-                    "required": [tool_required]
-                },
-                "description": tool_meta_description
-        }
+        # Define the metadata for the tool, the meta description is what the assistant sees
+        metadata = make_function_metadata(tool_name, tool_required, tool_meta_description, tool_properties)
         # Return the metadata
         return metadata
 
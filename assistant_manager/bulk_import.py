@@ -0,0 +1,245 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+#
+# Bulk import of messages into threads from a JSONL file of
+#     {"thread_name": ..., "role": "user", "content": ..., "metadata": {...}}
+# records, e.g. to migrate past conversations or prime evaluation threads.
+# Each thread is a lane: its messages are created in file order, while lanes run concurrently.
+# A new thread is created with its first messages in one create_thread call, the rest go
+# through create_message. Every API call is paced by the shared rate limit governor.
+# Progress is committed to an SQLite checkpoint after every call, so a rerun resumes where the
+# last one stopped. Run from the repository root:
+#     python -m assistant_manager.bulk_import records.jsonl --concurrency 8
+#
+
+logger = logging.getLogger(__name__)
+
+# Most messages create_thread accepts
+MAX_INITIAL_MESSAGES = 32
+
+
+class ImportRecordError(ValueError):
+    pass
+
+
+class ImportCheckpoint():
+    def __init__(self, path):
+        """
+        Opens (or creates) an import checkpoint.
+
+        Args:
+            path (str): The SQLite database file, ":memory:" keeps it in memory.
+        """
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.lock, self.connection:
+            if path != ":memory:":
+                self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS import_progress ("
+                " thread_name TEXT PRIMARY KEY,"
+                " thread_id TEXT NOT NULL,"
+                " imported INTEGER NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+
+    def get(self, thread_name):
+        """
+        Returns (thread_id, messages imported) of a thread, or (None, 0) if it was not started.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT thread_id, imported FROM import_progress WHERE thread_name = ?", (thread_name,)
+            ).fetchone()
+        return (row[0], row[1]) if row is not None else (None, 0)
+
+    def set(self, thread_name, thread_id, imported):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO import_progress (thread_name, thread_id, imported, updated_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(thread_name) DO UPDATE SET thread_id = excluded.thread_id,"
+                " imported = excluded.imported, updated_at = excluded.updated_at",
+                (thread_name, thread_id, imported, time.time()),
+            )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def parse_record(line, line_number):
+    """
+    Parses and checks one JSONL record.
+
+    Returns:
+        dict: The record with its role defaulted to "user".
+    """
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ImportRecordError(f"Line {line_number}: invalid JSON: {e}") from e
+    if not isinstance(record, dict) or not record.get("thread_name") or "content" not in record:
+        raise ImportRecordError(f"Line {line_number}: a record needs a thread_name and a content")
+    record.setdefault("role", "user")
+    return record
+
+
+def index_records(path):
+    """
+    Streams the file once and returns the byte offset of each record, per thread, in file order.
+    Only offsets are kept, so the file is never held in memory.
+
+    Returns:
+        dict: Thread name to a list of (line number, offset).
+    """
+    lanes = {}
+    with open(path, 'rb') as f:
+        offset = 0
+        for line_number, line in enumerate(f, start=1):
+            if line.strip():
+                record = parse_record(line, line_number)
+                lanes.setdefault(record["thread_name"], []).append((line_number, offset))
+            offset += len(line)
+    return lanes
+
+
+def read_records(path, positions):
+    """
+    Yields the records at the given (line number, offset) positions.
+    """
+    with open(path, 'rb') as f:
+        for line_number, offset in positions:
+            f.seek(offset)
+            yield parse_record(f.readline(), line_number)
+
+
+def to_message(record):
+    message = {"role": record["role"], "content": record["content"]}
+    for key in ("metadata", "file_ids"):
+        if record.get(key):
+            message[key] = record[key]
+    return message
+
+
+class BulkImporter():
+    def __init__(self, manager, concurrency=8, batch_size=MAX_INITIAL_MESSAGES, checkpoint_path=None):
+        """
+        Initializes a bulk importer.
+
+        Args:
+            manager: A sync assistant manager with create_thread, create_message and add_thread.
+            concurrency (int): How many threads are imported at once.
+            batch_size (int): How many messages a new thread is created with, at most MAX_INITIAL_MESSAGES.
+            checkpoint_path (str): The checkpoint file, defaults to the records file name plus .checkpoint.sqlite3.
+        """
+        self.manager = manager
+        self.concurrency = concurrency
+        self.batch_size = max(0, min(batch_size, MAX_INITIAL_MESSAGES))
+        self.checkpoint_path = checkpoint_path
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def import_lane(self, path, thread_name, positions, checkpoint):
+        """
+        Imports the messages of one thread, in order, skipping those the checkpoint has.
+        """
+        thread_id, imported = checkpoint.get(thread_name)
+        if imported >= len(positions):
+            self.count("threads_skipped")
+            return
+        records = read_records(path, positions[imported:])
+        if thread_id is None:
+            batch = []
+            if self.batch_size:
+                for record in records:
+                    batch.append(to_message(record))
+                    if len(batch) >= self.batch_size:
+                        break
+            thread_id = self.manager.create_thread(messages=batch or None).id
+            imported = len(batch)
+            # Registered before it is checkpointed, a rerun never finds a thread without its name
+            self.manager.add_thread(thread_name, thread_id)
+            checkpoint.set(thread_name, thread_id, imported)
+            self.count("threads_created")
+            self.count("messages_batched", imported)
+        for record in records:
+            message = to_message(record)
+            self.manager.create_message(thread_id=thread_id, **message)
+            imported += 1
+            checkpoint.set(thread_name, thread_id, imported)
+            self.count("messages_created")
+
+    def run(self, path):
+        """
+        Imports a JSONL file. Threads that fail are reported and left for the next run to resume.
+
+        Args:
+            path (str): The JSONL records file.
+
+        Returns:
+            dict: threads, messages, threads_created, messages_batched, messages_created,
+                threads_skipped, failed (thread name to error) and seconds.
+        """
+        started = time.monotonic()
+        lanes = index_records(path)
+        self.stats = {
+            "threads": len(lanes),
+            "messages": sum(len(positions) for positions in lanes.values()),
+            "threads_created": 0,
+            "messages_batched": 0,
+            "messages_created": 0,
+            "threads_skipped": 0,
+        }
+        failed = {}
+        checkpoint = ImportCheckpoint(self.checkpoint_path or f"{path}.checkpoint.sqlite3")
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="bulk_import") as executor:
+                futures = {
+                    thread_name: executor.submit(self.import_lane, path, thread_name, positions, checkpoint)
+                    for thread_name, positions in lanes.items()
+                }
+                for thread_name, future in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"Import of thread {thread_name} failed: {e}")
+                        failed[thread_name] = str(e)
+        finally:
+            checkpoint.close()
+        return dict(self.stats, failed=failed, seconds=time.monotonic() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import messages into threads from a JSONL file.")
+    parser.add_argument("path", help="JSONL file of {thread_name, role, content, metadata} records.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Threads imported at once.")
+    parser.add_argument("--batch-size", type=int, default=MAX_INITIAL_MESSAGES, help="Messages a new thread is created with.")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file, defaults to PATH.checkpoint.sqlite3.")
+    args = parser.parse_args()
+
+    from assistant_manager.assistant_manager import OAI_Assistant
+    manager = OAI_Assistant(api_key=os.environ.get('API_KEY'), organization=os.environ.get('ORG_ID'))
+    importer = BulkImporter(manager, concurrency=args.concurrency, batch_size=args.batch_size, checkpoint_path=args.checkpoint)
+    try:
+        result = importer.run(args.path)
+    except ImportRecordError as e:
+        parser.exit(2, f"{e}\n")
+    print(json.dumps(result, indent=2))
+    if result["failed"]:
+        parser.exit(1, f"{len(result['failed'])} threads failed, run again to resume them\n")
+
+
+if __name__ == "__main__":
+    main()
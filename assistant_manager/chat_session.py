@@ -0,0 +1,147 @@
+import contextlib
+import contextvars
+import inspect
+import uuid
+
+#
+# Per-conversation state for a manager.
+# The client, caches and tool registry stay on the manager and are shared. Everything that
+# belongs to one conversation (current thread, assistant, update queue, runs, seen messages)
+# lives on a ChatSession. The manager attributes of the same names read and write the session
+# active in the current thread or asyncio task, falling back to the manager's default session,
+# so existing code keeps working unchanged while each user gets their own session.
+#
+
+active_sessions = contextvars.ContextVar("active_sessions", default=None)
+
+
+class ChatSession():
+    def __init__(self, manager, thread_id=None, assistant_id=None):
+        """
+        Initializes the state of one conversation.
+
+        Args:
+            manager: The OAI_Assistant or AsyncAssistantChat the session runs on.
+            thread_id (str): The thread the conversation starts on.
+            assistant_id (str): The assistant the conversation talks to.
+        """
+        self.manager = manager
+        self.session_id = uuid.uuid4().hex
+        self.current_assistant = None
+        self.current_thread = thread_id
+        self.current_thread_history = None
+        self.current_run = None
+        self.assistant_id = assistant_id
+        self.change_assistant_id = None
+        self.update_queue = []
+        self.runs = {}
+        # Per thread cursor and seen messages, see utils/thread_cursor.py
+        self.thread_cursors = {}
+
+    def call(self, function, *args, **kwargs):
+        """
+        Calls a manager method with this session active. Coroutine functions return a coroutine
+        that activates the session when awaited.
+
+        Args:
+            function (callable): The method to call, e.g. manager.perform_run.
+            *args: Positional arguments for the method.
+            **kwargs: Keyword arguments for the method.
+
+        Returns:
+            The method's return value, or a coroutine for coroutine functions.
+        """
+        if inspect.iscoroutinefunction(function):
+            async def run():
+                with self.manager.use_session(self):
+                    return await function(*args, **kwargs)
+            return run()
+        with self.manager.use_session(self):
+            return function(*args, **kwargs)
+
+    def setup_thread(self, input_thread_name=None, input_thread_id=None):
+        return self.call(self.manager.setup_thread, input_thread_name=input_thread_name, input_thread_id=input_thread_id)
+
+    def change_thread(self, thread_name=None, thread_id=None):
+        return self.call(self.manager.change_thread, thread_name=thread_name, thread_id=thread_id)
+
+    def perform_run(self, thread_id=None, assistant_id=None, **kwargs):
+        return self.call(self.manager.perform_run, thread_id or self.current_thread, assistant_id or self.assistant_id, **kwargs)
+
+    def main_run(self, assistant_id=None, thread_id=None, **kwargs):
+        return self.call(self.manager.main_run, assistant_id or self.assistant_id, thread_id or self.current_thread, **kwargs)
+
+
+def session_attribute(name):
+    """
+    Returns a property that reads and writes `name` on the manager's active session.
+    """
+    def get(self):
+        return getattr(self.session, name)
+
+    def set(self, value):
+        setattr(self.session, name, value)
+
+    return property(get, set, doc=f"The {name} of the active session.")
+
+
+class SessionManager():
+    """
+    Mixin giving a manager per-conversation state, see ChatSession.
+    """
+    current_assistant = session_attribute("current_assistant")
+    current_thread = session_attribute("current_thread")
+    current_thread_history = session_attribute("current_thread_history")
+    current_run = session_attribute("current_run")
+    assistant_id = session_attribute("assistant_id")
+    change_assistant_id = session_attribute("change_assistant_id")
+    update_queue = session_attribute("update_queue")
+    runs = session_attribute("runs")
+    thread_cursors = session_attribute("thread_cursors")
+
+    def init_sessions(self):
+        """
+        Creates the default session, used wherever no other session is active. Call this first in __init__.
+        """
+        self.default_session = ChatSession(self)
+
+    @property
+    def session(self):
+        """
+        The session active in the current thread or task, or the default session.
+        """
+        sessions = active_sessions.get()
+        if sessions is not None:
+            session = sessions.get(id(self))
+            if session is not None:
+                return session
+        return self.default_session
+
+    def new_session(self, thread_id=None, assistant_id=None):
+        """
+        Creates a session for a new conversation.
+
+        Args:
+            thread_id (str): The thread the conversation starts on.
+            assistant_id (str): The assistant the conversation talks to, defaults to the default session's assistant.
+
+        Returns:
+            ChatSession: The new session.
+        """
+        return ChatSession(self, thread_id=thread_id, assistant_id=assistant_id or self.default_session.assistant_id)
+
+    @contextlib.contextmanager
+    def use_session(self, session):
+        """
+        Makes a session active for the current thread or task until the with block ends.
+
+        Args:
+            session (ChatSession): The session to activate.
+        """
+        sessions = dict(active_sessions.get() or {})
+        sessions[id(self)] = session
+        token = active_sessions.set(sessions)
+        try:
+            yield session
+        finally:
+            active_sessions.reset(token)
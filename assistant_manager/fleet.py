@@ -0,0 +1,295 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from assistant_manager.utils.tool_catalog import get_tool_catalog, make_function_tool
+
+#
+# Declarative assistant fleets.
+# A fleet file (JSON, or YAML with PyYAML installed) lists assistants by name:
+#     {"assistants": [{"name": "Researcher", "model": "gpt-4-1106-preview", "instructions": "...",
+#                      "tools": ["get_arxiv_papers", "code_interpreter"], "file_ids": [], "metadata": {}}]}
+# Tools are tool catalog names, "code_interpreter", "retrieval" or full tool dicts. Only the fields an
+# entry sets are managed. Each managed field is compared with the live assistant by content hash,
+# and only assistants that are missing or differ are written, concurrently. Run from the repository root:
+#     python -m assistant_manager.fleet fleet.yaml --dry-run
+#
+
+logger = logging.getLogger(__name__)
+
+MANAGED_FIELDS = ("model", "instructions", "description", "tools", "file_ids", "metadata")
+BUILTIN_TOOLS = ("code_interpreter", "retrieval")
+
+
+class FleetSpecError(ValueError):
+    pass
+
+
+def load_fleet_spec(path):
+    """
+    Reads a fleet file.
+
+    Args:
+        path (str): A .json, .yaml or .yml file with an "assistants" list, or the list itself.
+
+    Returns:
+        list: The assistant entries.
+    """
+    with open(path) as f:
+        text = f.read()
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("Reading YAML fleet files needs PyYAML, pip install pyyaml") from e
+        spec = yaml.safe_load(text)
+    else:
+        spec = json.loads(text)
+    entries = spec.get("assistants") if isinstance(spec, dict) else spec
+    if not isinstance(entries, list):
+        raise FleetSpecError(f"{path} has no assistants list")
+    names = set()
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get("name") or not entry.get("model"):
+            raise FleetSpecError(f"Every assistant needs a name and a model: {entry!r}")
+        if entry["name"] in names:
+            raise FleetSpecError(f"Assistant {entry['name']!r} is listed twice")
+        names.add(entry["name"])
+    return entries
+
+
+def normalize_field(field, value):
+    """
+    Puts a field in a canonical form so equal content hashes equal, e.g. file IDs in any order.
+    An empty, null or missing instructions or description are the same: the API returns null for all three.
+    """
+    if value is None:
+        return None
+    if field in ("instructions", "description"):
+        return value or None
+    if field == "tools":
+        return [tool.model_dump(exclude_none=True) if hasattr(tool, "model_dump") else tool for tool in value]
+    if field == "file_ids":
+        return sorted(value)
+    if field == "metadata":
+        return {key: str(item) for key, item in value.items()} if value else {}
+    return value
+
+
+def content_hash(value):
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def field_hash(field, value):
+    return content_hash(normalize_field(field, value))
+
+
+class FleetChange():
+    def __init__(self, name, action, assistant_id=None, fields=None):
+        """
+        What reconciling one assistant takes.
+
+        Args:
+            name (str): The assistant name.
+            action (str): "create", "update" or "unchanged".
+            assistant_id (str): The live assistant, None for creates.
+            fields (dict): The fields to write, only the changed ones for updates.
+        """
+        self.name = name
+        self.action = action
+        self.assistant_id = assistant_id
+        self.fields = fields or {}
+
+    def __repr__(self):
+        return f"FleetChange(name={self.name!r}, action={self.action!r}, fields={sorted(self.fields)!r})"
+
+
+class FleetReconciler():
+    def __init__(self, manager, concurrency=8):
+        """
+        Initializes a reconciler.
+
+        Args:
+            manager: A sync assistant manager.
+            concurrency (int): How many writes run at once.
+        """
+        self.manager = manager
+        self.concurrency = concurrency
+        self.tool_catalog = get_tool_catalog()
+
+    def resolve_tools(self, tools):
+        """
+        Returns the tool dicts of a spec's tools list.
+        """
+        resolved = []
+        for tool in tools:
+            if isinstance(tool, dict):
+                resolved.append(tool)
+            elif tool in BUILTIN_TOOLS:
+                resolved.append({"type": tool})
+            else:
+                catalog_entry = self.tool_catalog.get_tool(tool)
+                if catalog_entry is None:
+                    raise FleetSpecError(f"Unknown tool {tool!r}")
+                # Rendered like enable_tools and get_tool_list_by_names render it, so their assistants hash the same
+                resolved.append(make_function_tool(catalog_entry))
+        return resolved
+
+    def desired_fields(self, entry):
+        """
+        Returns the managed fields of a spec entry, with tools resolved.
+        """
+        fields = {field: entry[field] for field in MANAGED_FIELDS if field in entry}
+        if "tools" in fields:
+            fields["tools"] = self.resolve_tools(fields["tools"])
+        return fields
+
+    def diff(self, entry, live):
+        """
+        Returns the change one spec entry needs against its live assistant, None if it does not exist yet.
+        """
+        desired = self.desired_fields(entry)
+        if live is None:
+            return FleetChange(entry["name"], "create", fields=desired)
+        changed = {
+            field: value for field, value in desired.items()
+            if field_hash(field, value) != field_hash(field, getattr(live, field, None))
+        }
+        return FleetChange(entry["name"], "update" if changed else "unchanged", live.id, changed)
+
+    def get_live_assistants(self):
+        """
+        Returns every live assistant by name, the newest one for duplicate names.
+        """
+        live = {}
+        # Newest first, so the first one seen for a name wins
+        for assistant in self.manager.iter_assistants(order="desc"):
+            live.setdefault(assistant.name, assistant)
+        return live
+
+    def plan(self, entries, live=None):
+        """
+        Returns the change each spec entry needs.
+
+        Args:
+            entries (list): The assistant entries of a fleet file.
+            live (dict): The live assistants by name, fetched when not given.
+
+        Returns:
+            list: A FleetChange per entry.
+        """
+        live = self.get_live_assistants() if live is None else live
+        return [self.diff(entry, live.get(entry["name"])) for entry in entries]
+
+    def apply_change(self, change):
+        """
+        Makes the one write call a change needs. Unchanged assistants make none.
+
+        Returns:
+            The created or updated assistant, None if unchanged.
+        """
+        if change.action == "create":
+            fields = change.fields
+            return self.manager.create_assistant(
+                model=fields["model"],
+                instructions=fields.get("instructions"),
+                name=change.name,
+                tools=fields.get("tools", []),
+                file_ids=fields.get("file_ids", []),
+                metadata=fields.get("metadata", {}),
+                description=fields.get("description"),
+            )
+        if change.action == "update":
+            return self.manager.modify_assistant(assistant_id=change.assistant_id, **change.fields)
+        return None
+
+    def apply(self, changes):
+        """
+        Applies changes concurrently.
+
+        Returns:
+            dict: created and updated (name to assistant ID), unchanged (names), failed (name to error).
+        """
+        result = {"created": {}, "updated": {}, "unchanged": [], "failed": {}}
+        writes = [change for change in changes if change.action != "unchanged"]
+        result["unchanged"] = [change.name for change in changes if change.action == "unchanged"]
+        if not writes:
+            return result
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="fleet") as executor:
+            futures = [(change, executor.submit(self.apply_change, change)) for change in writes]
+            for change, future in futures:
+                try:
+                    assistant = future.result()
+                except Exception as e:
+                    logger.error(f"Could not {change.action} assistant {change.name}: {e}")
+                    result["failed"][change.name] = str(e)
+                    continue
+                key = "created" if change.action == "create" else "updated"
+                result[key][change.name] = assistant.id
+        return result
+
+    def reconcile(self, entries, dry_run=False):
+        """
+        Brings the live assistants in line with a fleet.
+
+        Args:
+            entries (list): The assistant entries of a fleet file.
+            dry_run (bool): Only plan, write nothing.
+
+        Returns:
+            dict: The apply result, or the plan for a dry run, plus writes and seconds.
+        """
+        started = time.monotonic()
+        changes = self.plan(entries)
+        if dry_run:
+            result = {
+                "plan": [
+                    {"name": change.name, "action": change.action, "fields": sorted(change.fields)}
+                    for change in changes
+                ],
+            }
+        else:
+            result = self.apply(changes)
+        result["writes"] = sum(1 for change in changes if change.action != "unchanged")
+        result["seconds"] = time.monotonic() - started
+        return result
+
+    def reconcile_one(self, entry):
+        """
+        Creates or updates a single assistant if it differs from its entry, looked up in the assistant catalog.
+
+        Returns:
+            str: The assistant ID.
+        """
+        assistant_id = self.manager.get_assistant_id_by_name(entry["name"])
+        live = self.manager.assistant_catalog.get_by_id(assistant_id) if assistant_id is not None else None
+        change = self.diff(entry, live)
+        assistant = self.apply_change(change)
+        return assistant.id if assistant is not None else live.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create and update assistants to match a fleet file.")
+    parser.add_argument("path", help="JSON or YAML fleet file.")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without writing anything.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Writes run at once.")
+    args = parser.parse_args()
+
+    from assistant_manager.assistant_manager import OAI_Assistant
+    manager = OAI_Assistant(api_key=os.environ.get('API_KEY'), organization=os.environ.get('ORG_ID'))
+    try:
+        entries = load_fleet_spec(args.path)
+        result = FleetReconciler(manager, concurrency=args.concurrency).reconcile(entries, dry_run=args.dry_run)
+    except FleetSpecError as e:
+        parser.exit(2, f"{e}\n")
+    print(json.dumps(result, indent=2))
+    if result.get("failed"):
+        parser.exit(1, f"{len(result['failed'])} assistants failed\n")
+
+
+if __name__ == "__main__":
+    main()
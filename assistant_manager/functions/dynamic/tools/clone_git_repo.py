@@ -0,0 +1,9 @@
+from git import Repo
+from git.exc import GitError
+
+def clone_git_repo(repo_link, save_location):
+    try:
+        Repo.clone_from(repo_link, save_location)
+        return True
+    except GitError as e:
+        return False
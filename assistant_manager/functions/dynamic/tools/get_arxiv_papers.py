@@ -0,0 +1,50 @@
+import requests
+from xml.etree import ElementTree as ET
+from assistant_manager.utils import transport
+
+def get_arxiv_papers(query: str, max_results: int = 5, sort_by: str = 'relevance', sort_order: str = 'descending'):
+    try:
+        # Define the base URL for the arXiv API query
+        base_url = 'https://export.arxiv.org/api/query'
+
+        # Set the payload for the query parameters
+        payload = {
+            'search_query': query,
+            'sortBy': sort_by,
+            'sortOrder': sort_order,
+            'max_results': max_results
+        }
+
+        # Send a GET request to the arXiv API
+        response = transport.get_requests_session().get(base_url, params=payload)
+
+        # If the response was successful, no Exception will be raised
+        response.raise_for_status()
+
+        # Parse the XML response content from arXiv
+        root = ET.fromstring(response.content)
+        results = []
+
+        # Extract paper information from each entry in the XML
+        for entry in root.findall('{http://www.w3.org/2005/Atom}entry'):
+            # Extract essential elements from the entry
+            title = entry.find('{http://www.w3.org/2005/Atom}title').text.strip()
+            summary = entry.find('{http://www.w3.org/2005/Atom}summary').text.strip()
+            published = entry.find('{http://www.w3.org/2005/Atom}published').text.strip()
+            link = entry.find('{http://www.w3.org/2005/Atom}link[@title="pdf"]').attrib['href']
+
+            # Accumulate the paper information into a list
+            results.append({
+                'title': title,
+                'summary': summary,
+                'published': published,
+                'link': link
+            })
+
+        return results
+    except requests.HTTPError as http_err:
+        print(f'HTTP error occurred: {http_err}')
+        return None
+    except Exception as err:
+        print(f'Other error occurred: {err}')
+        return None
@@ -0,0 +1,33 @@
+import requests
+from assistant_manager.utils import transport
+
+def get_weather_forecast(latitude: float, longitude: float, current_weather: bool = True, hourly_forecast: bool = False, daily_forecast: bool = False):
+    try:
+        # Define the base URL for the Open-Meteo API
+        base_url = 'https://api.open-meteo.com/v1/forecast'
+
+        # Set up the parameters for the API request
+        params = {
+            'latitude': latitude,
+            'longitude': longitude,
+            'current_weather': current_weather,
+            'hourly': hourly_forecast,
+            'daily': daily_forecast
+        }
+        # Filter out unwanted params (those that are set to False)
+        params = {k: v for k, v in params.items() if v is not False}
+
+        # Send a GET request to the Open-Meteo API
+        response = transport.get_requests_session().get(base_url, params=params)
+
+        # Raise an exception if the response was unsuccessful
+        response.raise_for_status()
+
+        # Return the JSON response if successful
+        return response.json()
+    except requests.HTTPError as http_err:
+        print(f'HTTP error occurred: {http_err}')
+        return None
+    except Exception as err:
+        print(f'Other error occurred: {err}')
+        return None
@@ -6,10 +6,20 @@ from . import interface_base
 from . import a_m_threads
 from . import oai_base
 from . import runs_manager
+from . import tool_dispatch
+from . import tool_registry
+from . import chat_session
+from . import run_orchestrator
+from . import bulk_import
+from . import fleet
+from . import async_oai_base
+from . import async_a_m_threads
+from . import async_runs_manager
+from . import async_assistant_chat
 
 
 # Init file for the assistant_manager package.
 #
 # This file is used to initialize the assistant_manager package.
 
-__all__ = ["assistant_manager", "a_m_threads", "assistant_chat" , "assistant_tools", "autogen_assistant_manager", "autogen_assistant_tools", "interface_base","runs_manager", "oai_assistant", "oai_base"]
+__all__ = ["assistant_manager", "a_m_threads", "assistant_chat" , "assistant_tools", "autogen_assistant_manager", "autogen_assistant_tools", "interface_base","runs_manager", "oai_assistant", "oai_base", "tool_dispatch", "tool_registry", "chat_session", "run_orchestrator", "bulk_import", "fleet", "async_oai_base", "async_a_m_threads", "async_runs_manager", "async_assistant_chat"]
@@ -4,6 +4,10 @@ class InterfaceBase():
         """Overwrite this function to change how the user is messaged"""
         print(message)
 
+    def message_user_delta(self, delta):
+        """Overwrite this function to change how streamed text is shown to the user, it is called once per text fragment"""
+        print(delta, end="", flush=True)
+
     def get_user_input(self):
         """Overwrite this function to change how the user is messaged"""
         # Get the input from the user
@@ -1,3 +1,4 @@
+import functools
 import logging
 from openai import OpenAI
 from typing import List, Optional
@@ -5,21 +6,46 @@ from openai import OpenAI
 from openai._types import NotGiven, NOT_GIVEN
 from openai.types.beta.threads import Message as ThreadMessage
 from assistant_manager.interface_base import InterfaceBase
+from assistant_manager.chat_session import SessionManager
+from assistant_manager.utils.message_store import MessageStore
+from assistant_manager.utils.pagination import iter_items
+from assistant_manager.utils.assistant_catalog import AssistantCatalog
+from assistant_manager.utils.rate_limiter import get_rate_limit_governor
+from assistant_manager.utils import transport
+from assistant_manager.utils.metrics import get_metrics, instrumented
+from assistant_manager.utils.tracing import get_tracer
 
 
 
-class OAI_Base(InterfaceBase):
+class OAI_Base(SessionManager, InterfaceBase):
+    # Seconds before the assistant catalog is refetched
+    assistant_catalog_ttl = 300.0
+
     def __init__(self, api_key, organization, timeout, log_level) -> None:
+        # Per-conversation state lives on sessions, see chat_session.py
+        self.init_sessions()
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(log_level)
         self.logger.info("Initializing AssistantManager")
-        self.open_ai = OpenAI(api_key=api_key, organization=organization, timeout=timeout)
+        # Every manager shares one connection pool, see utils/transport.py
+        # Every request is paced and retried by the shared rate limit governor, so the client itself doesn't retry
+        self.rate_limiter = get_rate_limit_governor()
+        # Call counts, errors and latency of the API wrappers and tools, see utils/metrics.py
+        self.metrics = get_metrics()
+        # Timing spans of each turn, see utils/tracing.py
+        self.tracer = get_tracer()
+        if timeout is None:
+            timeout = transport.get_timeout()
+        self.open_ai = OpenAI(api_key=api_key, organization=organization, timeout=timeout, max_retries=0, http_client=transport.get_http_client())
+        transport.warm_up(str(self.open_ai.base_url))
         self.client = self.open_ai.beta
         self.logger.debug(f"Initailized AssistantManager. self.client: {self.client}")
 
         # Set up some defaults to keep track of the current assistant, thread and run
+        # These are per-conversation and are stored on the default session
         self.current_assistant = None
-        self.assistants = self.list_assistants(limit=30)
+        # Fetched on first use, see the assistants property
+        self.assistant_catalog = AssistantCatalog(self.iter_assistants, ttl=self.assistant_catalog_ttl)
         self.current_thread = None
         self.current_thread_history = None
         self.current_run = None
@@ -32,10 +58,20 @@ class OAI_Base(InterfaceBase):
         self.tool_metadata = {}
         self.threads = None
         self.runs = {}
-        self.chat_ids = []
-        
+        # Per thread cursor and seen messages, see utils/thread_cursor.py
+        self.thread_cursors = {}
+        # Local copy of thread messages, synced incrementally
+        self.message_store = MessageStore()
+
+    @property
+    def assistants(self):
+        """
+        Every assistant on the account, newest first, served from the assistant catalog.
+        """
+        return self.assistant_catalog.get_assistants()
 
-    def create_assistant(self, model, instructions, name=None, tools=None, file_ids=None, metadata=None):
+    @instrumented
+    def create_assistant(self, model, instructions, name=None, tools=None, file_ids=None, metadata=None, description=NOT_GIVEN):
         """
         Create an assistant with a model and instructions.
 
@@ -62,17 +98,23 @@ class OAI_Base(InterfaceBase):
                 for storing additional information about the object in a structured format. Keys
                 can be a maximum of 64 characters long and values can be a maxium of 512
                 characters long.
+
+            description: The description of the assistant. The maximum length is 512 characters.
         """
-        return self.client.assistants.create(
+        assistant = self.client.assistants.create(
             model=model, 
             instructions=instructions, 
             name=name, 
             tools=tools, 
             file_ids=file_ids, 
-            metadata=metadata
+            metadata=metadata,
+            description=description
         )
+        self.assistant_catalog.upsert(assistant)
+        return assistant
 
 
+    @instrumented
     def modify_assistant(
         self,
         assistant_id: str,
@@ -116,7 +158,7 @@ class OAI_Base(InterfaceBase):
             timeout: Override the client-level default timeout for this request, in seconds
         """
        
-        return self.client.assistants.update(
+        assistant = self.client.assistants.update(
             assistant_id=assistant_id,
             model=model,
             name=name,
@@ -126,6 +168,8 @@ class OAI_Base(InterfaceBase):
             file_ids=file_ids,
             metadata=metadata,
         )
+        self.assistant_catalog.upsert(assistant)
+        return assistant
     
     def get_assistant_id_by_name(self, assistant_name, id=None):
         """
@@ -141,12 +185,10 @@ class OAI_Base(InterfaceBase):
         """
         
         if id is None:
-            assistants = self.list_assistants(limit=30)
-            for i, assistant in enumerate(assistants.data):
-                if assistant.name == assistant_name:
-                    assistant_id = assistant.id
-                    self.logger.debug(f"Assistant ID found: {assistant_id}")
-                    return assistant_id
+            assistant = self.assistant_catalog.get_by_name(assistant_name)
+            if assistant is not None:
+                self.logger.debug(f"Assistant ID found: {assistant.id}")
+                return assistant.id
             self.logger.error(f"Assistant ID not found: {assistant_name}")
             return None
         else:
@@ -154,6 +196,29 @@ class OAI_Base(InterfaceBase):
             return id
 
 
+    @instrumented
+    def retrieve_assistant(self, assistant_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+        """
+        Retrieves an assistant from the API and refreshes its entry in the assistant catalog.
+
+        Args:
+            assistant_id: The ID of the assistant to retrieve.
+            extra_headers: Send extra headers
+            extra_query: Add additional query parameters to the request
+            extra_body: Add additional JSON properties to the request
+            timeout: Override the client-level default timeout for this request, in seconds
+        """
+        assistant = self.client.assistants.retrieve(
+            assistant_id=assistant_id,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout
+        )
+        self.assistant_catalog.upsert(assistant)
+        return assistant
+
+    @instrumented
     def list_assistants(self, limit=20, order="desc", after=None, before=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
         """
         Returns a list of assistants.
@@ -187,6 +252,34 @@ class OAI_Base(InterfaceBase):
             timeout=timeout
         )
 
+    def iter_assistants(self, order="desc", until=None, prefetch=True):
+        """
+        Yields every assistant, following the pagination cursor through all pages of 100.
+
+        Args:
+            order: Sort order by the `created_at` timestamp of the objects. `asc` or `desc`.
+            until: If given, stops after the first assistant for which until(assistant) is True.
+            prefetch: Fetch the next page in the background while the current one is consumed.
+        """
+        fetch_page = functools.partial(self.list_assistants, order=order)
+        return iter_items(fetch_page, until=until, prefetch=prefetch)
+
+    @instrumented
+    def upload_file(self, file_name, purpose="assistants"):
+        """
+        Uploads a local file to the Files API.
+
+        Args:
+            file_name (str): The path of the file to upload.
+            purpose (str): The purpose of the file, "assistants" for files assistants can use.
+
+        Returns:
+            FileObject: The uploaded file.
+        """
+        with open(file_name, 'rb') as f:
+            return self.open_ai.files.create(file=f, purpose=purpose)
+
+    @instrumented
     def create_assistant_file(self, assistant_id, file_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
         """
         Create an assistant file by attaching a
@@ -212,6 +305,7 @@ class OAI_Base(InterfaceBase):
             timeout=timeout
         )
 
+    @instrumented
     def retrieve_assistant_file(self, assistant_id, file_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
             """
             Retrieves an AssistantFile.
@@ -233,6 +327,7 @@ class OAI_Base(InterfaceBase):
                     timeout=timeout
             )
 
+    @instrumented
     def delete_assistant_file(self, assistant_id, file_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
             """
             Delete an assistant file.
@@ -254,6 +349,7 @@ class OAI_Base(InterfaceBase):
                     timeout=timeout
             )
 
+    @instrumented
     def list_assistant_files(self, assistant_id, limit=20, order="desc", after=None, before=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
         """
         Returns a list of assistant files.
@@ -289,7 +385,20 @@ class OAI_Base(InterfaceBase):
             timeout=timeout
         )
 
+    def iter_assistant_files(self, assistant_id, order="desc", until=None, prefetch=True):
+        """
+        Yields every file of an assistant, following the pagination cursor through all pages of 100.
+
+        Args:
+            assistant_id: The ID of the assistant for which the files should be listed.
+            order: Sort order by the `created_at` timestamp of the objects. `asc` or `desc`.
+            until: If given, stops after the first file for which until(file) is True.
+            prefetch: Fetch the next page in the background while the current one is consumed.
+        """
+        fetch_page = functools.partial(self.list_assistant_files, assistant_id=assistant_id, order=order)
+        return iter_items(fetch_page, until=until, prefetch=prefetch)
 
+    @instrumented
     def create_thread(self, messages=None, metadata=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
         """
         Create a thread.
@@ -315,6 +424,7 @@ class OAI_Base(InterfaceBase):
             timeout=timeout
         )
 
+    @instrumented
     def retrieve_thread(self, thread_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
             """
             Retrieves a thread.
@@ -334,6 +444,7 @@ class OAI_Base(InterfaceBase):
                     timeout=timeout
             )
 
+    @instrumented
     def modify_thread(self, thread_id, metadata=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
         """
         Modifies a thread.
@@ -358,6 +469,7 @@ class OAI_Base(InterfaceBase):
             timeout=timeout
         )
 
+    @instrumented
     def delete_thread(self, thread_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
             """
             Delete a thread.
@@ -378,7 +490,8 @@ class OAI_Base(InterfaceBase):
             )
 
 
-    def create_message(self, thread_id, role, content, file_ids=NotGiven, metadata=NotGiven, timeout=NotGiven) -> ThreadMessage:
+    @instrumented
+    def create_message(self, thread_id, role, content, file_ids=NOT_GIVEN, metadata=NOT_GIVEN, timeout=NOT_GIVEN) -> ThreadMessage:
         """
         Create a message.
 
@@ -402,7 +515,10 @@ class OAI_Base(InterfaceBase):
         return self.client.threads.messages.create(
             thread_id=thread_id, 
             role=role, 
-            content=content
+            content=content,
+            file_ids=file_ids,
+            metadata=metadata,
+            timeout=timeout
         )
 
     def retrieve_message(self, thread_id, message_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
@@ -417,19 +533,34 @@ class OAI_Base(InterfaceBase):
                 extra_body: Add additional JSON properties to the request
                 timeout: Override the client-level default timeout for this request, in seconds
             """
+            # Messages don't change once created, so a stored copy is always good
+            message = self.message_store.get_message(thread_id, message_id)
+            if message is not None:
+                self.metrics.record_local_hit("retrieve_message")
+                return message
             try:
-                return self.client.threads.messages.retrieve(
-                        thread_id=thread_id,
-                        message_id=message_id,
-                        extra_headers=extra_headers,
-                        extra_query=extra_query,
-                        extra_body=extra_body,
-                        timeout=timeout
-                )
+                message = self.fetch_message(thread_id, message_id, extra_headers=extra_headers, extra_query=extra_query, extra_body=extra_body, timeout=timeout)
             except Exception as e:
                 print(f"Error retrieving message: {e}")
                 return None
+            self.message_store.save_messages(thread_id, [message])
+            return message
+
+    @instrumented(operation="retrieve_message")
+    def fetch_message(self, thread_id, message_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+            """
+            Retrieves a message from the API, bypassing the message store. Arguments as for retrieve_message.
+            """
+            return self.client.threads.messages.retrieve(
+                    thread_id=thread_id,
+                    message_id=message_id,
+                    extra_headers=extra_headers,
+                    extra_query=extra_query,
+                    extra_body=extra_body,
+                    timeout=timeout
+            )
 
+    @instrumented
     def modify_message(self, thread_id, message_id, metadata=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
         """
         Modifies a message.
@@ -446,7 +577,7 @@ class OAI_Base(InterfaceBase):
             extra_body: Add additional JSON properties to the request
             timeout: Override the client-level default timeout for this request, in seconds
         """
-        return self.client.threads.messages.update(
+        message = self.client.threads.messages.update(
             thread_id=thread_id,
             message_id=message_id,
             metadata=metadata,
@@ -455,7 +586,11 @@ class OAI_Base(InterfaceBase):
             extra_body=extra_body,
             timeout=timeout
         )
+        # Metadata is the one part of a message that can change, keep the stored copy current
+        self.message_store.save_messages(thread_id, [message])
+        return message
 
+    @instrumented
     def list_messages(self, thread_id, limit=20, order="desc", after=None, before=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
         """
         Returns a list of messages for a given thread.
@@ -491,6 +626,21 @@ class OAI_Base(InterfaceBase):
             timeout=timeout
         )
 
+    def iter_messages(self, thread_id, order="asc", after=None, until=None, prefetch=True):
+        """
+        Yields every message of a thread, following the pagination cursor through all pages of 100.
+
+        Args:
+            thread_id: The ID of the thread to list messages from.
+            order: Sort order by the `created_at` timestamp of the objects. `asc` or `desc`.
+            after: Start after this message ID, None starts at the beginning.
+            until: If given, stops after the first message for which until(message) is True.
+            prefetch: Fetch the next page in the background while the current one is consumed.
+        """
+        fetch_page = functools.partial(self.list_messages, thread_id=thread_id, order=order)
+        return iter_items(fetch_page, after=after, until=until, prefetch=prefetch)
+
+    @instrumented
     def retrieve_message_file(self, thread_id, message_id, file_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
             """
             Retrieves a message file.
@@ -514,6 +664,7 @@ class OAI_Base(InterfaceBase):
                     timeout=timeout
             )
 
+    @instrumented
     def list_message_files(self, thread_id, message_id, limit=20, order="desc", after=None, before=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
         """
         Returns a list of message files.
@@ -551,8 +702,22 @@ class OAI_Base(InterfaceBase):
             timeout=timeout
         )
 
+    def iter_message_files(self, thread_id, message_id, order="desc", until=None, prefetch=True):
+        """
+        Yields every file of a message, following the pagination cursor through all pages of 100.
+
+        Args:
+            thread_id: The ID of the thread the message belongs to.
+            message_id: The ID of the message to list files from.
+            order: Sort order by the `created_at` timestamp of the objects. `asc` or `desc`.
+            until: If given, stops after the first file for which until(file) is True.
+            prefetch: Fetch the next page in the background while the current one is consumed.
+        """
+        fetch_page = functools.partial(self.list_message_files, thread_id=thread_id, message_id=message_id, order=order)
+        return iter_items(fetch_page, until=until, prefetch=prefetch)
 
-    def submit_tool_outputs(self, thread_id, run_id, tool_outputs):
+    @instrumented
+    def submit_tool_outputs(self, thread_id, run_id, tool_outputs, stream: bool | NotGiven = NOT_GIVEN):
         """
         Submits tool outputs for a run.
 
@@ -560,6 +725,7 @@ class OAI_Base(InterfaceBase):
         thread_id: The ID of the thread the run belongs to.
         run_id: The ID of the run to submit tool outputs for.
         tool_outputs: A list of tool outputs to submit. Each output should be a dictionary with a 'tool_call_id' and an 'output'.
+        stream: If True, returns a stream of the run's events instead of the run.
 
         Example:
         submit_tool_outputs(
@@ -576,7 +742,8 @@ class OAI_Base(InterfaceBase):
         run = self.client.threads.runs.submit_tool_outputs(
             thread_id=thread_id,
             run_id=run_id,
-            tool_outputs=tool_outputs
+            tool_outputs=tool_outputs,
+            stream=stream
         )
         self.logger.debug(f"Submitted tool outputs for run {run_id}")
 
@@ -0,0 +1,191 @@
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from assistant_manager.utils.poll_scheduler import percentile
+
+#
+# Queues run requests from many callers and executes them on a manager.
+# The Assistants API allows one active run per thread, so requests for the same thread run
+# one after the other in submission order. Requests for different threads run in parallel up to
+# max_in_flight. When more threads are waiting than there are slots, tenants take turns so one
+# busy tenant cannot starve the others.
+#
+
+
+class RunRequest():
+    def __init__(self, thread_id, assistant_id, tenant, run_kwargs):
+        self.thread_id = thread_id
+        self.assistant_id = assistant_id
+        self.tenant = tenant
+        self.run_kwargs = run_kwargs
+        self.future = Future()
+        # The caller's context, so the run uses the caller's active session
+        self.context = contextvars.copy_context()
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+
+class RunOrchestrator():
+    def __init__(self, manager, max_in_flight=8, max_wait_samples=1000):
+        """
+        Initializes an idle orchestrator.
+
+        Args:
+            manager: The Run_Manager whose execute_run performs the runs.
+            max_in_flight (int): How many runs can be active at once across all threads.
+            max_wait_samples (int): How many recent queue wait times to keep for get_stats().
+        """
+        self.manager = manager
+        self.max_in_flight = max_in_flight
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="run_orchestrator")
+        self.lock = threading.Lock()
+        # Pending requests per thread, oldest first
+        self.thread_queues = {}
+        # Threads with an active run
+        self.active_threads = set()
+        # Threads ready to start their next run, per tenant, tenants in round robin order
+        self.ready = OrderedDict()
+        self.queued_by_tenant = {}
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_seconds = deque(maxlen=max_wait_samples)
+
+    def submit(self, thread_id, assistant_id=None, tenant="default", **run_kwargs):
+        """
+        Queues a run on a thread.
+
+        Args:
+            thread_id (str): The ID of the thread to run.
+            assistant_id (str): The ID of the assistant to run, defaults to the manager's assistant.
+            tenant (str): Who the run is for, tenants share the in-flight slots fairly.
+            **run_kwargs: Passed on to execute_run, e.g. poll_scheduler.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the run's reply text, or None if the run failed.
+                Async callers can await asyncio.wrap_future(future).
+        """
+        request = RunRequest(thread_id, assistant_id, tenant, run_kwargs)
+        with self.lock:
+            self.submitted += 1
+            self.queued_by_tenant[tenant] = self.queued_by_tenant.get(tenant, 0) + 1
+            queue = self.thread_queues.setdefault(thread_id, deque())
+            queue.append(request)
+            if len(queue) == 1 and thread_id not in self.active_threads:
+                self.mark_ready(thread_id)
+            self.dispatch()
+        return request.future
+
+    def mark_ready(self, thread_id):
+        """
+        Files a thread with pending requests under the tenant of its next request. Call with the lock held.
+        """
+        queue = self.thread_queues.get(thread_id)
+        if queue:
+            self.ready.setdefault(queue[0].tenant, deque()).append(thread_id)
+
+    def dispatch(self):
+        """
+        Starts ready runs until the in-flight cap is reached. Call with the lock held.
+        """
+        while self.in_flight < self.max_in_flight and self.ready:
+            tenant, threads = next(iter(self.ready.items()))
+            thread_id = threads.popleft()
+            # The tenant goes to the back of the line, or leaves it if it has nothing else ready
+            if threads:
+                self.ready.move_to_end(tenant)
+            else:
+                del self.ready[tenant]
+            queue = self.thread_queues[thread_id]
+            request = queue.popleft()
+            if not queue:
+                del self.thread_queues[thread_id]
+            self.queued_by_tenant[tenant] -= 1
+            if self.queued_by_tenant[tenant] == 0:
+                del self.queued_by_tenant[tenant]
+            if not request.future.set_running_or_notify_cancel():
+                # Cancelled while queued, the thread can go straight on to its next request
+                self.mark_ready(thread_id)
+                continue
+            self.active_threads.add(thread_id)
+            self.in_flight += 1
+            request.started_at = time.monotonic()
+            self.wait_seconds.append(request.started_at - request.submitted_at)
+            self.executor.submit(request.context.run, self.execute, request)
+
+    def execute(self, request):
+        """
+        Performs one run on a worker and starts whatever was waiting on its thread.
+        """
+        succeeded = False
+        try:
+            with self.manager.tracer.span("queued_run", thread_id=request.thread_id, tenant=request.tenant,
+                                          queue_wait_seconds=request.started_at - request.submitted_at):
+                result = self.manager.execute_run(request.thread_id, request.assistant_id, **request.run_kwargs)
+        except Exception as e:
+            request.future.set_exception(e)
+        else:
+            request.future.set_result(result)
+            succeeded = result is not None
+        finally:
+            request.finished_at = time.monotonic()
+            with self.lock:
+                self.in_flight -= 1
+                self.active_threads.discard(request.thread_id)
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self.mark_ready(request.thread_id)
+                self.dispatch()
+
+    def queue_depth(self, thread_id=None):
+        """
+        Returns how many requests are waiting, on one thread or in total.
+        """
+        with self.lock:
+            if thread_id is not None:
+                return len(self.thread_queues.get(thread_id, ()))
+            return sum(self.queued_by_tenant.values())
+
+    def get_stats(self):
+        """
+        Returns queue depth, in-flight runs, outcome counts and recent queue wait times.
+
+        Returns:
+            dict: The stats, wait times are in seconds.
+        """
+        with self.lock:
+            waits = sorted(self.wait_seconds)
+            stats = {
+                "queued": sum(self.queued_by_tenant.values()),
+                "queued_by_tenant": dict(self.queued_by_tenant),
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+        if waits:
+            stats["mean_wait_seconds"] = sum(waits) / len(waits)
+            stats["p50_wait_seconds"] = percentile(waits, 50)
+            stats["p99_wait_seconds"] = percentile(waits, 99)
+            stats["max_wait_seconds"] = waits[-1]
+        return stats
+
+    def shutdown(self, wait=True):
+        """
+        Stops the workers. Queued requests that have not started are cancelled.
+        """
+        with self.lock:
+            for queue in self.thread_queues.values():
+                for request in queue:
+                    request.future.cancel()
+            self.thread_queues.clear()
+            self.ready.clear()
+            self.queued_by_tenant.clear()
+        self.executor.shutdown(wait=wait)
@@ -1,20 +1,33 @@
 #oai base
-import inspect
+import functools
 import json
+import threading
 import time
-from assistant_manager.functions.dynamic import dynamic_functions
-from assistant_manager.utils import file_operations, special_functions
-from assistant_manager.utils.special_functions import append_new_tool_function_and_metadata
+from openai._types import NotGiven, NOT_GIVEN
 from assistant_manager.interface_base import InterfaceBase
 from assistant_manager.a_m_threads import OAI_Threads
+from assistant_manager.tool_dispatch import ToolDispatch
+from assistant_manager.run_orchestrator import RunOrchestrator
+from assistant_manager.utils.poll_scheduler import PollScheduler, PollStats
+from assistant_manager.utils.metrics import instrumented
+from assistant_manager.utils.tracing import traced
+from assistant_manager.utils.pagination import iter_items
 
-class Run_Manager(OAI_Threads):
+class Run_Manager(OAI_Threads, ToolDispatch):
+    # How many runs the run orchestrator keeps active at once across all threads
+    max_runs_in_flight = 8
+    run_orchestrator = None
+    run_orchestrator_lock = threading.Lock()
 
     def __init__(self, api_key, organization, timeout, log_level) -> None:
         super().__init__(api_key, organization, timeout, log_level)
+        # How long to wait between retrieve_run polls, can be overridden per run
+        self.poll_scheduler = PollScheduler()
+        self.poll_stats = PollStats()
 
 
-    def create_run(self, thread_id, assistant_id, model=None, instructions=None, tools=None, metadata=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
+    @instrumented
+    def create_run(self, thread_id, assistant_id, model=None, instructions=None, tools=None, metadata=None, stream: bool | NotGiven = NOT_GIVEN, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
             """
             Create a run.
 
@@ -25,6 +38,7 @@ class Run_Manager(OAI_Threads):
                 instructions: Override the default system message of the assistant. This is useful for modifying the behavior on a per-run basis.
                 tools: Override the tools the assistant can use for this run. This is useful for modifying the behavior on a per-run basis.
                 metadata: Set of 16 key-value pairs that can be attached to an object. This can be useful for storing additional information about the object in a structured format. Keys can be a maximum of 64 characters long and values can be a maxium of 512 characters long.
+                stream: If True, returns a stream of the run's events instead of the run.
                 extra_headers: Send extra headers
                 extra_query: Add additional query parameters to the request
                 extra_body: Add additional JSON properties to the request
@@ -37,12 +51,14 @@ class Run_Manager(OAI_Threads):
                     instructions=instructions, 
                     tools=tools, 
                     metadata=metadata,
+                    stream=stream,
                     extra_headers=extra_headers,
                     extra_query=extra_query,
                     extra_body=extra_body,
                     timeout=timeout
             )
 
+    @instrumented
     def retrieve_run(self, thread_id, run_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
             """
             Retrieves a run.
@@ -64,6 +80,7 @@ class Run_Manager(OAI_Threads):
                     timeout=timeout
             )
 
+    @instrumented
     def update_run(self, thread_id, run_id, metadata=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
             """
             Modifies a run.
@@ -87,6 +104,7 @@ class Run_Manager(OAI_Threads):
                     timeout=timeout
             )
 
+    @instrumented
     def list_runs(self, thread_id, limit=20, order="desc", after=None, before=None, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
             """
             Returns a list of runs belonging to a thread.
@@ -114,6 +132,20 @@ class Run_Manager(OAI_Threads):
                     timeout=timeout
             )
     
+    def iter_runs(self, thread_id, order="desc", until=None, prefetch=True):
+            """
+            Yields every run of a thread, following the pagination cursor through all pages of 100.
+
+            Args:
+                thread_id: The ID of the thread to list runs from.
+                order: Sort order by the `created_at` timestamp of the objects. `asc` or `desc`.
+                until: If given, stops after the first run for which until(run) is True.
+                prefetch: Fetch the next page in the background while the current one is consumed.
+            """
+            fetch_page = functools.partial(self.list_runs, thread_id=thread_id, order=order)
+            return iter_items(fetch_page, until=until, prefetch=prefetch)
+
+    @instrumented
     def cancel_run(self, thread_id, run_id, extra_headers=None, extra_query=None, extra_body=None, timeout=None):
             """
             Cancels a run.
@@ -135,144 +167,200 @@ class Run_Manager(OAI_Threads):
                     timeout=timeout
             )
 
-    def process_run(self,thread_id, run_id):
+    def process_run(self, thread_id, run_id, poll_scheduler=None):
+        """
+        Polls a run until it finishes, running any tools it asks for.
+
+        Args:
+            thread_id (str): The ID of the thread the run belongs to.
+            run_id (str): The ID of the run to process.
+            poll_scheduler (PollScheduler): The poll schedule for this run, defaults to self.poll_scheduler.
+
+        Returns:
+            str: The text of the run's new assistant messages, or None if the run failed.
+        """
+        poll_scheduler = poll_scheduler or self.poll_scheduler
+        delays = poll_scheduler.delays()
+        polls = 0
+        started = time.monotonic()
         while True:
-            run = self.retrieve_run(thread_id, run_id)
+            with self.tracer.span("poll", run_id=run_id, poll=polls + 1) as span:
+                run = self.retrieve_run(thread_id, run_id)
+                if span is not None:
+                    span.set_attribute("status", run.status)
+            polls += 1
             print(run.status)
             if run.status == "completed":
-                message_list = self.list_messages(thread_id)
-                for message in message_list.data:
-                    if message.id in self.chat_ids:
-                        continue
-                    else:
-                        print(f'assistant: {message.content[0].text.value}')
-                        self.chat_ids.append(message.id)
-                        return message.content[0].text.value
-                break
+                self.poll_stats.record(run_id, polls, time.monotonic() - started, run.status)
+                with self.tracer.span("fetch_messages", thread_id=thread_id):
+                    new_messages = self.fetch_new_messages(thread_id, run_id=run_id)
+                replies = [message.content[0].text.value for message in new_messages if message.role == "assistant"]
+                return "\n\n".join(replies)
             elif run.status == "requires_action":
                 print("The run requires action.")
-                required_actions_json = run.required_action.submit_tool_outputs.model_dump_json(indent=4)
-                print(f"Required Actions: {required_actions_json}")
-                required_actions = json.loads(required_actions_json)
-                tools_output = []
-                for action in required_actions["tool_calls"]:
-                    if action["function"]["name"] == "append_new_tool_function_and_metadata":
-                        arguments = json.loads(action["function"]["arguments"])
-                        # get the function name
-                        function_name = arguments["function_name"]
-                        # get the function code
-                        function_code = arguments["function_code"]
-                        # get the metadata dict
-                        function_metadata = arguments["metadata_dict"]
-
-                        function_meta_description = arguments["tool_meta_description"]
-                        #Check if we need to json.loads the metadata
-                        if isinstance(function_metadata, str):
-                            function_metadata = json.loads(arguments["metadata_dict"])
-                        #print(f"Function name: {function_name}")
-                        self.logger.debug(f"Function code: {function_code}")
-                        #print(f"Function metadata: {function_metadata}")
-                        # append the function and metadata to the current assistant
-                        function_output = append_new_tool_function_and_metadata(function_name, function_code, function_metadata, function_meta_description)
-                        #function_output = append_new_tool_function_and_metadata(self, **(arguments))
-                        tools_output.append({"tool_call_id": action["id"], "output": str(function_output)})
-                        continue
-                        
-                    # Functions Dynamically registered in the utils/special_functions.py file    
-                    elif action["function"]["name"] in dir(special_functions):
-                        arguments = json.loads(action["function"]["arguments"])
-                        function_name = action["function"]["name"]
-                        function = getattr(special_functions, function_name)
-                        #check if the arguments are a string and if so convert to dict
-                        if isinstance(arguments, str):
-                            arguments = json.loads(arguments)
-                        # Does the function need self?
-                        if "assistant" in inspect.getfullargspec(function).args:
-                            function_output = function(self, **(arguments))
-                        else:
-                            function_output = function(**(arguments))
-                        tools_output.append({"tool_call_id": action["id"], "output": str(function_output)})
-
-                    # Functions Dynamically registered in the utils/file_operations.py file
-                    elif action["function"]["name"] in dir(file_operations):
-                        arguments = json.loads(action["function"]["arguments"])
-                        if isinstance(arguments, str):
-                            arguments = json.loads(arguments)
-                        function_name = action["function"]["name"]
-                        function = getattr(file_operations, function_name)
-                        #check if the arguments are a string and if so convert to dict
-                        function_output = function(**(arguments))
-                        tools_output.append({"tool_call_id": action["id"], "output": str(function_output)})
-
-                    #functions registerd on self
-                    elif action["function"]["name"] in dir(self):
-                        arguments = json.loads(action["function"]["arguments"])
-                        function_name = action["function"]["name"]
-                        function = getattr(self, function_name)
-                        #check if the arguments are a string and if so convert to dict
-                        print(f"ARGUMENTS {arguments}")
-                        if isinstance(arguments, str):
-                            arguments = json.loads(arguments)
-                        function_output = function(**(arguments))
-                        # give it time to process
-                        time.sleep(2)
-                        tools_output.append({"tool_call_id": action["id"], "output": str(function_output)})
-                        
-                    #functions registered in the dynamic_functions.py file
-                    elif action["function"]["name"] in dir(dynamic_functions):
-                        
-                        arguments = json.loads(action["function"]["arguments"])
-                        function_name = action["function"]["name"]
-                        function = getattr(dynamic_functions, function_name)
-                        #check if the arguments are a string and if so convert to dict
-                        function_output = function(**(arguments))
-                        # give it time to process
-                        time.sleep(2)
-                        
-                        tools_output.append({"tool_call_id": action["id"], "output": str(function_output)})
-                    else:
-                        print(f"Function {action['function']['name']} not found")
+                tool_calls = run.required_action.submit_tool_outputs.tool_calls
+                self.logger.debug(f"Required Actions: {tool_calls}")
+                with self.tracer.span("tool_calls", count=len(tool_calls)):
+                    tools_output = self.run_tool_calls(tool_calls, thread_id=thread_id)
                 #message_user(f"Tools Output: {tools_output}")
                 self.submit_tool_outputs(thread_id, run.id, tools_output)
+                # The run is moving again, go back to polling fast
+                delays = poll_scheduler.delays()
 
-            elif run.status == "failed":
-                print("The run failed.")
+            elif run.status in ["failed", "cancelled", "expired"]:
+                self.poll_stats.record(run_id, polls, time.monotonic() - started, run.status)
+                print(f"The run {run.status}.")
                 print(f"Error: {json.dumps(str(run), indent=4)}")
                 return None
             else:
-                time.sleep(2)
+                delay = next(delays)
+                with self.tracer.span("poll_sleep", seconds=delay):
+                    time.sleep(delay)
                 continue
 
-    def perform_run(self, thread_id, assistant_id=None or str):
+    def process_run_stream(self, thread_id, stream):
+        """
+        Consumes a run's event stream, sending text to the user as it arrives and
+        running any tools the run asks for without polling. The run is kept in self.runs
+        from its thread.run.created event until the stream ends.
+
+        Args:
+            thread_id (str): The ID of the thread the run belongs to.
+            stream: The event stream returned by create_run(..., stream=True).
+
+        Returns:
+            str: The text of the last assistant message, or None if the run failed.
         """
-        Creates a run
+        reply = None
+        runs = self.runs
+        run_id = None
+        try:
+            while stream is not None:
+                next_stream = None
+                for event in stream:
+                    if event.event == "thread.run.created":
+                        # Registered as soon as the API knows the run, so it can be looked up or cancelled
+                        run_id = event.data.id
+                        runs[run_id] = event.data
+                    elif event.event == "thread.message.created":
+                        self.message_user_delta(f"{event.data.role}: ")
+                    elif event.event == "thread.message.delta":
+                        for content in event.data.delta.content or []:
+                            if content.type == "text" and content.text is not None and content.text.value:
+                                self.message_user_delta(content.text.value)
+                    elif event.event == "thread.message.completed":
+                        self.message_user_delta("\n")
+                        self.get_thread_cursor(thread_id).mark_seen(event.data.id)
+                        reply = event.data.content[0].text.value
+                    elif event.event == "thread.run.requires_action":
+                        run = event.data
+                        tool_calls = run.required_action.submit_tool_outputs.tool_calls
+                        with self.tracer.span("tool_calls", count=len(tool_calls)):
+                            tools_output = self.run_tool_calls(tool_calls, thread_id=thread_id)
+                        # The run carries on in a new stream once the outputs are in
+                        next_stream = self.submit_tool_outputs(thread_id, run.id, tools_output, stream=True)
+                        break
+                    elif event.event in ["thread.run.failed", "thread.run.cancelled", "thread.run.expired"]:
+                        self.logger.error(f"Run {event.data.id} ended with status {event.data.status}: {event.data.last_error}")
+                        return None
+                    elif event.event == "error":
+                        self.logger.error(f"Run stream error: {event.data}")
+                        return None
+                stream.close()
+                stream = next_stream
+            return reply
+        finally:
+            if run_id is not None:
+                runs.pop(run_id, None)
+
+    @traced("run", "thread_id", "assistant_id", "stream")
+    def execute_run(self, thread_id, assistant_id=None, poll_scheduler=None, stream=False):
         """
+        Creates a run and processes it until it finishes. The run is kept in self.runs while it is active.
+
+        Args:
+            thread_id (str): The ID of the thread to run.
+            assistant_id (str): The ID of the assistant to run, defaults to self.assistant_id.
+            poll_scheduler (PollScheduler): The poll schedule for this run, defaults to self.poll_scheduler.
+            stream (bool): Stream the reply to the user as it is generated instead of polling the run.
 
+        Returns:
+            str: The text of the run's new assistant messages, or None if the run failed.
+        """
         if assistant_id is None:
-            run = self.create_run(thread_id=thread_id, assistant_id=self.assistant_id)
-        else:
-            run = self.create_run(thread_id=thread_id, assistant_id=assistant_id)
+            assistant_id = self.assistant_id
+        if stream:
+            run_stream = self.create_run(thread_id=thread_id, assistant_id=assistant_id, stream=True)
+            return self.process_run_stream(thread_id=thread_id, stream=run_stream)
+        run = self.create_run(thread_id=thread_id, assistant_id=assistant_id)
         self.logger.debug(f"Run created: {run}")
+        runs = self.runs
+        runs[run.id] = run
+        try:
+            return self.process_run(thread_id=thread_id, run_id=run.id, poll_scheduler=poll_scheduler)
+        finally:
+            runs.pop(run.id, None)
+
+    def get_run_orchestrator(self):
+        """
+        Returns the run orchestrator of this manager, creating it on first use.
+
+        Returns:
+            RunOrchestrator: Runs queued runs one at a time per thread, max_runs_in_flight at once.
+        """
+        if self.run_orchestrator is None:
+            with self.run_orchestrator_lock:
+                if self.run_orchestrator is None:
+                    self.run_orchestrator = RunOrchestrator(self, max_in_flight=self.max_runs_in_flight)
+        return self.run_orchestrator
+
+    def submit_run(self, thread_id, assistant_id=None, tenant="default", poll_scheduler=None, stream=False):
+        """
+        Queues a run on the run orchestrator. Safe to call from many threads, runs on the same
+        thread wait for each other instead of failing with "thread already has an active run".
+
+        Args:
+            thread_id (str): The ID of the thread to run.
+            assistant_id (str): The ID of the assistant to run, defaults to self.assistant_id.
+            tenant (str): Who the run is for, tenants get a fair share of the run slots.
+            poll_scheduler (PollScheduler): The poll schedule for this run, defaults to self.poll_scheduler.
+            stream (bool): Stream the reply to the user as it is generated instead of polling the run.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the run's reply text, or None if the run failed.
+        """
+        if assistant_id is None:
+            assistant_id = self.assistant_id
+        return self.get_run_orchestrator().submit(thread_id, assistant_id, tenant=tenant, poll_scheduler=poll_scheduler, stream=stream)
+
+    @traced("turn", "thread_id", "assistant_id", "stream")
+    def perform_run(self, thread_id, assistant_id=None, poll_scheduler=None, stream=False):
+        """
+        Creates a run and waits for it. The run is queued on the run orchestrator, so a turn
+        started while another run is active on the thread waits for it instead of colliding.
+
+        Args:
+            thread_id (str): The ID of the thread to run.
+            assistant_id (str): The ID of the assistant to run, defaults to self.assistant_id.
+            poll_scheduler (PollScheduler): The poll schedule for this run, defaults to self.poll_scheduler.
+            stream (bool): Stream the reply to the user as it is generated instead of polling the run.
+        """
+        if assistant_id is None:
+            assistant_id = self.assistant_id
+
+        run_done = self.submit_run(thread_id, assistant_id, poll_scheduler=poll_scheduler, stream=stream).result()
+        if stream:
+            if run_done is None:
+                self.logger.error(f"Streamed run failed on thread {thread_id}")
+            return run_done
 
-        run_done = self.process_run(thread_id=thread_id, run_id=run.id)
         self.logger.debug(f"Run processed: {run_done}")
         #Wait for the run to complete
         if run_done is not None:
             print("Run Completed")
-            message_list = self.list_thread_history()
-            #check for a new message in the thread
-            for message in message_list:
-                    message_obj = self.retrieve_message(thread_id=thread_id, message_id=message)
-                    if message_obj.id is None:
-                        continue
-                    if message_obj.id in self.chat_ids:
-                        #print("Message already seen")
-                        continue
-                    else:
-                        #message
-                        self.message_user(f'assistant: {message_obj.content[0].text.value}')
-                        # Put it in the chat_ids list so we don't repeat it
-                        self.chat_ids.append(message_obj.id)
+            #process_run already fetched the new messages past the thread cursor
+            if run_done:
+                self.message_user(f'assistant: {run_done}')
         else:
-                self.logger.error(f"Run failed: {run}")
+                self.logger.error(f"Run failed on thread {thread_id}")
 
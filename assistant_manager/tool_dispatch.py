@@ -0,0 +1,197 @@
+import contextvars
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from assistant_manager.tool_registry import ToolRegistry
+from assistant_manager.utils.special_functions import append_new_tool_function_and_metadata
+from assistant_manager.utils.tool_cache import CachePolicy, get_tool_cache
+from assistant_manager.utils.tool_catalog import get_tool_catalog
+from assistant_manager.utils.python_workers import execution_key
+from assistant_manager.utils.output_spill import get_output_spill
+
+#
+# This module contains the tool call dispatch shared by the sync and async run managers.
+#
+
+
+class ToolDispatch():
+    # How many tool calls can run at once across all runs of a manager
+    tool_workers = 8
+    tool_executor = None
+    tool_registry = None
+    tool_executor_lock = threading.Lock()
+
+    def get_tool_registry(self):
+        """
+        Returns the tool registry of this manager, creating it on first use.
+
+        Returns:
+            ToolRegistry: The map of tool name to callable.
+        """
+        if self.tool_registry is None:
+            with self.tool_executor_lock:
+                if self.tool_registry is None:
+                    self.tool_registry = ToolRegistry(self)
+        return self.tool_registry
+
+    def call_tool(self, function_name, arguments):
+        """
+        Calls a tool by name and returns its raw output.
+
+        Args:
+            function_name (str): The name of the tool the assistant asked for.
+            arguments (str or dict): The arguments of the tool call, as sent by the assistant.
+
+        Returns:
+            The output of the tool, or None if the tool was not found.
+            Tools registered on an async manager may return an awaitable.
+        """
+        # Size of the arguments as the assistant sent them, for the tool span
+        arguments_bytes = len(arguments) if isinstance(arguments, str) else len(json.dumps(arguments))
+        if isinstance(arguments, str):
+            arguments = json.loads(arguments)
+        #check if the arguments are still a string and if so convert to dict
+        if isinstance(arguments, str):
+            arguments = json.loads(arguments)
+
+        if function_name == "append_new_tool_function_and_metadata":
+            # get the function name
+            new_function_name = arguments["function_name"]
+            # get the function code
+            function_code = arguments["function_code"]
+            # get the metadata dict
+            function_metadata = arguments["metadata_dict"]
+
+            function_meta_description = arguments["tool_meta_description"]
+            #Check if we need to json.loads the metadata
+            if isinstance(function_metadata, str):
+                function_metadata = json.loads(arguments["metadata_dict"])
+            self.logger.debug(f"Function code: {function_code}")
+            # append the function and metadata to the current assistant
+            function_output = append_new_tool_function_and_metadata(new_function_name, function_code, function_metadata, function_meta_description)
+            # The new tool can be called once the registry is rebuilt, and outputs of an older version are stale
+            self.get_tool_registry().invalidate()
+            get_tool_cache().invalidate(new_function_name)
+            return function_output
+
+        entry = self.get_tool_registry().resolve(function_name)
+        if entry is None:
+            print(f"Function {function_name} not found")
+            return None
+        # Tools declaring "tool_cache" in their metadata are served from the tool cache
+        policy = CachePolicy.from_metadata(get_tool_catalog().get_tool(function_name))
+        if policy is not None:
+            return get_tool_cache().call(
+                function_name, arguments, policy, entry.function,
+                lambda: self.execute_tool(entry, arguments, arguments_bytes),
+            )
+        return self.execute_tool(entry, arguments, arguments_bytes)
+
+    def execute_tool(self, entry, arguments, arguments_bytes):
+        """
+        Calls a resolved tool, timing it in self.metrics and as a "tool" span.
+
+        Args:
+            entry (ToolEntry): The tool to call.
+            arguments (dict): The decoded arguments.
+            arguments_bytes (int): The size of the arguments as the assistant sent them.
+
+        Returns:
+            The output of the tool.
+        """
+        started = time.perf_counter()
+        failed = True
+        try:
+            with self.tracer.span("tool", tool=entry.name, arguments_bytes=arguments_bytes):
+                function_output = self.get_tool_registry().call(entry, arguments)
+            failed = False
+            return function_output
+        finally:
+            self.metrics.record_tool_call(entry.name, time.perf_counter() - started, failed)
+
+    def run_tool_call(self, tool_call):
+        """
+        Runs a single tool call from a run's required action.
+
+        Args:
+            tool_call: A tool call from run.required_action.submit_tool_outputs.tool_calls.
+
+        Returns:
+            dict: The tool output with a 'tool_call_id' and an 'output', ready for submit_tool_outputs.
+        """
+        function_output = self.call_tool(tool_call.function.name, tool_call.function.arguments)
+        return {"tool_call_id": tool_call.id, "output": self.govern_output(tool_call.function.name, function_output)}
+
+    def govern_output(self, function_name, function_output):
+        """
+        Returns a tool output as the text to submit, spilling it to an artifact if it is over budget.
+
+        Args:
+            function_name (str): The tool that produced the output.
+            function_output: The output of the tool.
+
+        Returns:
+            str: The output, or a head/tail summary referencing the artifact.
+        """
+        spill = get_output_spill()
+        text = str(function_output)
+        artifact = spill.spill(function_name, text, execution_key.get())
+        if artifact is None:
+            return text
+        file_id = None
+        if spill.settings["upload"]:
+            try:
+                file_id = self.upload_file(artifact.path).id
+            except Exception as e:
+                self.logger.warning(f"Could not upload artifact {artifact.artifact_id}: {e}")
+        self.logger.info(f"Spilled {artifact.size_chars} characters of {function_name} output to {artifact.path}")
+        return artifact.summary(spill.settings["budget_chars"], file_id)
+
+    def get_tool_executor(self):
+        """
+        Returns the worker pool tool calls run on, creating it on first use.
+
+        Returns:
+            ThreadPoolExecutor: The tool worker pool, bounded by self.tool_workers.
+        """
+        if self.tool_executor is None:
+            with self.tool_executor_lock:
+                if self.tool_executor is None:
+                    self.tool_executor = ThreadPoolExecutor(max_workers=self.tool_workers, thread_name_prefix="tool_call")
+        return self.tool_executor
+
+    def submit_tool_call(self, tool_call):
+        """
+        Starts a tool call on the worker pool.
+        The caller's context is copied so context variables follow the call into the worker.
+
+        Args:
+            tool_call: A tool call from run.required_action.submit_tool_outputs.tool_calls.
+
+        Returns:
+            Future: A future for the tool output dict.
+        """
+        context = contextvars.copy_context()
+        return self.get_tool_executor().submit(context.run, self.run_tool_call, tool_call)
+
+    def run_tool_calls(self, tool_calls, thread_id=None):
+        """
+        Runs all the tool calls of a required action concurrently.
+
+        Args:
+            tool_calls (list): The tool calls of the required action.
+            thread_id (str): The thread of the run, exec_python keeps its interpreter state per thread.
+
+        Returns:
+            list: The tool output dicts, in the same order as the tool calls.
+        """
+        token = execution_key.set(thread_id) if thread_id is not None else None
+        try:
+            if len(tool_calls) == 1:
+                return [self.run_tool_call(tool_calls[0])]
+            futures = [self.submit_tool_call(tool_call) for tool_call in tool_calls]
+            return [future.result() for future in futures]
+        finally:
+            if token is not None:
+                execution_key.reset(token)
@@ -0,0 +1,173 @@
+import functools
+import inspect
+import threading
+from assistant_manager.utils import file_operations, special_functions
+from assistant_manager.utils.dynamic_tools import get_dynamic_tool_loader
+
+#
+# This module contains the tool registry: a map from tool name to a resolved callable,
+# built once instead of searching dir() of every tool module on each tool call.
+#
+
+
+class ToolEntry():
+    def __init__(self, name, function, source, needs_assistant, parameters):
+        """
+        A resolved tool and how to call it.
+
+        Args:
+            name (str): The name of the tool.
+            function (callable): The function to call.
+            source (str): Where the tool was found: special_functions, file_operations, self or dynamic_functions.
+            needs_assistant (bool): True if the assistant manager is passed as the first argument.
+            parameters (list): The names of the parameters the assistant fills in.
+        """
+        self.name = name
+        self.function = function
+        self.source = source
+        self.needs_assistant = needs_assistant
+        self.parameters = parameters
+
+    def __repr__(self):
+        return f"ToolEntry(name={self.name!r}, source={self.source!r}, parameters={self.parameters!r})"
+
+
+class ToolRegistry():
+    def __init__(self, assistant):
+        """
+        Initializes a tool registry for an assistant manager.
+
+        Args:
+            assistant: The assistant manager whose methods can be called as tools.
+        """
+        self.assistant = assistant
+        self.entries = None
+        self.dynamic_tools = get_dynamic_tool_loader()
+        # The dynamic tool index the map was built from
+        self.index_signature = None
+        self.lock = threading.Lock()
+
+    def build(self):
+        """
+        Builds the name to tool map.
+        Sources are searched in the same order process_run always used, the first match wins:
+        special_functions, file_operations, the assistant manager, dynamic_functions.
+
+        Returns:
+            dict: The map of tool name to ToolEntry.
+        """
+        entries = {}
+        # Lowest priority first so the higher priority sources overwrite.
+        # Dynamic tools are listed from their index and imported on their first call
+        for name in self.dynamic_tools.get_tool_names():
+            entries[name] = make_entry(name, self.dynamic_tools.get_tool(name), "dynamic_functions")
+        self.index_signature = self.dynamic_tools.index_signature
+        for name in dir(type(self.assistant)):
+            if name.startswith("_"):
+                continue
+            # Look the attribute up statically so properties are not evaluated
+            if not inspect.isfunction(inspect.getattr_static(type(self.assistant), name)):
+                continue
+            entries[name] = make_entry(name, getattr(self.assistant, name), "self")
+        for name, function in module_routines(file_operations):
+            entries[name] = make_entry(name, function, "file_operations")
+        for name, function in module_routines(special_functions):
+            entries[name] = make_entry(name, function, "special_functions")
+        return entries
+
+    def get_entries(self):
+        """
+        Returns the name to tool map, building it on first use.
+        """
+        entries = self.entries
+        if entries is None:
+            with self.lock:
+                if self.entries is None:
+                    self.entries = self.build()
+                entries = self.entries
+        return entries
+
+    def resolve(self, tool_name):
+        """
+        Returns the ToolEntry for a tool name, or None if there is no such tool.
+        The map is rebuilt if the dynamic tool index changed since it was built, whoever reread the
+        index, so new dynamic tools resolve without a restart.
+        """
+        entry = self.get_entries().get(tool_name)
+        if entry is None:
+            self.dynamic_tools.refresh_index()
+            if self.dynamic_tools.index_signature != self.index_signature:
+                self.invalidate()
+                entry = self.get_entries().get(tool_name)
+        return entry
+
+    def invalidate(self):
+        """
+        Drops the map so it is rebuilt on the next lookup.
+        Dynamic tool modules are not touched, each is reimported on its own when its file changes.
+        """
+        with self.lock:
+            self.entries = None
+
+    def call(self, entry, arguments):
+        """
+        Calls a resolved tool with the arguments the assistant sent.
+
+        Args:
+            entry (ToolEntry): The tool to call.
+            arguments (dict): The keyword arguments for the tool.
+
+        Returns:
+            The output of the tool.
+        """
+        if entry.needs_assistant:
+            return entry.function(self.assistant, **(arguments))
+        return entry.function(**(arguments))
+
+    def function_map(self, tool_names=None):
+        """
+        Returns a map of tool name to a callable taking only the assistant's arguments,
+        like the function_map autogen agents register.
+
+        Args:
+            tool_names (list): The tools to include, defaults to every tool.
+
+        Returns:
+            dict: The map of tool name to callable. Unknown names are left out.
+        """
+        entries = self.get_entries()
+        if tool_names is None:
+            tool_names = list(entries)
+        function_map = {}
+        for tool_name in tool_names:
+            entry = entries.get(tool_name)
+            if entry is None:
+                continue
+            if entry.needs_assistant:
+                function_map[tool_name] = functools.partial(entry.function, self.assistant)
+            else:
+                function_map[tool_name] = entry.function
+        return function_map
+
+
+def module_routines(module):
+    """
+    Yields the public functions defined in a tool module, leaving out imported helpers, modules and constants.
+    """
+    for name, value in vars(module).items():
+        if not name.startswith("_") and inspect.isroutine(value) and getattr(value, "__module__", None) == module.__name__:
+            yield name, value
+
+
+def make_entry(name, function, source):
+    """
+    Works out the calling convention of a tool once.
+    """
+    try:
+        parameters = list(inspect.signature(function).parameters)
+    except (TypeError, ValueError):
+        parameters = []
+    needs_assistant = source != "self" and "assistant" in parameters
+    if needs_assistant:
+        parameters.remove("assistant")
+    return ToolEntry(name, function, source, needs_assistant, parameters)
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+
+#
+# In-memory list of the account's assistants with name and ID indexes.
+# Nothing is fetched until the first lookup. After `ttl` seconds the list is stale: stale reads
+# are served from memory while a background thread refetches it. Creating or modifying an
+# assistant through the manager updates the catalog in place instead of refetching.
+#
+
+logger = logging.getLogger(__name__)
+
+
+class AssistantCatalog():
+    def __init__(self, fetch_all=None, ttl=300.0, background_refresh=True):
+        """
+        Initializes an empty catalog.
+
+        Args:
+            fetch_all (callable): Returns every assistant, newest first. None means the owner fills
+                the catalog itself with replace().
+            ttl (float): Seconds before the list is considered stale, None never goes stale.
+            background_refresh (bool): Refetch stale lists in a background thread instead of blocking the reader.
+        """
+        self.fetch_all = fetch_all
+        self.ttl = ttl
+        self.background_refresh = background_refresh
+        self.assistants = None
+        self.by_id = {}
+        self.by_name = {}
+        self.loaded_at = None
+        self.refreshing = False
+        self.loads = 0
+        self.lock = threading.RLock()
+
+    def is_loaded(self):
+        """
+        Returns True if the catalog holds a list, stale or not.
+        """
+        return self.assistants is not None
+
+    def is_stale(self):
+        """
+        Returns True if the catalog was never loaded or is older than the TTL.
+        """
+        if self.loaded_at is None:
+            return True
+        if self.ttl is None:
+            return False
+        return time.monotonic() - self.loaded_at >= self.ttl
+
+    def replace(self, assistants):
+        """
+        Replaces the whole list and rebuilds the indexes.
+
+        Args:
+            assistants (list): Every assistant, newest first.
+        """
+        assistants = list(assistants)
+        by_id = {assistant.id: assistant for assistant in assistants}
+        by_name = {}
+        for assistant in assistants:
+            # Newest first, so a repeated name resolves to the newest assistant
+            by_name.setdefault(assistant.name, assistant)
+        with self.lock:
+            self.assistants = assistants
+            self.by_id = by_id
+            self.by_name = by_name
+            self.loaded_at = time.monotonic()
+            self.loads += 1
+
+    def load(self):
+        """
+        Fetches every assistant and replaces the list.
+        """
+        self.replace(self.fetch_all())
+        logger.debug(f"Loaded {len(self.assistants)} assistants")
+
+    def refresh_in_background(self):
+        """
+        Starts a background refetch unless one is already running.
+        """
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+
+        def refresh():
+            try:
+                self.load()
+            except Exception as e:
+                logger.warning(f"Background refresh of the assistant catalog failed: {e}")
+            finally:
+                self.refreshing = False
+
+        threading.Thread(target=refresh, name="assistant_catalog_refresh", daemon=True).start()
+
+    def ensure_fresh(self):
+        """
+        Loads the catalog on first use and refreshes it once stale.
+        """
+        if self.fetch_all is None or not self.is_stale():
+            return
+        if not self.is_loaded() or not self.background_refresh:
+            with self.lock:
+                if self.is_stale():
+                    self.load()
+            return
+        self.refresh_in_background()
+
+    def get_assistants(self):
+        """
+        Returns every assistant, newest first.
+        """
+        self.ensure_fresh()
+        return list(self.assistants or [])
+
+    def get_by_name(self, name):
+        """
+        Returns the newest assistant with this name, or None.
+        """
+        self.ensure_fresh()
+        return self.by_name.get(name)
+
+    def get_by_id(self, assistant_id):
+        """
+        Returns the assistant with this ID, or None.
+        """
+        self.ensure_fresh()
+        return self.by_id.get(assistant_id)
+
+    def upsert(self, assistant):
+        """
+        Adds a created assistant or replaces a modified one.
+        Does nothing before the first load, that load will include it.
+        """
+        with self.lock:
+            if not self.is_loaded():
+                return
+            assistants = [existing for existing in self.assistants if existing.id != assistant.id]
+            previous = self.by_id.get(assistant.id)
+            if previous is None:
+                assistants.insert(0, assistant)
+            else:
+                assistants.insert(self.assistants.index(previous), assistant)
+            loaded_at = self.loaded_at
+            self.replace(assistants)
+            # An upsert does not make the rest of the list any fresher
+            self.loaded_at = loaded_at
+
+    def invalidate(self):
+        """
+        Forgets the list, the next lookup fetches it again.
+        """
+        with self.lock:
+            self.assistants = None
+            self.by_id = {}
+            self.by_name = {}
+            self.loaded_at = None
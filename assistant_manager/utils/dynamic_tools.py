@@ -0,0 +1,245 @@
+import ast
+import inspect
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+
+#
+# Dynamic tools, one module per tool.
+# functions/dynamic/tools/index.json maps each tool name to its module file and its parameters,
+# so tools can be listed and registered without importing anything. A tool's module is imported
+# on its first call and imported again, alone, when its file changes. Tools the assistant
+# creates are written as new modules and can be called straight away.
+#
+
+# Resolved from this file, so tools are found whatever the working directory is
+DEFAULT_TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'functions', 'dynamic', 'tools')
+MODULE_PREFIX = 'assistant_manager.functions.dynamic.tools.'
+
+
+def get_parameters(function_code, function_name):
+    """
+    Reads the parameters of a tool's function from its source, without running it.
+
+    Args:
+        function_code (str): The source of the tool module.
+        function_name (str): The function to read, the last top-level function if there is none by that name.
+
+    Returns:
+        tuple: (the function name found, list of {"name", "kind", and "default" if it has a literal default}).
+    """
+    tree = ast.parse(function_code)
+    functions = [node for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    if not functions:
+        raise ValueError("The tool code defines no function")
+    function = next((node for node in functions if node.name == function_name), functions[-1])
+    arguments = function.args
+    parameters = []
+    positional = arguments.posonlyargs + arguments.args
+    defaults = [None] * (len(positional) - len(arguments.defaults)) + list(arguments.defaults)
+    for argument, default in zip(positional, defaults):
+        parameters.append(make_parameter(argument.arg, "POSITIONAL_OR_KEYWORD", default))
+    for argument, default in zip(arguments.kwonlyargs, arguments.kw_defaults):
+        parameters.append(make_parameter(argument.arg, "KEYWORD_ONLY", default))
+    if arguments.kwarg is not None:
+        parameters.append({"name": arguments.kwarg.arg, "kind": "VAR_KEYWORD"})
+    return function.name, parameters
+
+
+def make_parameter(name, kind, default):
+    parameter = {"name": name, "kind": kind}
+    if default is not None:
+        try:
+            parameter["default"] = ast.literal_eval(default)
+        except ValueError:
+            # Not a literal, still optional
+            parameter["default"] = None
+    return parameter
+
+
+def make_signature(parameters):
+    return inspect.Signature([
+        inspect.Parameter(
+            parameter["name"],
+            getattr(inspect.Parameter, parameter["kind"]),
+            default=parameter.get("default", inspect.Parameter.empty),
+        )
+        for parameter in parameters
+    ])
+
+
+class LazyTool():
+    def __init__(self, loader, name, parameters):
+        """
+        A dynamic tool that imports its module when it is first called.
+        Its signature comes from the index, so the tool registry can inspect it without importing it.
+        """
+        self.loader = loader
+        self.__name__ = name
+        self.__signature__ = make_signature(parameters)
+
+    def __call__(self, *args, **kwargs):
+        return self.loader.get_function(self.__name__)(*args, **kwargs)
+
+    def __repr__(self):
+        return f"LazyTool({self.__name__!r})"
+
+
+class DynamicToolLoader():
+    def __init__(self, tools_dir=DEFAULT_TOOLS_DIR):
+        """
+        Initializes a loader for the tool modules in tools_dir. Nothing is imported until a tool is called.
+
+        Args:
+            tools_dir (str): The directory holding the tool modules and index.json.
+        """
+        self.tools_dir = tools_dir
+        self.index_path = os.path.join(tools_dir, 'index.json')
+        self.index_signature = None
+        self.index = {}
+        # Tool name to (file signature, function)
+        self.loaded = {}
+        self.loads = {}
+        self.lock = threading.RLock()
+
+    def get_file_signature(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def refresh_index(self):
+        """
+        Rereads index.json if it changed since the last read.
+
+        Returns:
+            bool: True if it was reread.
+        """
+        signature = self.get_file_signature(self.index_path)
+        if signature == self.index_signature:
+            return False
+        with self.lock:
+            if signature == self.index_signature:
+                return False
+            index = {}
+            if signature is not None:
+                with open(self.index_path) as f:
+                    index = json.load(f)
+            self.index = index
+            self.index_signature = signature
+            return True
+
+    def get_index(self):
+        self.refresh_index()
+        return self.index
+
+    def get_tool_names(self):
+        return list(self.get_index())
+
+    def get_tool(self, name):
+        """
+        Returns a LazyTool for a tool in the index, or None if there is no such tool.
+        """
+        entry = self.get_index().get(name)
+        if entry is None:
+            return None
+        return LazyTool(self, name, entry.get("parameters", []))
+
+    def get_function(self, name):
+        """
+        Returns a tool's function, importing its module on first use or if its file changed since.
+        """
+        entry = self.get_index().get(name)
+        if entry is None:
+            raise NameError(f"No dynamic tool {name!r}")
+        path = os.path.join(self.tools_dir, entry["module"])
+        signature = self.get_file_signature(path)
+        loaded = self.loaded.get(name)
+        if loaded is not None and loaded[0] == signature:
+            return loaded[1]
+        with self.lock:
+            loaded = self.loaded.get(name)
+            if loaded is not None and loaded[0] == signature:
+                return loaded[1]
+            module = self.import_module(entry["module"], path)
+            function = getattr(module, entry.get("function", name))
+            self.loaded[name] = (signature, function)
+            self.loads[name] = self.loads.get(name, 0) + 1
+            return function
+
+    def import_module(self, module_file, path):
+        """
+        Imports a tool module from its source, replacing any earlier version of that module only.
+        The source is compiled directly so a rewrite within the same second is never served from stale bytecode.
+        """
+        module_name = MODULE_PREFIX + os.path.splitext(module_file)[0]
+        with open(path) as f:
+            source = f.read()
+        module = types.ModuleType(module_name)
+        module.__file__ = path
+        exec(compile(source, path, "exec"), module.__dict__)
+        sys.modules[module_name] = module
+        return module
+
+    def add_tool(self, function_name, function_code):
+        """
+        Writes a tool as its own module and adds it to the index. It can be called right away.
+
+        Args:
+            function_name (str): The name of the tool, a Python identifier.
+            function_code (str): The source of the tool, including its imports.
+        """
+        # The name becomes a file name, anything but an identifier could point outside the tools directory
+        if not isinstance(function_name, str) or not function_name.isidentifier():
+            raise ValueError(f"Invalid tool name {function_name!r}, it must be a Python identifier")
+        found_name, parameters = get_parameters(function_code, function_name)
+        os.makedirs(self.tools_dir, exist_ok=True)
+        module_file = f"{function_name}.py"
+        with self.lock:
+            write_atomically(os.path.join(self.tools_dir, module_file), function_code)
+            index = dict(self.get_index())
+            index[function_name] = {
+                "module": module_file,
+                "function": found_name,
+                "parameters": parameters,
+                "updated_at": time.time(),
+            }
+            write_atomically(self.index_path, json.dumps(index, indent=4))
+            self.loaded.pop(function_name, None)
+            self.refresh_index()
+
+    def get_stats(self):
+        """
+        Returns how many times each tool module was imported.
+        """
+        with self.lock:
+            return {"tools": len(self.index), "loaded": len(self.loaded), "loads": dict(self.loads)}
+
+
+def write_atomically(path, content):
+    """
+    Writes a file through a temporary file and a rename, so readers never see it half written.
+    """
+    directory = os.path.dirname(path) or "."
+    with tempfile.NamedTemporaryFile('w', dir=directory, delete=False, suffix=".tmp") as f:
+        f.write(content)
+    os.replace(f.name, path)
+
+
+shared_loaders = {}
+shared_loaders_lock = threading.Lock()
+
+
+def get_dynamic_tool_loader(tools_dir=DEFAULT_TOOLS_DIR):
+    """
+    Returns the process-wide loader of a tools directory.
+    """
+    with shared_loaders_lock:
+        if tools_dir not in shared_loaders:
+            shared_loaders[tools_dir] = DynamicToolLoader(tools_dir)
+        return shared_loaders[tools_dir]
@@ -44,46 +44,25 @@ def read_json(file_name):
     except FileNotFoundError:
         return {}
     
-from IPython import get_ipython
-
+from assistant_manager.utils.python_workers import format_execution, get_python_pool
 
 
 def exec_python(cell):
-    ipython = get_ipython()
-    if ipython is None:
-        #hotfix for Mac M1
-        from IPython.terminal.embed import InteractiveShellEmbed
-        ipython = InteractiveShellEmbed()
-    result = ipython.run_cell(cell)
-    log = str(result.result)
-    if result.error_before_exec is not None:
-        log += f"\n{result.error_before_exec}"
-    if result.error_in_exec is not None:
-        log += f"\n{result.error_in_exec}"
-
-    #Check the logs length
-    if len(log) > 1000:
-        log = log[:1000]
-        log += "\n\n... truncated"
-    return log
-
-import subprocess
+    # Runs in the thread's own interpreter process, see utils/python_workers.py
+    reply = get_python_pool().execute(cell)
+    return format_execution(reply)
+
+from assistant_manager.utils.shell_runner import format_shell_result, get_shell_runner
+
+
 def exec_sh(script):
-    #Mac M1, we just want to run .sh files that are made in a temp folder
-    #and then deleted
-
-    #create a temp folder if it doesn't exist
-    import os
-    if not os.path.exists("tmp"):
-        os.makedirs("tmp")
-    #write the script to a file
-    file_name = "tmp/tmp.sh"
-    write_file(file_name, script)
-    #make it executable
-    subprocess.run(["chmod", "u+x", file_name])
-    #run it
-    result = subprocess.run([file_name], stdout=subprocess.PIPE)
-    #delete it
-    os.remove(file_name)
-    #return the output
-    return result.stdout.decode("utf-8")
+    # Piped to the shell (or a unique temp file for other interpreters), see utils/shell_runner.py
+    result = get_shell_runner().run(script)
+    return format_shell_result(result)
+
+from assistant_manager.utils.output_spill import get_output_spill
+
+
+def read_file_chunk(artifact_id, offset=0, length=4000):
+    # Pages through a tool output that was too big to send whole, see utils/output_spill.py
+    return get_output_spill().read_chunk(artifact_id, offset, length)
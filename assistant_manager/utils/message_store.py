@@ -0,0 +1,177 @@
+import functools
+import json
+import os
+import sqlite3
+import threading
+from openai.types.beta.threads import Message as ThreadMessage
+from assistant_manager.utils.pagination import iter_pages
+
+#
+# Local copy of thread messages in SQLite.
+# Messages never change apart from their metadata, so once a message is stored it is served
+# locally forever. Each thread keeps a high-water mark (the newest stored message ID) and
+# syncing asks the API only for messages after it.
+#
+
+# Next to the package, so the store opens whatever the working directory is
+DEFAULT_MESSAGE_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'messages.sqlite3')
+
+
+class MessageStore():
+    def __init__(self, path=DEFAULT_MESSAGE_STORE_PATH):
+        """
+        Opens (or creates) the message store.
+
+        Args:
+            path (str): The SQLite database file, ":memory:" keeps the store in memory.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            if path != ":memory:":
+                self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                " thread_id TEXT NOT NULL,"
+                " message_id TEXT NOT NULL,"
+                " created_at INTEGER NOT NULL,"
+                " role TEXT,"
+                " body TEXT NOT NULL,"
+                " PRIMARY KEY (thread_id, message_id))"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS messages_by_time ON messages (thread_id, created_at)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state ("
+                " thread_id TEXT PRIMARY KEY,"
+                " high_water TEXT NOT NULL)"
+            )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def save_messages(self, thread_id, messages, high_water=None):
+        """
+        Stores messages, replacing the stored copy of any message already known.
+
+        Args:
+            thread_id (str): The ID of the thread the messages belong to.
+            messages (list): Message objects from the API.
+            high_water (str): If given, the new high-water mark of the thread. Only pass this when
+                every message up to it is stored.
+        """
+        rows = [(thread_id, message.id, message.created_at, message.role, message.model_dump_json()) for message in messages]
+        with self.lock, self.connection:
+            # Upsert so rows keep their insertion order
+            self.connection.executemany(
+                "INSERT INTO messages (thread_id, message_id, created_at, role, body) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (thread_id, message_id) DO UPDATE SET body = excluded.body",
+                rows,
+            )
+            if high_water is not None:
+                self.connection.execute(
+                    "INSERT INTO sync_state (thread_id, high_water) VALUES (?, ?)"
+                    " ON CONFLICT (thread_id) DO UPDATE SET high_water = excluded.high_water",
+                    (thread_id, high_water),
+                )
+
+    def get_high_water(self, thread_id):
+        """
+        Returns the ID of the newest message synced for a thread, or None if it was never synced.
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT high_water FROM sync_state WHERE thread_id = ?", (thread_id,)).fetchone()
+        return row[0] if row else None
+
+    def sync(self, thread_id, list_messages, page_size=100):
+        """
+        Fetches the messages added to a thread since the last sync.
+
+        Args:
+            thread_id (str): The ID of the thread to sync.
+            list_messages (callable): The list_messages wrapper to fetch pages with.
+            page_size (int): How many messages to ask for per page, up to 100.
+
+        Returns:
+            list: The new messages, oldest first.
+        """
+        new_messages = []
+        fetch_page = functools.partial(list_messages, thread_id=thread_id, order="asc")
+        for page in iter_pages(fetch_page, limit=page_size, after=self.get_high_water(thread_id)):
+            if not page.data:
+                break
+            self.save_messages(thread_id, page.data, high_water=page.data[-1].id)
+            new_messages.extend(page.data)
+        return new_messages
+
+    def get_messages(self, thread_id, limit=None):
+        """
+        Returns the stored messages of a thread, oldest first.
+
+        Args:
+            thread_id (str): The ID of the thread.
+            limit (int): If given, only the newest `limit` messages are returned.
+
+        Returns:
+            list: Message objects.
+        """
+        with self.lock:
+            if limit is None:
+                rows = self.connection.execute(
+                    "SELECT body FROM messages WHERE thread_id = ? ORDER BY created_at, rowid", (thread_id,)
+                ).fetchall()
+            else:
+                rows = self.connection.execute(
+                    "SELECT body FROM messages WHERE thread_id = ? ORDER BY created_at DESC, rowid DESC LIMIT ?", (thread_id, limit)
+                ).fetchall()
+                rows.reverse()
+        return [load_message(row[0]) for row in rows]
+
+    def get_messages_after(self, thread_id, message_id):
+        """
+        Returns the stored messages of a thread that come after a message, oldest first.
+
+        Args:
+            thread_id (str): The ID of the thread.
+            message_id (str): The message to start after. If None or not stored, every stored message is returned.
+
+        Returns:
+            list: Message objects.
+        """
+        with self.lock:
+            anchor = None
+            if message_id is not None:
+                anchor = self.connection.execute(
+                    "SELECT created_at, rowid FROM messages WHERE thread_id = ? AND message_id = ?", (thread_id, message_id)
+                ).fetchone()
+            if anchor is None:
+                rows = self.connection.execute(
+                    "SELECT body FROM messages WHERE thread_id = ? ORDER BY created_at, rowid", (thread_id,)
+                ).fetchall()
+            else:
+                rows = self.connection.execute(
+                    "SELECT body FROM messages WHERE thread_id = ?"
+                    " AND (created_at > ? OR (created_at = ? AND rowid > ?)) ORDER BY created_at, rowid",
+                    (thread_id, anchor[0], anchor[0], anchor[1]),
+                ).fetchall()
+        return [load_message(row[0]) for row in rows]
+
+    def get_message(self, thread_id, message_id):
+        """
+        Returns a stored message, or None if it is not stored.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT body FROM messages WHERE thread_id = ? AND message_id = ?", (thread_id, message_id)
+            ).fetchone()
+        return load_message(row[0]) if row else None
+
+
+def load_message(body):
+    """
+    Rebuilds a stored message without validating it. Every row was dumped from a message the API
+    returned, so it is trusted like one, and rows from older SDK versions still load.
+    """
+    return ThreadMessage.model_construct(**json.loads(body))
@@ -0,0 +1,280 @@
+import functools
+import inspect
+import math
+import threading
+import time
+
+#
+# In-process metrics for API wrappers and tools.
+# Each API wrapper decorated with @instrumented counts its calls, its errors by status code and
+# its latency in a histogram. Wrappers that can answer from a local store count those answers as
+# local hits instead of API calls. Tool calls are timed by tool name. Read the numbers with
+# get_api_stats() / get_tool_stats(), or export everything with to_openmetrics().
+#
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram():
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        A latency histogram with fixed upper bounds, in seconds.
+        """
+        self.buckets = tuple(buckets) + (math.inf,)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """
+        Estimates a quantile by interpolating inside the bucket it falls in.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                upper = self.max if math.isinf(bound) else min(bound, self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_seconds": self.sum / self.count if self.count else None,
+            "p50_seconds": self.quantile(0.5),
+            "p99_seconds": self.quantile(0.99),
+            "max_seconds": self.max,
+        }
+
+
+def error_status(error):
+    """
+    Returns the label an exception is counted under: the HTTP status code if it has one, else its class name.
+    """
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return str(status)
+    return type(error).__name__
+
+
+class Metrics():
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initializes empty metrics.
+
+        Args:
+            buckets (tuple): The histogram bucket upper bounds, in seconds.
+        """
+        self.bucket_bounds = buckets
+        self.lock = threading.Lock()
+        self.api_latency = {}
+        self.api_errors = {}
+        self.local_hits = {}
+        self.tool_latency = {}
+        self.tool_errors = {}
+
+    def record_api_call(self, operation, seconds, status=None):
+        """
+        Records one wrapper call.
+
+        Args:
+            operation (str): The wrapper name, e.g. retrieve_run.
+            seconds (float): How long the call took.
+            status (str): The error label if the call raised, None if it succeeded.
+        """
+        with self.lock:
+            histogram = self.api_latency.get(operation)
+            if histogram is None:
+                histogram = self.api_latency[operation] = Histogram(self.bucket_bounds)
+            histogram.observe(seconds)
+            if status is not None:
+                errors = self.api_errors.setdefault(operation, {})
+                errors[status] = errors.get(status, 0) + 1
+
+    def record_local_hit(self, operation):
+        """
+        Records a wrapper call answered from a local store without calling the API.
+
+        Args:
+            operation (str): The wrapper name, e.g. retrieve_message.
+        """
+        with self.lock:
+            self.local_hits[operation] = self.local_hits.get(operation, 0) + 1
+
+    def record_tool_call(self, tool_name, seconds, failed=False):
+        """
+        Records one tool execution.
+        """
+        with self.lock:
+            histogram = self.tool_latency.get(tool_name)
+            if histogram is None:
+                histogram = self.tool_latency[tool_name] = Histogram(self.bucket_bounds)
+            histogram.observe(seconds)
+            if failed:
+                self.tool_errors[tool_name] = self.tool_errors.get(tool_name, 0) + 1
+
+    def get_api_stats(self, operation=None):
+        """
+        Returns call counts, errors by status and latency of the API wrappers.
+
+        Args:
+            operation (str): Only this wrapper, defaults to all of them.
+
+        Returns:
+            dict: Per wrapper, the latency summary plus an "errors" dict of status to count.
+                For a single operation the summary itself, or None if it was never called.
+        """
+        with self.lock:
+            stats = {
+                name: dict(histogram.summary(), errors=dict(self.api_errors.get(name, {})))
+                for name, histogram in self.api_latency.items()
+                if operation is None or name == operation
+            }
+        if operation is not None:
+            return stats.get(operation)
+        return stats
+
+    def get_local_hits(self, operation=None):
+        """
+        Returns how many calls of each wrapper were answered locally, or the count of one wrapper.
+        """
+        with self.lock:
+            if operation is not None:
+                return self.local_hits.get(operation, 0)
+            return dict(self.local_hits)
+
+    def get_tool_stats(self, tool_name=None):
+        """
+        Returns execution counts, failures and latency of the tools, like get_api_stats.
+        """
+        with self.lock:
+            stats = {
+                name: dict(histogram.summary(), errors=self.tool_errors.get(name, 0))
+                for name, histogram in self.tool_latency.items()
+                if tool_name is None or name == tool_name
+            }
+        if tool_name is not None:
+            return stats.get(tool_name)
+        return stats
+
+    def reset(self):
+        with self.lock:
+            self.api_latency.clear()
+            self.api_errors.clear()
+            self.local_hits.clear()
+            self.tool_latency.clear()
+            self.tool_errors.clear()
+
+    def to_openmetrics(self):
+        """
+        Returns a snapshot of every metric in the OpenMetrics text format.
+        """
+        lines = []
+        with self.lock:
+            lines.append("# TYPE assistant_api_calls counter")
+            lines.append("# HELP assistant_api_calls API wrapper calls.")
+            for operation, histogram in sorted(self.api_latency.items()):
+                lines.append(f'assistant_api_calls_total{{operation="{escape(operation)}"}} {histogram.count}')
+            lines.append("# TYPE assistant_api_errors counter")
+            lines.append("# HELP assistant_api_errors API wrapper calls that raised, by status code.")
+            for operation, errors in sorted(self.api_errors.items()):
+                for status, count in sorted(errors.items()):
+                    lines.append(f'assistant_api_errors_total{{operation="{escape(operation)}",status="{escape(status)}"}} {count}')
+            lines.append("# TYPE assistant_local_hits counter")
+            lines.append("# HELP assistant_local_hits API wrapper calls answered from a local store.")
+            for operation, count in sorted(self.local_hits.items()):
+                lines.append(f'assistant_local_hits_total{{operation="{escape(operation)}"}} {count}')
+            append_histograms(lines, "assistant_api_latency_seconds", "API wrapper latency.", "operation", self.api_latency)
+            append_histograms(lines, "assistant_tool_duration_seconds", "Tool execution time.", "tool", self.tool_latency)
+            lines.append("# TYPE assistant_tool_errors counter")
+            lines.append("# HELP assistant_tool_errors Tool executions that raised.")
+            for tool_name, count in sorted(self.tool_errors.items()):
+                lines.append(f'assistant_tool_errors_total{{tool="{escape(tool_name)}"}} {count}')
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_bound(bound):
+    return "+Inf" if math.isinf(bound) else repr(float(bound))
+
+
+def append_histograms(lines, name, help_text, label, histograms):
+    lines.append(f"# TYPE {name} histogram")
+    lines.append(f"# HELP {name} {help_text}")
+    for key, histogram in sorted(histograms.items()):
+        labels = f'{label}="{escape(key)}"'
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{format_bound(bound)}"}} {cumulative}')
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+
+
+shared_metrics = Metrics()
+
+
+def get_metrics():
+    """
+    Returns the process-wide metrics every manager records into.
+    """
+    return shared_metrics
+
+
+def instrumented(function=None, operation=None):
+    """
+    Decorates an API wrapper method so each call is recorded in self.metrics under the method's name,
+    and traced as a span of the same name in self.tracer. Works on plain and async methods.
+    Use @instrumented(operation="...") to record under another name.
+    """
+    if function is None:
+        return functools.partial(instrumented, operation=operation)
+    operation = operation or function.__name__
+
+    if inspect.iscoroutinefunction(function):
+        @functools.wraps(function)
+        async def async_wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            status = None
+            try:
+                with self.tracer.span(operation):
+                    return await function(self, *args, **kwargs)
+            except Exception as e:
+                status = error_status(e)
+                raise
+            finally:
+                self.metrics.record_api_call(operation, time.perf_counter() - started, status)
+        return async_wrapper
+
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        status = None
+        try:
+            with self.tracer.span(operation):
+                return function(self, *args, **kwargs)
+        except Exception as e:
+            status = error_status(e)
+            raise
+        finally:
+            self.metrics.record_api_call(operation, time.perf_counter() - started, status)
+    return wrapper
@@ -0,0 +1,209 @@
+import os
+import re
+import threading
+import uuid
+
+#
+# Size governor for tool outputs.
+# An output over budget_chars is written to an artifact file and the assistant gets its head and
+# tail plus the artifact ID instead, which it can page through with the read_file_chunk tool.
+# This keeps oversized outputs out of submit_tool_outputs and so out of every later run on the thread.
+# Artifacts are UTF-8 and paged by byte offset. A chunk starts at the first byte of the character
+# its offset falls in and ends on a whole character, so no character is ever split between chunks,
+# and since a character is at least one byte, a chunk of budget bytes fits the character budget.
+#
+
+DEFAULT_SPILL_SETTINGS = {
+    # Longest output sent to the assistant as is, in characters
+    "budget_chars": 8000,
+    # Characters of the start and of the end of a spilled output sent to the assistant
+    "head_chars": 2000,
+    "tail_chars": 2000,
+    # Where spilled outputs are written, next to the package whatever the working directory is
+    "artifact_dir": os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'artifacts'),
+    # Also upload spilled outputs as files (purpose="assistants") and include the file ID
+    "upload": False,
+}
+
+ARTIFACT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+class Artifact():
+    def __init__(self, artifact_id, path, tool_name, text, head_chars, tail_chars):
+        """
+        A spilled tool output.
+        """
+        self.artifact_id = artifact_id
+        self.path = path
+        self.tool_name = tool_name
+        self.size_chars = len(text)
+        self.size_bytes = os.path.getsize(path)
+        self.head = text[:head_chars]
+        self.tail = text[-tail_chars:] if tail_chars and len(text) > head_chars + tail_chars else ""
+
+    def summary(self, budget_chars, file_id=None):
+        """
+        Returns what the assistant gets instead of the full output.
+        """
+        reference = f"artifact_id={self.artifact_id!r}"
+        if file_id is not None:
+            reference += f", file_id={file_id!r}"
+        lines = [
+            f"[The output of {self.tool_name} was {self.size_chars} characters ({self.size_bytes} bytes), "
+            f"over the {budget_chars} character budget. It was saved as {reference}. "
+            f"Call read_file_chunk with the artifact_id and a byte offset to read the rest.]",
+            "--- start of output ---",
+            self.head,
+        ]
+        if self.tail:
+            lines += ["--- end of output ---", self.tail]
+        return "\n".join(lines)
+
+
+class OutputSpill():
+    def __init__(self, **settings):
+        """
+        Initializes an output size governor.
+
+        Args:
+            **settings: Any keys of DEFAULT_SPILL_SETTINGS.
+        """
+        unknown = set(settings) - set(DEFAULT_SPILL_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown output spill settings: {sorted(unknown)}")
+        self.settings = dict(DEFAULT_SPILL_SETTINGS, **settings)
+        self.lock = threading.Lock()
+        self.stats = {"outputs": 0, "spilled": 0, "spilled_chars": 0}
+
+    def spill(self, tool_name, text, thread_id=None):
+        """
+        Writes an output to an artifact file if it is over budget.
+
+        Args:
+            tool_name (str): The tool that produced the output.
+            text (str): The output.
+            thread_id (str): The thread of the run, part of the artifact ID.
+
+        Returns:
+            Artifact: The artifact, or None if the output is within budget.
+        """
+        with self.lock:
+            self.stats["outputs"] += 1
+        if len(text) <= self.settings["budget_chars"]:
+            return None
+        prefix = "_".join(part for part in (thread_id, tool_name) if part)
+        artifact_id = f"{re.sub(r'[^A-Za-z0-9_.-]', '_', prefix)}_{uuid.uuid4().hex[:12]}.txt"
+        os.makedirs(self.settings["artifact_dir"], exist_ok=True)
+        path = os.path.join(self.settings["artifact_dir"], artifact_id)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        with self.lock:
+            self.stats["spilled"] += 1
+            self.stats["spilled_chars"] += len(text)
+        return Artifact(artifact_id, path, tool_name, text, self.settings["head_chars"], self.settings["tail_chars"])
+
+    def get_path(self, artifact_id):
+        """
+        Returns the path of an artifact, or None if the ID is not a valid artifact ID.
+        """
+        if not ARTIFACT_ID_PATTERN.match(artifact_id) or artifact_id.startswith("."):
+            return None
+        return os.path.join(self.settings["artifact_dir"], artifact_id)
+
+    def read_chunk(self, artifact_id, offset=0, length=4000):
+        """
+        Returns part of an artifact, never more than the output budget.
+
+        Args:
+            artifact_id (str): The artifact ID from the summary.
+            offset (int): Byte offset to start at, moved back to the start of the character it falls in.
+            length (int): Bytes to read, fewer if the last character would be cut.
+
+        Returns:
+            str: The chunk, with a header saying which bytes it covers.
+        """
+        path = self.get_path(artifact_id)
+        if path is None or not os.path.isfile(path):
+            return f"No artifact {artifact_id!r}"
+        # Leave room for the header. At least one whole character, which is up to 4 bytes
+        length = max(4, min(int(length), self.settings["budget_chars"] - 200))
+        offset = max(0, int(offset))
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            offset = align_to_character(f, offset)
+            f.seek(offset)
+            chunk = f.read(length)
+        text, chunk = decode_whole_characters(chunk, complete=offset + len(chunk) >= size)
+        end = offset + len(chunk)
+        header = f"[bytes {offset}-{end} of {size}"
+        header += f", continue at offset {end}]" if end < size else ", end of artifact]"
+        return f"{header}\n{text}"
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats)
+
+
+def align_to_character(f, offset):
+    """
+    Returns a byte offset moved back to the first byte of the UTF-8 character it falls in.
+    """
+    start = max(0, offset - 3)
+    f.seek(start)
+    window = f.read(offset - start + 1)
+    index = offset - start
+    if index >= len(window):
+        return offset
+    # Continuation bytes look like 10xxxxxx
+    while index > 0 and window[index] & 0xC0 == 0x80:
+        index -= 1
+    return start + index
+
+
+def decode_whole_characters(chunk, complete):
+    """
+    Decodes a chunk, leaving out a character cut off at its end unless it is the end of the artifact.
+
+    Returns:
+        tuple: (text, the bytes the text covers).
+    """
+    if not complete:
+        for cut in range(min(4, len(chunk))):
+            try:
+                whole = chunk[:len(chunk) - cut]
+                return whole.decode('utf-8'), whole
+            except UnicodeDecodeError:
+                continue
+    return chunk.decode('utf-8', errors='replace'), chunk
+
+
+spill_settings = {}
+shared_spill = None
+shared_spill_lock = threading.Lock()
+
+
+def configure_output_spill(**settings):
+    """
+    Changes the settings of the shared output governor.
+
+    Args:
+        **settings: Any keys of DEFAULT_SPILL_SETTINGS.
+    """
+    global shared_spill
+    unknown = set(settings) - set(DEFAULT_SPILL_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown output spill settings: {sorted(unknown)}")
+    with shared_spill_lock:
+        spill_settings.update(settings)
+        shared_spill = None
+
+
+def get_output_spill():
+    """
+    Returns the process-wide output governor of the tool dispatch.
+    """
+    global shared_spill
+    with shared_spill_lock:
+        if shared_spill is None:
+            shared_spill = OutputSpill(**spill_settings)
+        return shared_spill
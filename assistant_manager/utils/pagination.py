@@ -0,0 +1,115 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+#
+# Iterators that follow `after` cursors through every page of a list endpoint.
+# While the caller works through one page the next one is already being fetched.
+#
+
+MAX_PAGE_SIZE = 100
+
+prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="page_prefetch")
+
+
+def has_next_page(page, limit):
+    """
+    Returns True if there is probably another page after this one.
+    Uses the has_more flag of the response when the SDK kept it, else a full page means maybe more.
+    """
+    has_more = getattr(page, "has_more", None)
+    if has_more is not None:
+        return bool(has_more) and len(page.data) > 0
+    return len(page.data) >= limit
+
+
+def iter_pages(fetch_page, limit=MAX_PAGE_SIZE, after=None, prefetch=True):
+    """
+    Yields every page of a list endpoint.
+
+    Args:
+        fetch_page (callable): Called as fetch_page(limit=..., after=...) and returns a page with a `data` list.
+        limit (int): The page size, up to 100.
+        after (str): The cursor to start after, None starts at the beginning.
+        prefetch (bool): Fetch the next page in the background while the current one is consumed.
+
+    Yields:
+        The pages, in order.
+    """
+    page = fetch_page(limit=limit, after=after)
+    while True:
+        next_page = None
+        more = has_next_page(page, limit)
+        if more and prefetch:
+            context = contextvars.copy_context()
+            next_page = prefetch_executor.submit(context.run, fetch_page, limit=limit, after=page.data[-1].id)
+        try:
+            yield page
+        except GeneratorExit:
+            if next_page is not None:
+                next_page.cancel()
+            raise
+        if not more:
+            return
+        page = next_page.result() if next_page is not None else fetch_page(limit=limit, after=page.data[-1].id)
+
+
+def iter_items(fetch_page, limit=MAX_PAGE_SIZE, after=None, until=None, prefetch=True):
+    """
+    Yields every item of a list endpoint, across pages.
+
+    Args:
+        fetch_page (callable): Called as fetch_page(limit=..., after=...) and returns a page with a `data` list.
+        limit (int): The page size, up to 100.
+        after (str): The cursor to start after, None starts at the beginning.
+        until (callable): If given, iteration stops after the first item for which until(item) is True.
+        prefetch (bool): Fetch the next page in the background while the current one is consumed.
+
+    Yields:
+        The items, in order.
+    """
+    pages = iter_pages(fetch_page, limit=limit, after=after, prefetch=prefetch)
+    try:
+        for page in pages:
+            for item in page.data:
+                yield item
+                if until is not None and until(item):
+                    return
+    finally:
+        pages.close()
+
+
+async def aiter_pages(fetch_page, limit=MAX_PAGE_SIZE, after=None, prefetch=True):
+    """
+    Async version of iter_pages, fetch_page is awaited and prefetching runs as a task.
+    """
+    page = await fetch_page(limit=limit, after=after)
+    while True:
+        next_page = None
+        more = has_next_page(page, limit)
+        if more and prefetch:
+            next_page = asyncio.ensure_future(fetch_page(limit=limit, after=page.data[-1].id))
+        try:
+            yield page
+        except GeneratorExit:
+            if next_page is not None:
+                next_page.cancel()
+            raise
+        if not more:
+            return
+        page = await next_page if next_page is not None else await fetch_page(limit=limit, after=page.data[-1].id)
+
+
+async def aiter_items(fetch_page, limit=MAX_PAGE_SIZE, after=None, until=None, prefetch=True):
+    """
+    Async version of iter_items.
+    """
+    pages = aiter_pages(fetch_page, limit=limit, after=after, prefetch=prefetch)
+    try:
+        async for page in pages:
+            for item in page.data:
+                yield item
+                if until is not None and until(item):
+                    return
+    finally:
+        await pages.aclose()
@@ -0,0 +1,133 @@
+import random
+import threading
+
+#
+# Poll schedules for waiting on runs.
+# A schedule hands out the delay before each retrieve_run call: short at first so fast runs
+# finish quickly, growing exponentially so long runs don't burn requests, capped and jittered.
+#
+
+
+class PollScheduler():
+    def __init__(self, initial_delay=0.25, factor=1.6, max_delay=5.0, jitter=0.2, fast_polls=2):
+        """
+        Initializes a poll schedule.
+
+        Args:
+            initial_delay (float): The delay in seconds before the first polls.
+            factor (float): How much the delay grows after each poll past the fast polls.
+            max_delay (float): The cap on the delay, in seconds.
+            jitter (float): The fraction of the delay to randomise by, 0.2 means +/- 20%.
+            fast_polls (int): How many polls use the initial delay before it starts growing.
+
+        Returns:
+            None
+        """
+        if initial_delay < 0 or max_delay < initial_delay:
+            raise ValueError("initial_delay must be >= 0 and <= max_delay")
+        if factor < 1:
+            raise ValueError("factor must be >= 1")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be in [0, 1)")
+        self.initial_delay = initial_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.fast_polls = fast_polls
+
+    def delay(self, poll_number):
+        """
+        Returns the delay before a poll.
+
+        Args:
+            poll_number (int): The number of polls already made in the current wait, starting at 0.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        growth = max(0, poll_number - self.fast_polls + 1)
+        delay = min(self.initial_delay * (self.factor ** growth), self.max_delay)
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return min(delay, self.max_delay)
+
+    def delays(self):
+        """
+        Yields the delays for one wait, forever.
+        """
+        poll_number = 0
+        while True:
+            yield self.delay(poll_number)
+            poll_number += 1
+
+
+class FixedPollScheduler(PollScheduler):
+    def __init__(self, interval=2.0):
+        """
+        A schedule that always waits the same interval, like the original fixed sleep.
+
+        Args:
+            interval (float): The delay between polls, in seconds.
+        """
+        super().__init__(initial_delay=interval, factor=1, max_delay=interval, jitter=0, fast_polls=0)
+
+
+class PollStats():
+    def __init__(self, max_runs=1000):
+        """
+        Keeps how many polls and how long each processed run needed.
+
+        Args:
+            max_runs (int): How many runs to keep, the oldest are dropped first.
+        """
+        self.max_runs = max_runs
+        self.runs = {}
+        self.lock = threading.Lock()
+
+    def record(self, run_id, polls, seconds, status):
+        """
+        Records a finished run.
+
+        Args:
+            run_id (str): The ID of the run.
+            polls (int): How many times the run was retrieved.
+            seconds (float): How long processing the run took.
+            status (str): The final status of the run.
+        """
+        with self.lock:
+            self.runs[run_id] = {"polls": polls, "seconds": seconds, "status": status}
+            while len(self.runs) > self.max_runs:
+                self.runs.pop(next(iter(self.runs)))
+
+    def get(self, run_id):
+        """
+        Returns the stats of a run, or None if it is not known.
+        """
+        return self.runs.get(run_id)
+
+    def summary(self):
+        """
+        Returns the poll count and duration percentiles of the recorded runs.
+
+        Returns:
+            dict: The run count, mean polls and p50/p99 of polls and seconds.
+        """
+        with self.lock:
+            runs = list(self.runs.values())
+        if not runs:
+            return {"runs": 0}
+        polls = sorted(run["polls"] for run in runs)
+        seconds = sorted(run["seconds"] for run in runs)
+        return {
+            "runs": len(polls),
+            "mean_polls": sum(polls) / len(polls),
+            "p50_polls": percentile(polls, 50),
+            "p99_polls": percentile(polls, 99),
+            "p50_seconds": percentile(seconds, 50),
+            "p99_seconds": percentile(seconds, 99),
+        }
+
+
+def percentile(sorted_values, percent):
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
@@ -0,0 +1,463 @@
+import ast
+import atexit
+import contextlib
+import contextvars
+import io
+import json
+import logging
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import traceback
+from collections import OrderedDict, deque
+
+#
+# Pre-started Python interpreters for the exec_python tool.
+# Each worker is a subprocess running worker_main() below. A worker is bound to one conversation
+# thread, so variables defined in one call are there in the next call on that thread. Workers are
+# recycled after max_executions calls or once their memory grows past recycle_rss_mb, and killed
+# when a call runs past its timeout. Output is captured inside the worker up to output_limit
+# characters, the rest is only counted.
+#
+
+logger = logging.getLogger(__name__)
+
+# Which interpreter state code runs in, set to the thread ID while a run's tool calls execute
+execution_key = contextvars.ContextVar("execution_key", default="default")
+
+DEFAULT_PYTHON_WORKER_SETTINGS = {
+    # Most interpreters alive at once, idle ones of other threads are shut down to make room
+    "max_workers": 4,
+    # Interpreters started ahead of time, ready to be bound to a new thread
+    "warm_workers": 1,
+    # Recycle a worker after this many executions
+    "max_executions": 200,
+    # Recycle a worker once its peak resident memory passes this, in MB
+    "recycle_rss_mb": 512,
+    # Address space limit of a worker in MB, None for no limit
+    "memory_limit_mb": 2048,
+    # Wall-clock seconds per execution before the worker is killed
+    "timeout": 60.0,
+    # Characters of output kept per execution
+    "output_limit": 10000,
+}
+
+
+class CappedWriter(io.TextIOBase):
+    def __init__(self, limit):
+        """
+        A text stream keeping the first `limit` characters written to it and counting the rest.
+        """
+        self.limit = limit
+        self.parts = []
+        self.kept = 0
+        self.dropped = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        room = self.limit - self.kept
+        if room > 0:
+            self.parts.append(text[:room])
+            self.kept += min(room, len(text))
+        self.dropped += max(0, len(text) - max(room, 0))
+        return len(text)
+
+    def getvalue(self):
+        return "".join(self.parts)
+
+
+def run_cell(code, namespace, output_limit):
+    """
+    Runs a cell like an interactive shell does: the value of a trailing expression is the result.
+    Runs inside the worker.
+    """
+    writer = CappedWriter(output_limit)
+    result = None
+    error = None
+    with contextlib.redirect_stdout(writer), contextlib.redirect_stderr(writer):
+        try:
+            tree = ast.parse(code, "<cell>", "exec")
+            last = None
+            if tree.body and isinstance(tree.body[-1], ast.Expr):
+                last = ast.Expression(tree.body.pop().value)
+            exec(compile(tree, "<cell>", "exec"), namespace)
+            if last is not None:
+                value = eval(compile(last, "<cell>", "eval"), namespace)
+                if value is not None:
+                    result = repr(value)[:output_limit]
+        except BaseException:
+            error_type, error_value, error_traceback = sys.exc_info()
+            if isinstance(error_value, SyntaxError):
+                lines = traceback.format_exception_only(error_type, error_value)
+            else:
+                # Leave this function's frame out of the traceback
+                lines = traceback.format_exception(error_type, error_value, error_traceback.tb_next)
+            error = "".join(lines)[-output_limit:]
+    return {
+        "output": writer.getvalue(),
+        "dropped": writer.dropped,
+        "result": result,
+        "error": error,
+        "max_rss_bytes": get_max_rss(),
+    }
+
+
+def get_max_rss():
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def worker_main(memory_limit_mb=None):
+    """
+    The request loop of a worker process: one JSON request per line on stdin, one JSON reply per line.
+    """
+    if memory_limit_mb:
+        try:
+            import resource
+            limit = int(memory_limit_mb) * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass
+    # Keep the protocol on private copies of stdin/stdout, so neither user code nor the processes
+    # it starts can read requests or write into the replies
+    requests_in = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    replies_out = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    sys.stdin = open(os.devnull)
+    namespace = {"__name__": "__main__"}
+    for line in requests_in:
+        request = json.loads(line)
+        reply = run_cell(request["code"], namespace, request["output_limit"])
+        replies_out.write(json.dumps(reply) + "\n")
+        replies_out.flush()
+
+
+class PythonWorker():
+    def __init__(self, memory_limit_mb=None):
+        """
+        Starts a worker process.
+
+        Args:
+            memory_limit_mb (int): Address space limit of the worker, None for no limit.
+        """
+        command = [sys.executable, "-u", os.path.abspath(__file__)]
+        if memory_limit_mb:
+            command.append(str(memory_limit_mb))
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            # Its own process group, so a timeout also kills whatever the code started
+            start_new_session=os.name == "posix",
+        )
+        self.replies = queue.Queue()
+        self.executions = 0
+        self.max_rss_bytes = 0
+        self.key = None
+        self.busy = False
+        threading.Thread(target=self.read_replies, name="python_worker_reader", daemon=True).start()
+
+    def read_replies(self):
+        for line in self.process.stdout:
+            self.replies.put(line)
+        # The worker exited
+        self.replies.put(None)
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def execute(self, code, timeout, output_limit):
+        """
+        Runs code in the worker.
+
+        Returns:
+            dict: The reply: output, dropped, result, error, max_rss_bytes and timed_out.
+        """
+        self.executions += 1
+        request = json.dumps({"code": code, "output_limit": output_limit}) + "\n"
+        try:
+            self.process.stdin.write(request.encode("utf-8"))
+            self.process.stdin.flush()
+            line = self.replies.get(timeout=timeout)
+        except queue.Empty:
+            self.kill()
+            return {"output": "", "dropped": 0, "result": None, "timed_out": True,
+                    "error": f"Execution timed out after {timeout} seconds, the interpreter was restarted and its state is lost."}
+        except (BrokenPipeError, OSError):
+            line = None
+        if line is None:
+            self.kill()
+            return {"output": "", "dropped": 0, "result": None, "timed_out": False,
+                    "error": "The interpreter exited (out of memory or a crash), its state is lost."}
+        reply = json.loads(line)
+        reply["timed_out"] = False
+        self.max_rss_bytes = reply.get("max_rss_bytes") or 0
+        return reply
+
+    def kill(self):
+        if not self.is_alive():
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(self.process.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        except OSError:
+            pass
+        self.process.wait()
+
+    def close(self):
+        """
+        Stops the worker, killing it if it does not exit on its own.
+        """
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+
+class PythonWorkerPool():
+    def __init__(self, **settings):
+        """
+        Initializes a pool of Python workers. Workers are started on first use.
+
+        Args:
+            **settings: Any keys of DEFAULT_PYTHON_WORKER_SETTINGS.
+        """
+        unknown = set(settings) - set(DEFAULT_PYTHON_WORKER_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown python worker settings: {sorted(unknown)}")
+        self.settings = dict(DEFAULT_PYTHON_WORKER_SETTINGS, **settings)
+        self.condition = threading.Condition()
+        # Thread key to its worker, least recently used first
+        self.bound = OrderedDict()
+        self.warm = deque()
+        self.starting = 0
+        self.closed = False
+        self.stats = {"executions": 0, "timeouts": 0, "recycled": 0, "evicted": 0, "started": 0}
+
+    def worker_count(self):
+        return len(self.bound) + len(self.warm) + self.starting
+
+    def start_worker(self):
+        worker = PythonWorker(self.settings["memory_limit_mb"])
+        self.stats["started"] += 1
+        return worker
+
+    def fill_warm(self):
+        """
+        Starts warm workers in the background until there are warm_workers of them, within max_workers.
+        Called after each bind and recycle; call it once at startup so the first exec_python is warm too.
+        """
+        with self.condition:
+            wanted = min(
+                self.settings["warm_workers"] - len(self.warm) - self.starting,
+                self.settings["max_workers"] - self.worker_count(),
+            )
+            if self.closed or wanted <= 0:
+                return
+            self.starting += wanted
+
+        def start():
+            for _ in range(wanted):
+                worker = self.start_worker()
+                with self.condition:
+                    self.starting -= 1
+                    if self.closed:
+                        worker.close()
+                        continue
+                    self.warm.append(worker)
+                    self.condition.notify_all()
+
+        threading.Thread(target=start, name="python_worker_warmup", daemon=True).start()
+
+    def acquire(self, key):
+        """
+        Returns the worker bound to `key`, binding a warm or new one if it has none.
+        Waits while the thread's worker is busy, or while every worker is busy and the pool is full.
+        """
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise RuntimeError("The python worker pool is shut down")
+                worker = self.bound.get(key)
+                if worker is not None:
+                    if not worker.busy:
+                        self.bound.move_to_end(key)
+                        worker.busy = True
+                        return worker
+                elif self.warm:
+                    worker = self.warm.popleft()
+                    break
+                elif self.worker_count() < self.settings["max_workers"]:
+                    self.starting += 1
+                    worker = None
+                    break
+                elif self.evict_idle():
+                    continue
+                self.condition.wait()
+        if worker is None:
+            try:
+                worker = self.start_worker()
+            finally:
+                with self.condition:
+                    self.starting -= 1
+        with self.condition:
+            worker.key = key
+            worker.busy = True
+            self.bound[key] = worker
+        self.fill_warm()
+        return worker
+
+    def evict_idle(self):
+        """
+        Shuts down the least recently used idle worker to make room. Call with the condition held.
+        """
+        for key, worker in self.bound.items():
+            if not worker.busy:
+                del self.bound[key]
+                self.stats["evicted"] += 1
+                threading.Thread(target=worker.close, daemon=True).start()
+                return True
+        return False
+
+    def release(self, worker):
+        """
+        Returns a worker after an execution, recycling it if it died, ran too often or grew too big.
+        """
+        recycle = (
+            not worker.is_alive()
+            or worker.executions >= self.settings["max_executions"]
+            or worker.max_rss_bytes > self.settings["recycle_rss_mb"] * 1024 * 1024
+        )
+        with self.condition:
+            worker.busy = False
+            if recycle:
+                if self.bound.get(worker.key) is worker:
+                    del self.bound[worker.key]
+                self.stats["recycled"] += 1
+            self.condition.notify_all()
+        if recycle:
+            worker.close()
+            self.fill_warm()
+
+    def execute(self, code, key=None, timeout=None, output_limit=None):
+        """
+        Runs Python code in the interpreter of a thread.
+
+        Args:
+            code (str): The cell to run.
+            key (str): Whose interpreter state to use, defaults to the thread whose tool calls are running.
+            timeout (float): Wall-clock seconds before the worker is killed, defaults to the pool setting.
+            output_limit (int): Characters of output to keep, defaults to the pool setting.
+
+        Returns:
+            dict: output, dropped (characters not kept), result (repr of a trailing expression),
+                error (traceback or None), timed_out.
+        """
+        key = execution_key.get() if key is None else key
+        timeout = self.settings["timeout"] if timeout is None else timeout
+        output_limit = self.settings["output_limit"] if output_limit is None else output_limit
+        worker = self.acquire(key)
+        try:
+            reply = worker.execute(code, timeout, output_limit)
+        finally:
+            self.release(worker)
+        with self.condition:
+            self.stats["executions"] += 1
+            if reply["timed_out"]:
+                self.stats["timeouts"] += 1
+        return reply
+
+    def get_stats(self):
+        with self.condition:
+            return dict(self.stats, bound=len(self.bound), warm=len(self.warm))
+
+    def shutdown(self):
+        """
+        Stops every worker.
+        """
+        with self.condition:
+            self.closed = True
+            workers = list(self.bound.values()) + list(self.warm)
+            self.bound.clear()
+            self.warm.clear()
+            self.condition.notify_all()
+        for worker in workers:
+            worker.close()
+
+
+def format_execution(reply):
+    """
+    Returns an execution reply as the text the assistant gets back.
+    """
+    parts = []
+    if reply["output"]:
+        parts.append(reply["output"])
+    if reply["dropped"]:
+        parts.append(f"... {reply['dropped']} more characters of output truncated")
+    if reply["result"] is not None:
+        parts.append(reply["result"])
+    if reply["error"]:
+        parts.append(reply["error"])
+    return "\n".join(parts) if parts else "None"
+
+
+python_worker_settings = {}
+shared_pool = None
+shared_pool_lock = threading.Lock()
+
+
+def configure_python_workers(**settings):
+    """
+    Changes the settings of the shared pool. Running workers of the old pool are stopped.
+
+    Args:
+        **settings: Any keys of DEFAULT_PYTHON_WORKER_SETTINGS.
+    """
+    global shared_pool
+    unknown = set(settings) - set(DEFAULT_PYTHON_WORKER_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown python worker settings: {sorted(unknown)}")
+    with shared_pool_lock:
+        python_worker_settings.update(settings)
+        old_pool, shared_pool = shared_pool, None
+    if old_pool is not None:
+        old_pool.shutdown()
+
+
+def get_python_pool():
+    """
+    Returns the process-wide pool exec_python runs on.
+    """
+    global shared_pool
+    with shared_pool_lock:
+        if shared_pool is None:
+            shared_pool = PythonWorkerPool(**python_worker_settings)
+        return shared_pool
+
+
+@atexit.register
+def shutdown_python_pool():
+    with shared_pool_lock:
+        pool = shared_pool
+    if pool is not None:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    worker_main(sys.argv[1] if len(sys.argv) > 1 else None)
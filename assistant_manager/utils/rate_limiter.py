@@ -0,0 +1,316 @@
+import asyncio
+import email.utils
+import random
+import re
+import threading
+import time
+import httpx
+
+#
+# Process-wide rate limit governor, plugged into the OpenAI clients as an httpx transport so
+# every API call goes through it.
+# Each endpoint class (assistants, threads, messages, runs, ...) has a request bucket and a token
+# bucket, refilled from the x-ratelimit-* headers of its responses. A request waits while its
+# buckets are empty instead of being sent into a 429. 429 and 5xx responses are retried with
+# jittered exponential backoff, waiting at least as long as retry-after asks.
+#
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+ENDPOINT_COLLECTIONS = ("assistants", "threads", "messages", "runs", "steps", "files")
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def endpoint_class(path):
+    """
+    Returns the endpoint class of an API path, the deepest known collection in it.
+    e.g. /v1/threads/thread_abc/runs/run_abc/submit_tool_outputs is "runs".
+    """
+    endpoint = "other"
+    for part in path.strip("/").split("/"):
+        if part in ENDPOINT_COLLECTIONS:
+            endpoint = part
+    return endpoint
+
+
+def parse_duration(value):
+    """
+    Parses an x-ratelimit-reset-* value such as "1s", "6m0s" or "20ms" into seconds, None if unparseable.
+    """
+    if not value:
+        return None
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def parse_retry_after(headers):
+    """
+    Returns the seconds a response asks to wait before retrying, or None.
+    """
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket():
+    def __init__(self):
+        """
+        A bucket that is unlimited until a response tells it its limit.
+        """
+        self.capacity = None
+        self.tokens = None
+        self.refill_per_second = None
+        self.updated_at = time.monotonic()
+        # Nothing is sent before this time, set by 429 responses
+        self.paused_until = 0.0
+
+    def refill(self, now):
+        if self.capacity is not None and self.refill_per_second:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def reserve(self, amount, now):
+        """
+        Takes tokens, going into debt if there are not enough.
+        Taking 0 tokens takes nothing but still waits while the bucket is empty.
+
+        Returns:
+            float: How many seconds the caller should wait before sending.
+        """
+        self.refill(now)
+        wait = max(0.0, self.paused_until - now)
+        if self.capacity is None:
+            return wait
+        self.tokens -= amount
+        if self.tokens < 0 or (amount == 0 and self.tokens <= 0):
+            # Wait until the debt is paid off, or for an empty bucket until it holds a token again
+            needed = -self.tokens if amount else 1.0 - self.tokens
+            if self.refill_per_second:
+                wait = max(wait, needed / self.refill_per_second)
+            else:
+                wait = max(wait, 1.0)
+        return wait
+
+    def update(self, limit, remaining, reset_seconds, now):
+        """
+        Resets the bucket to what the API reported.
+
+        Args:
+            limit (float): The bucket capacity.
+            remaining (float): What is left now.
+            reset_seconds (float): How long until the bucket is full again.
+        """
+        self.capacity = limit
+        self.tokens = remaining
+        if reset_seconds:
+            self.refill_per_second = max(limit - remaining, 1.0) / reset_seconds
+        elif self.refill_per_second is None:
+            self.refill_per_second = limit / 60.0
+        self.updated_at = now
+
+    def pause(self, seconds, now):
+        self.paused_until = max(self.paused_until, now + seconds)
+
+
+class RateLimitGovernor():
+    def __init__(self, max_retries=5, base_delay=0.5, max_delay=30.0):
+        """
+        Initializes the governor with empty, unlimited buckets.
+
+        Args:
+            max_retries (int): How many times a 429/5xx response is retried.
+            base_delay (float): The backoff of the first retry, in seconds, doubled on each retry.
+            max_delay (float): The longest backoff, in seconds.
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.stats = {}
+
+    def get_buckets(self, endpoint):
+        """
+        Returns the (requests, tokens) buckets of an endpoint class. Call with the lock held.
+        """
+        if endpoint not in self.buckets:
+            self.buckets[endpoint] = (TokenBucket(), TokenBucket())
+            self.stats[endpoint] = {"requests": 0, "waits": 0, "wait_seconds": 0.0, "retries": 0, "rate_limited": 0}
+        return self.buckets[endpoint]
+
+    def reserve(self, endpoint):
+        """
+        Takes a request from an endpoint class's buckets.
+
+        Returns:
+            float: How many seconds to wait before sending.
+        """
+        now = time.monotonic()
+        with self.lock:
+            requests_bucket, tokens_bucket = self.get_buckets(endpoint)
+            # Token use is only known afterwards, so only wait while the token bucket is empty
+            wait = max(requests_bucket.reserve(1, now), tokens_bucket.reserve(0, now))
+            stats = self.stats[endpoint]
+            stats["requests"] += 1
+            if wait > 0:
+                stats["waits"] += 1
+                stats["wait_seconds"] += wait
+        return wait
+
+    def record_response(self, endpoint, response):
+        """
+        Updates an endpoint class's buckets from a response's headers.
+        """
+        headers = response.headers
+        now = time.monotonic()
+        with self.lock:
+            requests_bucket, tokens_bucket = self.get_buckets(endpoint)
+            for bucket, kind in ((requests_bucket, "requests"), (tokens_bucket, "tokens")):
+                limit = headers.get(f"x-ratelimit-limit-{kind}")
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                if limit is None or remaining is None:
+                    continue
+                try:
+                    bucket.update(float(limit), float(remaining), parse_duration(headers.get(f"x-ratelimit-reset-{kind}")), now)
+                except ValueError:
+                    continue
+            if response.status_code == 429:
+                self.stats[endpoint]["rate_limited"] += 1
+                # Hold back every caller of this endpoint class, not just the one that got the 429
+                requests_bucket.pause(parse_retry_after(headers) or self.base_delay, now)
+
+    def retry_delay(self, endpoint, attempt, response=None):
+        """
+        Returns how long to wait before retry number `attempt` (0 based), or None if no retry is left.
+        """
+        if attempt >= self.max_retries:
+            return None
+        backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+        # Full jitter so callers that failed together don't retry together
+        delay = random.uniform(backoff / 2, backoff)
+        if response is not None:
+            retry_after = parse_retry_after(response.headers)
+            if retry_after is not None:
+                delay = max(delay, retry_after + random.uniform(0, self.base_delay))
+        with self.lock:
+            self.stats[endpoint]["retries"] += 1
+        return delay
+
+    def get_stats(self):
+        """
+        Returns per endpoint class request, wait, retry and 429 counts and what is left in the buckets.
+        """
+        with self.lock:
+            stats = {}
+            for endpoint, counts in self.stats.items():
+                requests_bucket, tokens_bucket = self.buckets[endpoint]
+                stats[endpoint] = dict(counts, remaining_requests=requests_bucket.tokens, remaining_tokens=tokens_bucket.tokens)
+            return stats
+
+
+class GovernedTransport(httpx.BaseTransport):
+    def __init__(self, governor, transport):
+        """
+        Sends requests through `transport`, pacing and retrying them with `governor`.
+        """
+        self.governor = governor
+        self.transport = transport
+
+    def handle_request(self, request):
+        endpoint = endpoint_class(request.url.path)
+        attempt = 0
+        while True:
+            wait = self.governor.reserve(endpoint)
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                response = self.transport.handle_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                # The request never reached the API, so it is safe to send again
+                delay = self.governor.retry_delay(endpoint, attempt)
+                if delay is None:
+                    raise
+            else:
+                self.governor.record_response(endpoint, response)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                delay = self.governor.retry_delay(endpoint, attempt, response)
+                if delay is None:
+                    return response
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncGovernedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, governor, transport):
+        """
+        Async version of GovernedTransport, sharing the same governor.
+        """
+        self.governor = governor
+        self.transport = transport
+
+    async def handle_async_request(self, request):
+        endpoint = endpoint_class(request.url.path)
+        attempt = 0
+        while True:
+            wait = self.governor.reserve(endpoint)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                response = await self.transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                delay = self.governor.retry_delay(endpoint, attempt)
+                if delay is None:
+                    raise
+            else:
+                self.governor.record_response(endpoint, response)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                delay = self.governor.retry_delay(endpoint, attempt, response)
+                if delay is None:
+                    return response
+                await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+shared_governor = None
+shared_governor_lock = threading.Lock()
+
+
+def get_rate_limit_governor():
+    """
+    Returns the process-wide governor, so every manager and client shares the same buckets.
+    """
+    global shared_governor
+    with shared_governor_lock:
+        if shared_governor is None:
+            shared_governor = RateLimitGovernor()
+        return shared_governor
@@ -0,0 +1,204 @@
+import os
+import shlex
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+
+#
+# Script execution for the exec_sh tool.
+# Every script goes to its own temporary file that its interpreter is given as an argument,
+# so concurrent calls never share a path and no chmod is needed. stdin is closed, so a
+# command that reads it gets end of file instead of waiting.
+# At most max_concurrent scripts run at once. Each one has a timeout, after which its
+# whole process group is killed. stdout and stderr are read as they arrive and only the
+# first output_limit_bytes of each are kept.
+#
+
+DEFAULT_SHELL_SETTINGS = {
+    # Scripts running at once, further calls wait for a slot
+    "max_concurrent": 4,
+    # Wall-clock seconds per script
+    "timeout": 120.0,
+    # Bytes of stdout and of stderr kept per script
+    "output_limit_bytes": 65536,
+    # Interpreter for scripts without a shebang line
+    "default_shell": "/bin/sh",
+}
+
+def get_interpreter(script, default_shell):
+    """
+    Returns the interpreter command of a script from its shebang line.
+
+    Returns:
+        list: The command, the script file is appended to it.
+    """
+    command = [default_shell]
+    if script.startswith("#!"):
+        command = shlex.split(script[2:].splitlines()[0]) or command
+    return command
+
+
+class CappedReader():
+    def __init__(self, stream, limit):
+        """
+        Drains a pipe in a background thread, keeping the first `limit` bytes and counting the rest.
+        """
+        self.limit = limit
+        self.chunks = []
+        self.kept = 0
+        self.dropped = 0
+        self.thread = threading.Thread(target=self.read, args=(stream,), daemon=True)
+        self.thread.start()
+
+    def read(self, stream):
+        with stream:
+            for chunk in iter(lambda: stream.read1(65536), b""):
+                room = self.limit - self.kept
+                if room > 0:
+                    self.chunks.append(chunk[:room])
+                    self.kept += min(room, len(chunk))
+                self.dropped += max(0, len(chunk) - max(room, 0))
+
+    def get_text(self):
+        self.thread.join()
+        return b"".join(self.chunks).decode("utf-8", errors="replace")
+
+
+class ShellRunner():
+    def __init__(self, **settings):
+        """
+        Initializes a shell runner.
+
+        Args:
+            **settings: Any keys of DEFAULT_SHELL_SETTINGS.
+        """
+        unknown = set(settings) - set(DEFAULT_SHELL_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown shell settings: {sorted(unknown)}")
+        self.settings = dict(DEFAULT_SHELL_SETTINGS, **settings)
+        self.slots = threading.BoundedSemaphore(self.settings["max_concurrent"])
+
+    def run(self, script, timeout=None, cwd=None):
+        """
+        Runs a script and waits for it.
+
+        Args:
+            script (str): The script, a shebang line picks its interpreter.
+            timeout (float): Wall-clock seconds, defaults to the runner setting.
+            cwd (str): The working directory, defaults to the current one.
+
+        Returns:
+            dict: stdout, stderr, stdout_dropped and stderr_dropped (bytes not kept),
+                exit_status (None if it timed out) and timed_out.
+        """
+        timeout = self.settings["timeout"] if timeout is None else timeout
+        command = get_interpreter(script, self.settings["default_shell"])
+        with self.slots:
+            with tempfile.NamedTemporaryFile("w", prefix="exec_sh_", suffix=".script", delete=False) as script_file:
+                script_file.write(script)
+            try:
+                return self.execute(command + [script_file.name], timeout, cwd)
+            finally:
+                os.remove(script_file.name)
+
+    def execute(self, command, timeout, cwd):
+        try:
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=cwd,
+                # Its own process group, so a timeout also kills whatever the script started
+                start_new_session=os.name == "posix",
+            )
+        except OSError as e:
+            # The interpreter does not exist or cannot be run, reported like a shell would
+            return {"stdout": "", "stderr": str(e), "stdout_dropped": 0, "stderr_dropped": 0,
+                    "exit_status": 127, "timed_out": False}
+        limit = self.settings["output_limit_bytes"]
+        stdout = CappedReader(process.stdout, limit)
+        stderr = CappedReader(process.stderr, limit)
+        deadline = time.monotonic() + timeout
+        timed_out = False
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            kill_process_group(process)
+        # Background processes the script left behind can hold the pipes open past its exit
+        for reader in (stdout, stderr):
+            reader.thread.join(max(0.0, deadline - time.monotonic()))
+            if reader.thread.is_alive():
+                kill_process_group(process)
+        return {
+            "stdout": stdout.get_text(),
+            "stderr": stderr.get_text(),
+            "stdout_dropped": stdout.dropped,
+            "stderr_dropped": stderr.dropped,
+            "exit_status": None if timed_out else process.returncode,
+            "timed_out": timed_out,
+        }
+
+
+def kill_process_group(process):
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except OSError:
+        pass
+    process.wait()
+
+
+def format_shell_result(result):
+    """
+    Returns a script's result as the text the assistant gets back.
+    """
+    parts = [result["stdout"].rstrip("\n")] if result["stdout"] else []
+    if result["stdout_dropped"]:
+        parts.append(f"... {result['stdout_dropped']} more bytes of stdout truncated")
+    if result["stderr"]:
+        parts.append(f"[stderr]\n{result['stderr'].rstrip()}")
+    if result["stderr_dropped"]:
+        parts.append(f"... {result['stderr_dropped']} more bytes of stderr truncated")
+    if result["timed_out"]:
+        parts.append("[timed out, the script was killed]")
+    else:
+        parts.append(f"[exit status {result['exit_status']}]")
+    return "\n".join(parts)
+
+
+shell_settings = {}
+shared_runner = None
+shared_runner_lock = threading.Lock()
+
+
+def configure_shell(**settings):
+    """
+    Changes the settings of the shared shell runner. Scripts already running keep the old settings.
+
+    Args:
+        **settings: Any keys of DEFAULT_SHELL_SETTINGS.
+    """
+    global shared_runner
+    unknown = set(settings) - set(DEFAULT_SHELL_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown shell settings: {sorted(unknown)}")
+    with shared_runner_lock:
+        shell_settings.update(settings)
+        shared_runner = None
+
+
+def get_shell_runner():
+    """
+    Returns the process-wide runner exec_sh uses.
+    """
+    global shared_runner
+    with shared_runner_lock:
+        if shared_runner is None:
+            shared_runner = ShellRunner(**shell_settings)
+        return shared_runner
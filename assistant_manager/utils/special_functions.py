@@ -1,4 +1,5 @@
 import json
+from assistant_manager.utils.dynamic_tools import get_dynamic_tool_loader
 from yfinance import Ticker
 
 def get_stock_price(symbol):
@@ -89,9 +90,8 @@ def create_image_variation(assistant, image_path, n=1, size='1024x1024'):
     # Function to append a new tool function and its metadata
 def append_new_tool_function_and_metadata(function_name: str, function_code: str, metadata: dict, tool_meta_description: str):
     try:
-        # Logic to append new function code to dynamic_functions.py
-        with open('assistant_manager/functions/dynamic/dynamic_functions.py', 'a') as file:
-            file.write(f'\n\n{function_code}')
+        # Each dynamic tool is its own module under functions/dynamic/tools/, callable straight away
+        get_dynamic_tool_loader().add_tool(function_name, function_code)
 
         
         # Add the tool_meta_description to the metadata dict
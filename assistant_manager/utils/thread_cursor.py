@@ -0,0 +1,64 @@
+from collections import OrderedDict
+
+#
+# Tracks what has already been shown on one thread.
+# The cursor is the newest message ID fetched, so new messages are one list_messages(after=cursor)
+# call away. The seen set covers messages shown some other way (the user's own message, streamed
+# replies) and is bounded so long-lived processes don't grow without limit.
+#
+
+
+class ThreadCursor():
+    def __init__(self, max_seen=1000):
+        """
+        Initializes an empty cursor.
+
+        Args:
+            max_seen (int): How many message IDs to remember, the oldest are forgotten first.
+        """
+        self.cursor = None
+        self.max_seen = max_seen
+        self.seen = OrderedDict()
+
+    def mark_seen(self, message_id):
+        """
+        Remembers a message as shown.
+        """
+        self.seen[message_id] = None
+        self.seen.move_to_end(message_id)
+        if len(self.seen) > self.max_seen:
+            self.seen.popitem(last=False)
+
+    def is_seen(self, message_id):
+        """
+        Returns True if the message was already shown.
+        """
+        return message_id in self.seen
+
+    def advance(self, message_id):
+        """
+        Moves the cursor to a message fetched from the thread and marks it as shown.
+        """
+        self.cursor = message_id
+        self.mark_seen(message_id)
+
+    def take_unseen(self, messages):
+        """
+        Advances over fetched messages, oldest first, and returns the ones not shown before.
+
+        Args:
+            messages (list): Messages fetched after the cursor, oldest first.
+
+        Returns:
+            list: The messages that were not seen yet.
+        """
+        unseen = [message for message in messages if not self.is_seen(message.id)]
+        for message in messages:
+            self.advance(message.id)
+        return unseen
+
+    def list_seen(self):
+        """
+        Returns the remembered message IDs, oldest first.
+        """
+        return list(self.seen)
@@ -0,0 +1,158 @@
+import os
+import sqlite3
+import threading
+import time
+from assistant_manager.utils.file_operations import read_json
+
+#
+# Thread names and IDs in SQLite, replacing the thread_ids.json file.
+# Every write is one transaction, so several processes can register threads at once without
+# losing each other's entries. Names are the primary key and IDs are indexed, so lookups in
+# either direction and prefix searches are index seeks instead of file scans.
+#
+
+# Next to the package, so the registry opens whatever the working directory is
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_THREAD_REGISTRY_PATH = os.path.join(PACKAGE_DIR, 'threads.sqlite3')
+LEGACY_THREAD_IDS_PATH = os.path.join(PACKAGE_DIR, 'thread_ids.json')
+
+
+class ThreadRegistry():
+    def __init__(self, path=DEFAULT_THREAD_REGISTRY_PATH, legacy_path=LEGACY_THREAD_IDS_PATH):
+        """
+        Opens (or creates) the thread registry, importing thread_ids.json the first time.
+
+        Args:
+            path (str): The SQLite database file, ":memory:" keeps the registry in memory.
+            legacy_path (str): The thread_ids.json file to import, None skips the import.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        # Wait for other processes holding the write lock instead of failing straight away
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.lock, self.connection:
+            if path != ":memory:":
+                self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS threads ("
+                " name TEXT PRIMARY KEY,"
+                " thread_id TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS threads_by_id ON threads (thread_id)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS threads_by_time ON threads (updated_at)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS registry_state ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL)"
+            )
+        if legacy_path is not None:
+            self.import_legacy(legacy_path)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def import_legacy(self, legacy_path):
+        """
+        Imports a thread_ids.json file once. The file is left in place.
+
+        Args:
+            legacy_path (str): The thread_ids.json file.
+
+        Returns:
+            int: The number of threads imported, 0 if the file was imported before.
+        """
+        if not os.path.exists(legacy_path):
+            return 0
+        data = read_json(legacy_path) or {}
+        now = time.time()
+        with self.lock, self.connection:
+            key = f"imported:{os.path.abspath(legacy_path)}"
+            # Claiming the import is the first write of the transaction, so a process starting at
+            # the same time either waits for this one or finds the claim and skips the import
+            claimed = self.connection.execute(
+                "INSERT OR IGNORE INTO registry_state (key, value) VALUES (?, ?)", (key, str(now))
+            ).rowcount
+            if not claimed:
+                return 0
+            # Names already registered win over the file
+            self.connection.executemany(
+                "INSERT INTO threads (name, thread_id, updated_at) VALUES (?, ?, ?) ON CONFLICT (name) DO NOTHING",
+                [(name, thread_id, now) for name, thread_id in data.items()],
+            )
+        return len(data)
+
+    def add(self, name, thread_id):
+        """
+        Registers a thread under a name, replacing the thread previously registered under it.
+
+        Args:
+            name (str): The name of the thread.
+            thread_id (str): The ID of the thread.
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO threads (name, thread_id, updated_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (name) DO UPDATE SET thread_id = excluded.thread_id, updated_at = excluded.updated_at",
+                (name, thread_id, time.time()),
+            )
+
+    def get_id(self, name):
+        """
+        Returns the ID of the thread registered under a name, or None.
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT thread_id FROM threads WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def get_name(self, thread_id):
+        """
+        Returns the most recently registered name of a thread ID, or None if the ID is not registered.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT name FROM threads WHERE thread_id = ? ORDER BY updated_at DESC LIMIT 1", (thread_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def search(self, prefix="", limit=20):
+        """
+        Returns registered threads whose name starts with a prefix.
+
+        Args:
+            prefix (str): The start of the name, an empty prefix returns the most recently registered threads.
+            limit (int): The most threads to return.
+
+        Returns:
+            list: (name, thread_id) pairs, in name order for a prefix, newest first otherwise.
+        """
+        with self.lock:
+            if prefix == "":
+                rows = self.connection.execute(
+                    "SELECT name, thread_id FROM threads ORDER BY updated_at DESC LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                # A range on the primary key rather than LIKE, so the index is used
+                upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+                rows = self.connection.execute(
+                    "SELECT name, thread_id FROM threads WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+                    (prefix, upper, limit),
+                ).fetchall()
+        return rows
+
+    def get_all(self):
+        """
+        Returns every registered thread as a dict of name to ID, like thread_ids.json.
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT name, thread_id FROM threads").fetchall()
+        return dict(rows)
+
+    def count(self):
+        """
+        Returns the number of registered threads.
+        """
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM threads").fetchone()[0]
@@ -0,0 +1,277 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+#
+# Memoization of deterministic tools.
+# A tool opts in by declaring "tool_cache" in its metadata, e.g.
+#     "tool_cache": {"ttl": 600, "max_entries": 256, "disk": true,
+#                    "normalize": {"lowercase": ["query"], "round": {"latitude": 2}, "ignore": []}}
+# Repeated calls with the same normalized arguments are served from an in-memory LRU per tool and,
+# for tools with "disk": true, from an SQLite store other processes share. Calls returning None
+# (the tools' error value) are never cached.
+#
+
+# Next to the package, so the disk tier opens whatever the working directory is
+DEFAULT_TOOL_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tool_cache.sqlite3')
+DEFAULT_TTL = 300.0
+DEFAULT_MAX_ENTRIES = 128
+
+
+class CachePolicy():
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, disk=False, normalize=None):
+        """
+        How a tool's outputs are cached, parsed from its "tool_cache" metadata.
+
+        Args:
+            ttl (float): Seconds an output stays valid.
+            max_entries (int): Outputs kept in memory for the tool, least recently used go first.
+            disk (bool): Also keep outputs in the shared on-disk store.
+            normalize (dict): How arguments are normalized into the key:
+                "lowercase" (list): string arguments compared case-insensitively,
+                "round" (dict): argument name to digits for float arguments,
+                "ignore" (list): arguments left out of the key,
+                "strip" (bool): strip whitespace of string arguments, default True.
+        """
+        normalize = normalize or {}
+        self.ttl = float(ttl)
+        self.max_entries = int(max_entries)
+        self.disk = bool(disk)
+        self.lowercase = set(normalize.get("lowercase", []))
+        self.round = dict(normalize.get("round", {}))
+        self.ignore = set(normalize.get("ignore", []))
+        self.strip = normalize.get("strip", True)
+
+    @classmethod
+    def from_metadata(cls, tool_metadata):
+        """
+        Returns the policy a tool's metadata declares, or None if the tool is not cached.
+        """
+        if not tool_metadata or not tool_metadata.get("tool_cache"):
+            return None
+        settings = tool_metadata["tool_cache"]
+        if settings is True:
+            settings = {}
+        return cls(**settings)
+
+    def normalize(self, name, value):
+        if isinstance(value, str):
+            if self.strip:
+                value = value.strip()
+            if name in self.lowercase:
+                value = value.lower()
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and name in self.round:
+            value = round(float(value), self.round[name])
+        return value
+
+
+@functools.lru_cache(maxsize=1024)
+def get_defaults(function):
+    """
+    Returns the default argument values of a tool, so leaving an argument out and passing its default share a key.
+    """
+    try:
+        parameters = inspect.signature(function).parameters.values()
+    except (TypeError, ValueError):
+        return {}
+    return {parameter.name: parameter.default for parameter in parameters if parameter.default is not inspect.Parameter.empty}
+
+
+def make_key(tool_name, arguments, policy, function=None):
+    """
+    Returns the cache key of a tool call.
+
+    Args:
+        tool_name (str): The name of the tool.
+        arguments (dict): The decoded arguments of the call.
+        policy (CachePolicy): The tool's cache policy.
+        function (callable): The tool, whose defaults are filled in before normalizing.
+
+    Returns:
+        str: A hash of the tool name and its normalized arguments.
+    """
+    values = dict(get_defaults(function)) if function is not None else {}
+    values.update(arguments)
+    normalized = {name: policy.normalize(name, value) for name, value in values.items() if name not in policy.ignore}
+    encoded = json.dumps([tool_name, normalized], sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ToolCache():
+    def __init__(self, disk_path=DEFAULT_TOOL_CACHE_PATH):
+        """
+        Initializes an empty tool cache. The disk store is opened the first time a tool uses it.
+
+        Args:
+            disk_path (str): The SQLite database file of the disk tier, None turns the disk tier off.
+        """
+        self.disk_path = disk_path
+        self.connection = None
+        # Tool name to an OrderedDict of key to (expires_at, output), most recently used last
+        self.memory = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def get_connection(self):
+        if self.connection is None:
+            connection = sqlite3.connect(self.disk_path, timeout=30, check_same_thread=False)
+            with connection:
+                if self.disk_path != ":memory:":
+                    connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS tool_cache ("
+                    " key TEXT PRIMARY KEY,"
+                    " tool_name TEXT NOT NULL,"
+                    " output TEXT NOT NULL,"
+                    " expires_at REAL NOT NULL)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS tool_cache_by_tool ON tool_cache (tool_name)")
+            self.connection = connection
+        return self.connection
+
+    def count(self, tool_name, event):
+        stats = self.stats.setdefault(tool_name, {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0})
+        stats[event] += 1
+
+    def get(self, tool_name, key, policy):
+        """
+        Looks a call up, memory first, then disk.
+
+        Returns:
+            tuple: (True, output) on a hit, (False, None) on a miss.
+        """
+        now = time.time()
+        with self.lock:
+            entries = self.memory.get(tool_name)
+            if entries is not None and key in entries:
+                expires_at, output = entries[key]
+                if expires_at > now:
+                    entries.move_to_end(key)
+                    self.count(tool_name, "hits")
+                    return True, output
+                del entries[key]
+            if policy.disk and self.disk_path is not None:
+                row = self.get_connection().execute(
+                    "SELECT output, expires_at FROM tool_cache WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    output = json.loads(row[0])
+                    self.remember(tool_name, key, row[1], output, policy)
+                    self.count(tool_name, "disk_hits")
+                    return True, output
+            self.count(tool_name, "misses")
+            return False, None
+
+    def remember(self, tool_name, key, expires_at, output, policy):
+        entries = self.memory.setdefault(tool_name, OrderedDict())
+        entries[key] = (expires_at, output)
+        entries.move_to_end(key)
+        while len(entries) > policy.max_entries:
+            entries.popitem(last=False)
+            self.count(tool_name, "evictions")
+
+    def put(self, tool_name, key, output, policy):
+        """
+        Stores a tool output. None outputs are not stored.
+        """
+        if output is None:
+            return
+        expires_at = time.time() + policy.ttl
+        with self.lock:
+            self.remember(tool_name, key, expires_at, output, policy)
+            self.count(tool_name, "stores")
+            if policy.disk and self.disk_path is not None:
+                try:
+                    encoded = json.dumps(output)
+                except (TypeError, ValueError):
+                    # Only JSON outputs go to disk, the memory tier still has it
+                    return
+                with self.get_connection() as connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO tool_cache (key, tool_name, output, expires_at) VALUES (?, ?, ?, ?)",
+                        (key, tool_name, encoded, expires_at),
+                    )
+                    connection.execute("DELETE FROM tool_cache WHERE expires_at <= ?", (time.time(),))
+
+    def call(self, tool_name, arguments, policy, function, call):
+        """
+        Returns the cached output of a tool call, or makes the call and caches its output.
+
+        Args:
+            tool_name (str): The name of the tool.
+            arguments (dict): The decoded arguments.
+            policy (CachePolicy): The tool's cache policy.
+            function (callable): The tool, for its argument defaults.
+            call (callable): Makes the call when it is not cached.
+
+        Returns:
+            The tool output.
+        """
+        key = make_key(tool_name, arguments, policy, function)
+        hit, output = self.get(tool_name, key, policy)
+        if hit:
+            return output
+        output = call()
+        # Coroutines of async managers cannot be replayed, only plain outputs are cached
+        if not inspect.isawaitable(output):
+            self.put(tool_name, key, output, policy)
+        return output
+
+    def invalidate(self, tool_name=None):
+        """
+        Drops the cached outputs of one tool, or of every tool, in memory and on disk.
+        """
+        with self.lock:
+            if tool_name is None:
+                self.memory.clear()
+            else:
+                self.memory.pop(tool_name, None)
+            if self.connection is not None:
+                with self.connection:
+                    if tool_name is None:
+                        self.connection.execute("DELETE FROM tool_cache")
+                    else:
+                        self.connection.execute("DELETE FROM tool_cache WHERE tool_name = ?", (tool_name,))
+
+    def get_stats(self, tool_name=None):
+        """
+        Returns hits, disk hits, misses, stores, evictions and the hit rate of each cached tool.
+
+        Args:
+            tool_name (str): Only this tool, defaults to all of them.
+
+        Returns:
+            dict: Per tool, the counters plus "hit_rate" and "entries" in memory.
+                For a single tool the counters themselves, or None if it was never looked up.
+        """
+        with self.lock:
+            stats = {}
+            for name, counters in self.stats.items():
+                if tool_name is not None and name != tool_name:
+                    continue
+                lookups = counters["hits"] + counters["disk_hits"] + counters["misses"]
+                stats[name] = dict(
+                    counters,
+                    hit_rate=(counters["hits"] + counters["disk_hits"]) / lookups if lookups else None,
+                    entries=len(self.memory.get(name, ())),
+                )
+        if tool_name is not None:
+            return stats.get(tool_name)
+        return stats
+
+
+shared_tool_cache = ToolCache()
+
+
+def get_tool_cache():
+    """
+    Returns the process-wide tool cache every manager shares.
+    """
+    return shared_tool_cache
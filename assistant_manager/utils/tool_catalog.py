@@ -0,0 +1,153 @@
+import os
+import threading
+from assistant_manager.utils.file_operations import read_json
+
+FUNCTIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'functions')
+DEFAULT_METADATA_PATHS = [
+    os.path.join(FUNCTIONS_DIR, 'static', 'default_functions_metadata.json'),
+    os.path.join(FUNCTIONS_DIR, 'dynamic', 'functions_metadata.json'),
+]
+
+
+class ToolCatalog():
+    def __init__(self, paths=None):
+        """
+        Caches the merged tool metadata files, reloading only when one of them changes on disk.
+
+        Args:
+            paths (list): The metadata files to merge, later files win. Defaults to the static
+                and dynamic metadata files.
+        """
+        self.paths = list(paths or DEFAULT_METADATA_PATHS)
+        self.file_signature = None
+        self.metadata = {}
+        self.by_name = {}
+        self.loads = 0
+        self.lock = threading.Lock()
+
+    def get_file_signature(self):
+        """
+        Returns the (mtime, size) of every metadata file, None for missing files.
+        """
+        signature = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def refresh(self):
+        """
+        Reloads the metadata files if any of them changed since the last load.
+
+        Returns:
+            bool: True if the files were reloaded.
+        """
+        signature = self.get_file_signature()
+        if signature == self.file_signature:
+            return False
+        with self.lock:
+            if signature == self.file_signature:
+                return False
+            metadata = {}
+            for path in self.paths:
+                metadata.update(read_json(path) or {})
+            by_name = {}
+            for key, tool in metadata.items():
+                by_name[tool.get("tool_name", key)] = tool
+            self.metadata = metadata
+            self.by_name = by_name
+            self.file_signature = signature
+            self.loads += 1
+            return True
+
+    def get_metadata(self):
+        """
+        Returns the merged metadata dict, keyed like the metadata files. Do not modify it.
+        """
+        self.refresh()
+        return self.metadata
+
+    def get_tool(self, tool_name):
+        """
+        Returns a tool's metadata by its tool_name, or None if there is no such tool.
+        """
+        self.refresh()
+        return self.by_name.get(tool_name)
+
+    def get_tool_names(self):
+        """
+        Returns the tool_name of every tool.
+        """
+        self.refresh()
+        return list(self.by_name)
+
+
+def make_function_metadata(tool_name, tool_required, tool_description, tool_properties):
+    """
+    Returns the "function" part of an assistant function tool.
+
+    Args:
+        tool_name (str): The name of the tool.
+        tool_required (str): The required parameters, comma separated as in the metadata files.
+        tool_description (str): The description the assistant sees.
+        tool_properties (dict): The JSON schema properties of the parameters.
+
+    Returns:
+        dict: The function metadata.
+    """
+    if isinstance(tool_required, str):
+        required = [name.strip() for name in tool_required.split(",") if name.strip() not in ("", "None")]
+    else:
+        required = list(tool_required or [])
+    return {
+        "name": tool_name,
+        "description": tool_description,
+        "parameters": {
+            "type": "object",
+            "properties": tool_properties,
+            "required": required
+        }
+    }
+
+
+def make_function_tool(tool):
+    """
+    Returns a tool catalog entry as an assistant function tool. Every path that turns catalog
+    entries into assistant tools goes through here, so a tool always renders the same and
+    comparing an assistant's tools with a freshly built list only finds real changes.
+
+    Args:
+        tool (dict): A tool catalog entry.
+
+    Returns:
+        dict: {"type": "function", "function": ...}
+    """
+    description = tool.get("tool_meta_description") or tool["tool_description"]
+    return {
+        "type": "function",
+        "function": make_function_metadata(tool["tool_name"], tool["tool_required"], description, tool["tool_properties"])
+    }
+
+
+shared_catalogs = {}
+shared_catalogs_lock = threading.Lock()
+
+
+def get_tool_catalog(paths=None):
+    """
+    Returns the process-wide catalog for a set of metadata files, so every manager shares one cache.
+
+    Args:
+        paths (list): The metadata files to merge, defaults to the static and dynamic metadata files.
+
+    Returns:
+        ToolCatalog: The shared catalog.
+    """
+    key = tuple(paths or DEFAULT_METADATA_PATHS)
+    with shared_catalogs_lock:
+        if key not in shared_catalogs:
+            shared_catalogs[key] = ToolCatalog(key)
+        return shared_catalogs[key]
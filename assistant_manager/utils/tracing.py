@@ -0,0 +1,212 @@
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+#
+# Hierarchical timing spans for user turns.
+# A span opened while another is active becomes its child, across threads and asyncio tasks that
+# copied the context (tool workers and run orchestrator workers do). Finished spans are kept in
+# a bounded buffer and can be exported as OpenTelemetry-style span records or as a Chrome
+# trace-event file for chrome://tracing or https://ui.perfetto.dev.
+#
+
+current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span():
+    def __init__(self, name, trace_id, parent_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+        self.thread_id = threading.get_ident()
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def duration_seconds(self):
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e9
+
+    def __repr__(self):
+        return f"Span(name={self.name!r}, duration={self.duration_seconds():.3f}s, attributes={self.attributes!r})"
+
+
+class Tracer():
+    def __init__(self, max_spans=10000, enabled=True):
+        """
+        Initializes a tracer.
+
+        Args:
+            max_spans (int): How many finished spans to keep, the oldest are dropped first.
+            enabled (bool): Record spans, when False span() does nothing.
+        """
+        self.enabled = enabled
+        self.spans = deque(maxlen=max_spans)
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        """
+        Times the with block as a span, a child of the active span if there is one.
+
+        Args:
+            name (str): What the span covers, e.g. "turn" or "tool".
+            **attributes: Span attributes, e.g. thread_id.
+
+        Yields:
+            Span: The span, or None when tracing is disabled.
+        """
+        if not self.enabled:
+            yield None
+            return
+        parent = current_span.get()
+        trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        span = Span(name, trace_id, parent.span_id if parent is not None else None, attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            current_span.reset(token)
+            with self.lock:
+                self.spans.append(span)
+
+    def get_spans(self, trace_id=None):
+        """
+        Returns the finished spans, of one trace or all of them, oldest first.
+        """
+        with self.lock:
+            spans = list(self.spans)
+        if trace_id is not None:
+            spans = [span for span in spans if span.trace_id == trace_id]
+        return spans
+
+    def get_last_trace(self, name="turn"):
+        """
+        Returns the spans of the trace of the most recent finished span called `name`.
+        """
+        for span in reversed(self.get_spans()):
+            if span.name == name:
+                return self.get_spans(span.trace_id)
+        return []
+
+    def clear(self):
+        with self.lock:
+            self.spans.clear()
+
+    def to_otel(self, spans=None):
+        """
+        Returns spans as OpenTelemetry (OTLP JSON) span records.
+        """
+        spans = self.get_spans() if spans is None else spans
+        return [
+            {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id or "",
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [{"key": key, "value": otel_value(value)} for key, value in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            for span in spans
+        ]
+
+    def to_chrome_trace(self, spans=None):
+        """
+        Returns spans as a Chrome trace-event document.
+        """
+        spans = self.get_spans() if spans is None else spans
+        pid = os.getpid()
+        events = []
+        for span in spans:
+            args = dict(span.attributes, trace_id=span.trace_id, span_id=span.span_id)
+            if span.error:
+                args["error"] = span.error
+            events.append({
+                "name": span.name,
+                "cat": "assistant_manager",
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, file_name, spans=None):
+        """
+        Writes spans to a Chrome trace-event JSON file.
+        """
+        with open(file_name, 'w') as outfile:
+            json.dump(self.to_chrome_trace(spans), outfile, default=str)
+
+
+def otel_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+shared_tracer = Tracer()
+
+
+def get_tracer():
+    """
+    Returns the process-wide tracer every manager records into.
+    """
+    return shared_tracer
+
+
+def traced(name, *argument_names):
+    """
+    Decorates a method so each call is a span in self.tracer. Works on plain and async methods.
+
+    Args:
+        name (str): The span name.
+        *argument_names: Arguments of the method to record as span attributes.
+    """
+    def decorator(function):
+        signature = inspect.signature(function)
+
+        def get_attributes(self, args, kwargs):
+            if not argument_names:
+                return {}
+            bound = signature.bind_partial(self, *args, **kwargs)
+            return {key: bound.arguments[key] for key in argument_names if bound.arguments.get(key) is not None}
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(self, *args, **kwargs):
+                with self.tracer.span(name, **get_attributes(self, args, kwargs)):
+                    return await function(self, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name, **get_attributes(self, args, kwargs)):
+                return function(self, *args, **kwargs)
+        return wrapper
+    return decorator
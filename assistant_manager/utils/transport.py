@@ -0,0 +1,207 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from assistant_manager.utils.rate_limiter import AsyncGovernedTransport, GovernedTransport, get_rate_limit_governor
+
+#
+# One process-wide HTTP layer.
+# Every manager shares the same OpenAI connection pool, and the tools share one requests.Session,
+# so connections (and their TLS handshakes) are reused across managers, runs and tool calls.
+# Call configure_transport() before creating managers to change pool sizes, keep-alive, HTTP/2,
+# timeouts or background warmup.
+#
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRANSPORT_SETTINGS = {
+    # Connection pool of the OpenAI clients
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+    # Needs the h2 package, falls back to HTTP/1.1 without it
+    "http2": False,
+    # Seconds, used when a manager is created without a timeout
+    "connect_timeout": 5.0,
+    "read_timeout": 600.0,
+    "write_timeout": 600.0,
+    "pool_timeout": 10.0,
+    # Connection pool of the tools' requests.Session, per host
+    "tool_pool_connections": 10,
+    "tool_pool_maxsize": 20,
+    # Open connections in the background when the first manager starts
+    "warmup": False,
+    "warmup_connections": 2,
+    "warmup_urls": ["https://export.arxiv.org", "https://api.open-meteo.com"],
+}
+
+transport_settings = dict(DEFAULT_TRANSPORT_SETTINGS)
+transport_lock = threading.Lock()
+shared_clients = {}
+warmed_up = set()
+
+
+def configure_transport(**settings):
+    """
+    Changes the transport settings. Clients handed out before keep their old settings.
+
+    Args:
+        **settings: Any keys of DEFAULT_TRANSPORT_SETTINGS.
+    """
+    unknown = set(settings) - set(DEFAULT_TRANSPORT_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown transport settings: {sorted(unknown)}")
+    with transport_lock:
+        transport_settings.update(settings)
+        shared_clients.clear()
+
+
+def get_limits():
+    return httpx.Limits(
+        max_connections=transport_settings["max_connections"],
+        max_keepalive_connections=transport_settings["max_keepalive_connections"],
+        keepalive_expiry=transport_settings["keepalive_expiry"],
+    )
+
+
+def get_timeout():
+    """
+    Returns the default httpx timeout from the transport settings.
+    """
+    return httpx.Timeout(
+        connect=transport_settings["connect_timeout"],
+        read=transport_settings["read_timeout"],
+        write=transport_settings["write_timeout"],
+        pool=transport_settings["pool_timeout"],
+    )
+
+
+def use_http2():
+    if not transport_settings["http2"]:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("http2 is enabled but the h2 package is not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+def get_http_client():
+    """
+    Returns the shared httpx.Client for the OpenAI clients, paced by the rate limit governor.
+    """
+    with transport_lock:
+        if "sync" not in shared_clients:
+            transport = httpx.HTTPTransport(limits=get_limits(), http2=use_http2())
+            shared_clients["sync"] = httpx.Client(
+                transport=GovernedTransport(get_rate_limit_governor(), transport),
+                timeout=get_timeout(),
+            )
+        return shared_clients["sync"]
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    def __init__(self, make_transport):
+        """
+        Keeps one connection pool per event loop. Async connections belong to the loop that opened
+        them, so a pool shared across loops (e.g. successive asyncio.run calls) breaks on reuse.
+
+        Args:
+            make_transport (callable): Creates the pool of a loop on its first request.
+        """
+        self.make_transport = make_transport
+        self.transports = weakref.WeakKeyDictionary()
+        self.lock = threading.Lock()
+
+    def get_transport(self):
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            transport = self.transports.get(loop)
+            if transport is None:
+                transport = self.transports[loop] = self.make_transport()
+        return transport
+
+    async def handle_async_request(self, request):
+        return await self.get_transport().handle_async_request(request)
+
+    async def aclose(self):
+        with self.lock:
+            transport = self.transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+def get_async_http_client():
+    """
+    Returns the shared httpx.AsyncClient for the async OpenAI clients, paced by the rate limit governor.
+    Connections are pooled per event loop, so managers on any loop can share it.
+    """
+    with transport_lock:
+        if "async" not in shared_clients:
+            limits, http2 = get_limits(), use_http2()
+            transport = LoopLocalTransport(lambda: httpx.AsyncHTTPTransport(limits=limits, http2=http2))
+            shared_clients["async"] = httpx.AsyncClient(
+                transport=AsyncGovernedTransport(get_rate_limit_governor(), transport),
+                timeout=get_timeout(),
+            )
+        return shared_clients["async"]
+
+
+def get_requests_session():
+    """
+    Returns the shared requests.Session for tool HTTP calls, keeping connections alive between calls.
+    """
+    with transport_lock:
+        if "requests" not in shared_clients:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=transport_settings["tool_pool_connections"],
+                pool_maxsize=transport_settings["tool_pool_maxsize"],
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            shared_clients["requests"] = session
+        return shared_clients["requests"]
+
+
+def warm_up(api_url, background=True):
+    """
+    Opens connections to the API and the tool hosts ahead of the first real request, once per
+    process, if the warmup setting is on. Errors are ignored, a failed warmup only costs the handshake later.
+
+    Args:
+        api_url (str): The base URL of the OpenAI client.
+        background (bool): Warm up in background threads instead of blocking.
+    """
+    if not transport_settings["warmup"]:
+        return
+    with transport_lock:
+        if api_url in warmed_up:
+            return
+        warmed_up.add(api_url)
+    connections = transport_settings["warmup_connections"]
+    jobs = [(get_http_client().head, api_url)] * connections
+    jobs += [(get_requests_session().head, url) for url in transport_settings["warmup_urls"] for _ in range(connections)]
+
+    def open_connection(job):
+        send, url = job
+        try:
+            send(url, timeout=transport_settings["connect_timeout"])
+        except Exception as e:
+            logger.debug(f"Warmup of {url} failed: {e}")
+
+    def run():
+        # One request per wanted connection, at the same time so each opens its own connection
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="transport_warmup") as executor:
+            list(executor.map(open_connection, jobs))
+
+    if not jobs:
+        return
+    if background:
+        threading.Thread(target=run, name="transport_warmup", daemon=True).start()
+    else:
+        run()
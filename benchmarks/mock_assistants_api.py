@@ -0,0 +1,439 @@
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+#
+# A localhost stand-in for the beta assistants, threads, messages and runs endpoints.
+# Point a manager at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+# Objects carry every field of the SDK's models, so they parse as strictly as real responses.
+# Runs follow a scripted status sequence, one step per retrieve, and stop at requires_action
+# until tool outputs are submitted. Runs created or continued with stream=true play their script
+# straight through as server-sent events instead. Every request can be delayed by a latency model and failed at
+# a configurable rate, and every request is counted per route.
+#
+
+
+class LatencyModel():
+    def __init__(self, median_ms=0.0, p99_ms=None, seed=None):
+        """
+        A lognormal request latency.
+
+        Args:
+            median_ms (float): The median latency, 0 adds no delay.
+            p99_ms (float): The 99th percentile latency, defaults to the median (a fixed delay).
+            seed (int): Seed for repeatable runs.
+        """
+        self.median_ms = median_ms
+        self.p99_ms = p99_ms if p99_ms is not None else median_ms
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample(self):
+        """
+        Returns a latency in seconds.
+        """
+        if self.median_ms <= 0:
+            return 0.0
+        mu = math.log(self.median_ms)
+        # 2.326 standard deviations is the 99th percentile
+        sigma = max(0.0, (math.log(max(self.p99_ms, self.median_ms)) - mu) / 2.326)
+        with self.lock:
+            return self.random.lognormvariate(mu, sigma) / 1000
+
+
+class EventStream(list):
+    """
+    (event, data) pairs a route answers with as server-sent events instead of JSON.
+    """
+
+
+class RunScript():
+    def __init__(self, statuses=None, tool_calls=None, reply="Done.", final_error=None):
+        """
+        What a run does, one status per retrieve.
+
+        Args:
+            statuses (list): The statuses the run goes through. Defaults to
+                queued, in_progress, completed. A requires_action step waits for submit_tool_outputs.
+            tool_calls (list): {"name": ..., "arguments": {...}} dicts asked for at requires_action.
+            reply (str): The assistant message added when the run completes.
+            final_error (dict): The last_error of a run ending failed or expired.
+        """
+        self.statuses = statuses or ["queued", "in_progress", "completed"]
+        self.tool_calls = tool_calls or []
+        self.reply = reply
+        self.final_error = final_error or {"code": "server_error", "message": "Scripted failure"}
+
+
+class MockAssistantsAPI():
+    def __init__(self, run_script=None, latency=None, error_rate=0.0, error_status=500, seed=None):
+        """
+        Holds the mock account's objects and the failure and latency settings.
+
+        Args:
+            run_script (RunScript): What new runs do, can be changed between runs.
+            latency (LatencyModel): Delay added to every request.
+            error_rate (float): Fraction of requests that fail with error_status.
+            error_status (int): The status of injected failures, 429 failures carry retry-after.
+            seed (int): Seed for repeatable failure injection.
+        """
+        self.run_script = run_script or RunScript()
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.assistants = {}
+        self.threads = {}
+        self.messages = {}
+        self.runs = {}
+        self.run_steps = {}
+        self.calls = Counter()
+
+    def new_id(self, prefix):
+        return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+    def reset_calls(self):
+        with self.lock:
+            self.calls.clear()
+
+    def get_calls(self):
+        """
+        Returns the request count per route, e.g. {"GET /threads/{id}/runs/{id}": 12}.
+        """
+        with self.lock:
+            return dict(self.calls)
+
+    # Objects
+
+    def make_assistant(self, body):
+        return {
+            "id": self.new_id("asst"),
+            "object": "assistant",
+            "created_at": int(time.time()),
+            "name": body.get("name"),
+            "description": body.get("description"),
+            "model": body.get("model", "gpt-4-1106-preview"),
+            "instructions": body.get("instructions"),
+            "tools": body.get("tools") or [],
+            "file_ids": body.get("file_ids") or [],
+            "metadata": body.get("metadata") or {},
+        }
+
+    def make_message(self, thread_id, role, text, run_id=None, assistant_id=None):
+        now = int(time.time())
+        return {
+            "id": self.new_id("msg"),
+            "object": "thread.message",
+            "created_at": now,
+            "thread_id": thread_id,
+            "status": "completed",
+            "completed_at": now,
+            "incomplete_at": None,
+            "incomplete_details": None,
+            "role": role,
+            "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+            "file_ids": [],
+            "assistant_id": assistant_id,
+            "run_id": run_id,
+            "metadata": {},
+        }
+
+    def make_run(self, thread_id, body):
+        return {
+            "id": self.new_id("run"),
+            "object": "thread.run",
+            "created_at": int(time.time()),
+            "thread_id": thread_id,
+            "assistant_id": body.get("assistant_id"),
+            "status": "queued",
+            "required_action": None,
+            "last_error": None,
+            "expires_at": int(time.time()) + 600,
+            "started_at": None,
+            "cancelled_at": None,
+            "failed_at": None,
+            "completed_at": None,
+            "model": body.get("model") or "gpt-4-1106-preview",
+            "instructions": body.get("instructions") or "",
+            "tools": body.get("tools") or [],
+            "file_ids": [],
+            "metadata": body.get("metadata") or {},
+            "usage": None,
+            "temperature": None,
+        }
+
+    def page(self, items, query):
+        """
+        Applies order, after and limit to a list the way the API does.
+        """
+        order = query.get("order", "desc")
+        limit = int(query.get("limit", 20))
+        items = sorted(items, key=lambda item: item["created_at"], reverse=order == "desc")
+        after = query.get("after")
+        if after:
+            ids = [item["id"] for item in items]
+            items = items[ids.index(after) + 1:] if after in ids else []
+        data = items[:limit]
+        return {
+            "object": "list",
+            "data": data,
+            "first_id": data[0]["id"] if data else None,
+            "last_id": data[-1]["id"] if data else None,
+            "has_more": len(items) > limit,
+        }
+
+    def advance_run(self, run):
+        """
+        Moves a run one step along its script. Call with the lock held.
+        """
+        steps = self.run_steps[run["id"]]
+        if run["status"] in ("requires_action", "completed", "failed", "cancelled", "expired"):
+            return
+        script, position = steps["script"], steps["position"] + 1
+        steps["position"] = position
+        status = script.statuses[min(position, len(script.statuses) - 1)]
+        run["status"] = status
+        now = int(time.time())
+        if status == "in_progress" and run["started_at"] is None:
+            run["started_at"] = now
+        elif status == "requires_action":
+            run["required_action"] = {
+                "type": "submit_tool_outputs",
+                "submit_tool_outputs": {"tool_calls": [
+                    {"id": self.new_id("call"), "type": "function", "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))}}
+                    for call in script.tool_calls
+                ]},
+            }
+        elif status == "completed":
+            run["completed_at"] = now
+            run["usage"] = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            message = self.make_message(run["thread_id"], "assistant", script.reply, run_id=run["id"], assistant_id=run["assistant_id"])
+            self.messages[run["thread_id"]].append(message)
+        elif status in ("failed", "expired"):
+            run["failed_at"] = now
+            run["last_error"] = script.final_error
+
+    def stream_run(self, run, created=False):
+        """
+        Plays a run's script until it stops or needs tool outputs. Call with the lock held.
+
+        Returns:
+            EventStream: The run and message events the steps produce, ending with done.
+        """
+        def snapshot(item):
+            return json.loads(json.dumps(item))
+
+        events = EventStream()
+        if created:
+            events.append(("thread.run.created", snapshot(run)))
+        for _ in self.run_steps[run["id"]]["script"].statuses:
+            if run["status"] in ("requires_action", "completed", "failed", "cancelled", "expired"):
+                break
+            self.advance_run(run)
+            if run["status"] == "completed":
+                message = snapshot(self.messages[run["thread_id"]][-1])
+                events.append(("thread.message.created", dict(message, status="in_progress", completed_at=None, content=[])))
+                events.append(("thread.message.delta", {"id": message["id"], "object": "thread.message.delta", "delta": {
+                    "content": [{"index": 0, "type": "text", "text": {"value": message["content"][0]["text"]["value"], "annotations": []}}],
+                }}))
+                events.append(("thread.message.completed", message))
+            events.append((f"thread.run.{run['status']}", snapshot(run)))
+        events.append(("done", "[DONE]"))
+        return events
+
+    # Routes, each returns (status, body)
+
+    def handle(self, method, path, query, body):
+        parts = [part for part in path.split("/") if part]
+        if parts and parts[0] == "v1":
+            parts = parts[1:]
+        route = method + " /" + "/".join(part if index % 2 == 0 else "{id}" for index, part in enumerate(parts))
+        with self.lock:
+            self.calls[route] += 1
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self.error_status, {"error": {"message": "Injected failure", "type": "server_error", "code": None}}
+            return self.route(method, parts, query, body)
+
+    def route(self, method, parts, query, body):
+        not_found = (404, {"error": {"message": "Not found", "type": "invalid_request_error", "code": None}})
+        if parts[:1] == ["assistants"]:
+            if len(parts) == 1:
+                if method == "POST":
+                    assistant = self.make_assistant(body)
+                    self.assistants[assistant["id"]] = assistant
+                    return 200, assistant
+                return 200, self.page(list(self.assistants.values()), query)
+            assistant = self.assistants.get(parts[1])
+            if assistant is None:
+                return not_found
+            if method == "POST":
+                assistant.update({key: value for key, value in body.items() if key in assistant})
+            return 200, assistant
+        if parts[:1] != ["threads"]:
+            return not_found
+        if len(parts) == 1 and method == "POST":
+            thread = {"id": self.new_id("thread"), "object": "thread", "created_at": int(time.time()), "metadata": body.get("metadata") or {}}
+            self.threads[thread["id"]] = thread
+            self.messages[thread["id"]] = []
+            for message in body.get("messages") or []:
+                self.messages[thread["id"]].append(self.make_message(thread["id"], message.get("role", "user"), message.get("content", "")))
+            return 200, thread
+        thread_id = parts[1] if len(parts) > 1 else None
+        if thread_id not in self.threads:
+            return not_found
+        if len(parts) == 2:
+            return 200, self.threads[thread_id]
+        if parts[2] == "messages":
+            messages = self.messages[thread_id]
+            if len(parts) == 3:
+                if method == "POST":
+                    message = self.make_message(thread_id, body.get("role", "user"), body.get("content", ""))
+                    messages.append(message)
+                    return 200, message
+                # Messages created in the same second keep their insertion order
+                return 200, self.page_in_order(messages, query)
+            for message in messages:
+                if message["id"] == parts[3]:
+                    if method == "POST":
+                        message["metadata"] = body.get("metadata") or message["metadata"]
+                    return 200, message
+            return not_found
+        if parts[2] == "runs":
+            if len(parts) == 3:
+                if method == "POST":
+                    if any(run["thread_id"] == thread_id and run["status"] in ("queued", "in_progress", "requires_action") for run in self.runs.values()):
+                        return 400, {"error": {"message": f"Thread {thread_id} already has an active run.", "type": "invalid_request_error", "code": None}}
+                    run = self.make_run(thread_id, body)
+                    self.runs[run["id"]] = run
+                    self.run_steps[run["id"]] = {"script": self.run_script, "position": 0}
+                    if body.get("stream"):
+                        return 200, self.stream_run(run, created=True)
+                    return 200, run
+                return 200, self.page([run for run in self.runs.values() if run["thread_id"] == thread_id], query)
+            run = self.runs.get(parts[3])
+            if run is None:
+                return not_found
+            if len(parts) == 4:
+                if method == "GET":
+                    self.advance_run(run)
+                return 200, run
+            if parts[4] == "submit_tool_outputs":
+                if run["status"] != "requires_action":
+                    return 400, {"error": {"message": "Run is not waiting for tool outputs.", "type": "invalid_request_error", "code": None}}
+                run["status"] = "in_progress"
+                run["required_action"] = None
+                if body.get("stream"):
+                    return 200, self.stream_run(run)
+                return 200, run
+            if parts[4] == "cancel":
+                run["status"] = "cancelled"
+                run["cancelled_at"] = int(time.time())
+                return 200, run
+        return not_found
+
+    def page_in_order(self, messages, query):
+        items = list(messages) if query.get("order", "desc") == "asc" else list(reversed(messages))
+        after = query.get("after")
+        if after:
+            ids = [item["id"] for item in items]
+            items = items[ids.index(after) + 1:] if after in ids else []
+        limit = int(query.get("limit", 20))
+        data = items[:limit]
+        return {
+            "object": "list",
+            "data": data,
+            "first_id": data[0]["id"] if data else None,
+            "last_id": data[-1]["id"] if data else None,
+            "has_more": len(items) > limit,
+        }
+
+
+def make_handler(api):
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def respond(self, method):
+            url = urlparse(self.path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            length = int(self.headers.get("content-length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+            delay = api.latency.sample()
+            if delay:
+                time.sleep(delay)
+            status, payload = api.handle(method, url.path, query, body)
+            if isinstance(payload, EventStream):
+                content_type = "text/event-stream"
+                data = "".join(
+                    f"event: {event}\ndata: {item if isinstance(item, str) else json.dumps(item)}\n\n" for event, item in payload
+                ).encode()
+            else:
+                content_type = "application/json"
+                data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("content-type", content_type)
+            self.send_header("content-length", str(len(data)))
+            if status == 429:
+                self.send_header("retry-after-ms", "50")
+            self.end_headers()
+            if method != "HEAD":
+                self.wfile.write(data)
+
+        def do_GET(self):
+            self.respond("GET")
+
+        def do_POST(self):
+            self.respond("POST")
+
+        def do_DELETE(self):
+            self.respond("DELETE")
+
+        def do_HEAD(self):
+            self.respond("HEAD")
+
+    return MockHandler
+
+
+def serve(api=None, host="127.0.0.1", port=0):
+    """
+    Starts the mock server in a background thread.
+
+    Args:
+        api (MockAssistantsAPI): The mock account, defaults to a fresh one.
+        host (str): The interface to listen on.
+        port (int): The port, 0 picks a free one.
+
+    Returns:
+        tuple: (server, api, base_url). Call server.shutdown() to stop it.
+    """
+    api = api or MockAssistantsAPI()
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock_assistants_api", daemon=True).start()
+    return server, api, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve a mock Assistants API on localhost.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--p99-ms", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server, api, base_url = serve(MockAssistantsAPI(latency=LatencyModel(args.latency_ms, args.p99_ms), error_rate=args.error_rate), port=args.port)
+    print(f"Mock Assistants API on {base_url}, set OPENAI_BASE_URL to use it")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_assistants_api import LatencyModel, MockAssistantsAPI, RunScript, serve
+from assistant_manager.utils.poll_scheduler import percentile
+
+#
+# Benchmarks the run lifecycle against the mock Assistants API.
+# Run from the repository root:
+#     python benchmarks/run_lifecycle.py --turns 50 --latency-ms 20 --p99-ms 120
+# Reports end-to-end turn latency, API calls per turn and tool dispatch overhead, as text or --json.
+# --trace turns.json writes every turn's spans for chrome://tracing or https://ui.perfetto.dev.
+#
+
+SCENARIOS = {
+    "simple": RunScript(["queued", "in_progress", "in_progress", "completed"]),
+    "tool": RunScript(
+        ["queued", "in_progress", "requires_action", "in_progress", "completed"],
+        tool_calls=[{"name": "bench_echo", "arguments": {"text": "ping"}}],
+    ),
+    "tools": RunScript(
+        ["queued", "in_progress", "requires_action", "in_progress", "completed"],
+        tool_calls=[{"name": "bench_echo", "arguments": {"text": f"ping {i}"}} for i in range(4)],
+    ),
+}
+
+
+def make_manager(base_url):
+    """
+    Returns an OAI_Assistant talking to the mock server, with in-memory local stores.
+    """
+    os.environ["OPENAI_BASE_URL"] = base_url
+    from assistant_manager.assistant_manager import OAI_Assistant
+    from assistant_manager.utils.message_store import MessageStore
+    from assistant_manager.utils.thread_registry import ThreadRegistry
+
+    class BenchAssistant(OAI_Assistant):
+        def bench_echo(self, text):
+            return text
+
+        def message_user(self, message):
+            pass
+
+    manager = BenchAssistant(api_key="sk-mock", organization=None)
+    manager.message_store = MessageStore(":memory:")
+    manager.thread_registry = ThreadRegistry(":memory:", legacy_path=None)
+    return manager
+
+
+def summarize(seconds):
+    seconds = sorted(seconds)
+    return {
+        "count": len(seconds),
+        "mean_ms": sum(seconds) / len(seconds) * 1000,
+        "p50_ms": percentile(seconds, 50) * 1000,
+        "p99_ms": percentile(seconds, 99) * 1000,
+        "max_ms": seconds[-1] * 1000,
+    }
+
+
+def bench_turns(manager, api, assistant_id, turns):
+    """
+    Sends `turns` user messages on one thread and runs the assistant after each.
+    """
+    thread_id = manager.change_thread(thread_name="bench")
+    api.reset_calls()
+    latencies = []
+    for turn in range(turns):
+        started = time.perf_counter()
+        manager.create_message(thread_id=thread_id, role="user", content=f"turn {turn}")
+        manager.perform_run(thread_id, assistant_id)
+        latencies.append(time.perf_counter() - started)
+    calls = api.get_calls()
+    return {
+        "latency": summarize(latencies),
+        "api_calls_per_turn": sum(calls.values()) / turns,
+        "api_calls_by_route": {route: count / turns for route, count in sorted(calls.items())},
+    }
+
+
+def bench_tool_dispatch(manager, iterations):
+    """
+    Times run_tool_calls on a no-op tool, so the result is the dispatch overhead alone.
+    """
+    from types import SimpleNamespace
+    tool_calls = [SimpleNamespace(id=f"call_{i}", function=SimpleNamespace(name="bench_echo", arguments='{"text": "ping"}')) for i in range(4)]
+    results = {}
+    for batch in (1, 4):
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            manager.run_tool_calls(tool_calls[:batch])
+            timings.append(time.perf_counter() - started)
+        results[f"batch_{batch}"] = summarize(timings)
+    return results
+
+
+def bench_thread_switch(manager, threads, switches):
+    """
+    Registers `threads` threads and times switching between them by name.
+    """
+    names = [f"switch_{i}" for i in range(threads)]
+    for name in names:
+        manager.change_thread(thread_name=name)
+    timings = []
+    for i in range(switches):
+        started = time.perf_counter()
+        manager.change_thread(thread_name=names[i % threads])
+        timings.append(time.perf_counter() - started)
+    return summarize(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the run lifecycle against a mock Assistants API.")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="tool")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Median latency added to every API request.")
+    parser.add_argument("--p99-ms", type=float, default=None, help="99th percentile latency, defaults to the median.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of API requests failing with --error-status.")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--tool-iterations", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--switches", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    parser.add_argument("--trace", default=None, help="Write the spans of every turn to this Chrome trace-event file.")
+    args = parser.parse_args()
+
+    api = MockAssistantsAPI(
+        run_script=SCENARIOS[args.scenario],
+        latency=LatencyModel(args.latency_ms, args.p99_ms, seed=args.seed),
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    server, api, base_url = serve(api)
+    try:
+        manager = make_manager(base_url)
+        assistant_id = manager.create_assistant(model="gpt-4-1106-preview", instructions="Benchmark", name="bench").id
+        results = {
+            "scenario": args.scenario,
+            "turns": bench_turns(manager, api, assistant_id, args.turns),
+            "tool_dispatch": bench_tool_dispatch(manager, args.tool_iterations),
+            "thread_switch": bench_thread_switch(manager, args.threads, args.switches),
+            "poll_stats": manager.poll_stats.summary(),
+            "api_stats": manager.metrics.get_api_stats(),
+            "tool_stats": manager.metrics.get_tool_stats(),
+        }
+        if args.trace:
+            manager.tracer.export_chrome_trace(args.trace)
+    finally:
+        server.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    turns = results["turns"]
+    print(f"Scenario: {args.scenario}, {args.turns} turns")
+    print(f"Turn latency: p50 {turns['latency']['p50_ms']:.1f} ms, p99 {turns['latency']['p99_ms']:.1f} ms, mean {turns['latency']['mean_ms']:.1f} ms")
+    print(f"API calls per turn: {turns['api_calls_per_turn']:.2f}")
+    for route, count in turns["api_calls_by_route"].items():
+        print(f"    {route}: {count:.2f}")
+    for batch, timing in results["tool_dispatch"].items():
+        print(f"Tool dispatch {batch}: p50 {timing['p50_ms'] * 1000:.1f} us, p99 {timing['p99_ms'] * 1000:.1f} us")
+    switch = results["thread_switch"]
+    print(f"Thread switch: p50 {switch['p50_ms']:.2f} ms, p99 {switch['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -68,27 +68,9 @@ def get_ossinsight(question):
 from autogen.agentchat.contrib.gpt_assistant_agent import GPTAssistantAgent
 from autogen import UserProxyAgent
 from assistant_manager import OAI_Assistant
-from openai.types.beta.assistant import Assistant
-import dynamic_functions
-from utils import file_operations, special_functions
-
-
-async def create_agent(Assistant_config,assistantManager: OAI_Assistant):
-    name = Assistant_config["name"]
-    instructions = Assistant_config["instructions"]
-    tools = Assistant_config["tools"]
-    model = Assistant_config["model"]
-
-    assistant_obj: Assistant = assistantManager.client.assistants.create(
-        name=name,
-        instructions=instructions,
-        tools=tools,
-        model=model
-    )
+from assistant_manager.fleet import FleetReconciler
 
-    assistant_id = assistant_obj.id
 
-    return assistant_id
 async def main_app():
         # Create an assistant manager{
     api_key = "APIKEYHERE"
@@ -114,19 +96,9 @@ async def main_app():
             }
     ]
 
-    # Search for existing assistant
-    assistant = assistantManager.client.assistants.list()
-    # Returns a sync cursor page. We need to search it for the assistant we want
-    assistant_id = None
-    for a in assistant.data:
-        if a.name == oss_analyst_default["name"]:
-            assistant_id = a.id
-            break
-    if assistant_id is None:
-        assistant_id = await create_agent(oss_analyst_default,assistantManager)
-        print(f"Created new assistant with id: {assistant_id}")
-    else:
-        print(f"Found existing assistant with id: {assistant_id}")
+    # Create the assistant, or update it only if its instructions, tools or model changed
+    assistant_id = FleetReconciler(assistantManager).reconcile_one(oss_analyst_default)
+    print(f"Using assistant with id: {assistant_id}")
 
     
 
@@ -138,24 +110,12 @@ async def main_app():
     function_mapy = {}
 
     if retooling == True:
-        for tool in tool_list:
-            if tool["type"] == "function":
-                #Check tht it is in dynamic_functions if not check special_functions or file_operations
-                if tool["function"]["name"] in dynamic_functions.__dict__:
-                    print(f"Found {tool['function']['name']} in dynamic_functions")
-                    # Now it has been found add it to the function_mapy using a callable function trick
-                    function: callable = dynamic_functions.__dict__[tool["function"]["name"]]
-                    function_mapy[tool["function"]["name"]] = function
-                elif tool["function"]["name"] in special_functions.__dict__:
-                    print(f"Found {tool['function']['name']} in special_functions")
-                    # Now it has been found add it to the function_mapy
-                    function: callable = special_functions.__dict__[tool["function"]["name"]]
-                    function_mapy[tool["function"]["name"]] = function
-                elif tool["function"]["name"] in file_operations.__dict__:
-                    print(f"Found {tool['function']['name']} in file_operations")
-                    # Now it has been found add it to the function_mapy
-                    function: callable = file_operations.__dict__[tool["function"]["name"]] 
-                    function_mapy[tool["function"]["name"]] = function            
+        # The tool registry already maps every tool name to its function
+        tool_names = [tool["function"]["name"] for tool in tool_list if tool["type"] == "function"]
+        function_mapy = assistantManager.get_tool_registry().function_map(tool_names)
+        for tool_name in tool_names:
+            if tool_name in function_mapy:
+                print(f"Found {tool_name} in {assistantManager.get_tool_registry().resolve(tool_name).source}")
     else:
         function_mapy = {
             "oos_insight": get_ossinsight,
@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_assistants_api import MockAssistantsAPI, RunScript, serve
+
+#
+# Shared fixtures. Tests that talk to the API run against the mock Assistants API of
+# benchmarks/mock_assistants_api.py on localhost, with in-memory message stores and thread registries.
+#
+
+
+@pytest.fixture(scope="session")
+def mock_server():
+    server, api, base_url = serve(MockAssistantsAPI())
+    os.environ["OPENAI_BASE_URL"] = base_url
+    yield api, base_url
+    server.shutdown()
+
+
+@pytest.fixture
+def mock_api(mock_server):
+    """
+    The mock account, with the default run script restored and the call counts reset for each test.
+    """
+    api, base_url = mock_server
+    api.run_script = RunScript()
+    api.reset_calls()
+    return api
+
+
+def make_test_manager(cls):
+    from assistant_manager.utils.message_store import MessageStore
+    from assistant_manager.utils.poll_scheduler import FixedPollScheduler
+    from assistant_manager.utils.thread_registry import ThreadRegistry
+
+    class TestManager(cls):
+        def message_user(self, message):
+            self.messages_to_user.append(message)
+
+        def message_user_delta(self, delta):
+            self.deltas_to_user.append(delta)
+
+        def echo(self, text):
+            return text
+
+        def wait(self, seconds, text):
+            time.sleep(seconds)
+            return text
+
+    manager = TestManager(api_key="sk-mock", organization=None)
+    manager.messages_to_user = []
+    manager.deltas_to_user = []
+    manager.message_store = MessageStore(":memory:")
+    manager.thread_registry = ThreadRegistry(":memory:", legacy_path=None)
+    # The mock advances a run on every retrieve, so there is nothing to wait for
+    manager.poll_scheduler = FixedPollScheduler(0.0)
+    return manager
+
+
+@pytest.fixture
+def manager(mock_api):
+    """
+    An OAI_Assistant on the mock API with an assistant selected. Tools: echo(text) and wait(seconds, text).
+    """
+    from assistant_manager.assistant_manager import OAI_Assistant
+    manager = make_test_manager(OAI_Assistant)
+    manager.assistant_id = manager.create_assistant(model="gpt-4-1106-preview", instructions="Test", name="test").id
+    return manager
+
+
+@pytest.fixture
+def async_manager(mock_api):
+    """
+    An AsyncAssistantChat on the mock API, no assistant selected yet.
+    """
+    from assistant_manager.async_assistant_chat import AsyncAssistantChat
+    return make_test_manager(AsyncAssistantChat)
@@ -0,0 +1,52 @@
+import time
+from types import SimpleNamespace
+
+from assistant_manager.utils.assistant_catalog import AssistantCatalog
+
+
+def make_assistant(assistant_id, name):
+    return SimpleNamespace(id=assistant_id, name=name)
+
+
+def test_nothing_is_fetched_before_the_first_lookup():
+    fetches = []
+    catalog = AssistantCatalog(lambda: fetches.append(1) or [], ttl=None)
+    assert fetches == []
+    catalog.get_by_name("anything")
+    catalog.get_by_name("anything")
+    assert fetches == [1]
+
+
+def test_a_repeated_name_resolves_to_the_newest_assistant():
+    catalog = AssistantCatalog(lambda: [make_assistant("asst_new", "bot"), make_assistant("asst_old", "bot")], ttl=None)
+    assert catalog.get_by_name("bot").id == "asst_new"
+    assert catalog.get_by_id("asst_old").name == "bot"
+
+
+def test_stale_catalog_refetches_after_the_ttl():
+    lists = [[make_assistant("asst_1", "one")], [make_assistant("asst_2", "two")]]
+    catalog = AssistantCatalog(lambda: lists.pop(0), ttl=0.05, background_refresh=False)
+    assert catalog.get_by_name("one") is not None
+    time.sleep(0.06)
+    assert catalog.get_by_name("two") is not None
+    assert catalog.loads == 2
+
+
+def test_upsert_keeps_the_load_time():
+    catalog = AssistantCatalog(lambda: [make_assistant("asst_1", "one")], ttl=None)
+    catalog.get_assistants()
+    loaded_at = catalog.loaded_at
+    catalog.upsert(make_assistant("asst_1", "renamed"))
+    catalog.upsert(make_assistant("asst_2", "two"))
+
+    assert [assistant.name for assistant in catalog.get_assistants()] == ["two", "renamed"]
+    assert catalog.loaded_at == loaded_at
+
+
+def test_manager_lookups_are_served_from_the_catalog(manager, mock_api):
+    manager.get_assistant_id_by_name("test")
+    mock_api.reset_calls()
+    created = manager.create_assistant(model="gpt-4-1106-preview", instructions="Test", name="catalogued")
+
+    assert manager.get_assistant_id_by_name("catalogued") == created.id
+    assert "GET /assistants" not in mock_api.get_calls()
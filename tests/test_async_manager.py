@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+from benchmarks.mock_assistants_api import RunScript
+
+
+def test_chat_runs_tool_calls_and_returns_the_reply(async_manager, mock_api):
+    mock_api.run_script = RunScript(
+        ["queued", "in_progress", "requires_action", "in_progress", "completed"],
+        tool_calls=[{"name": "echo", "arguments": {"text": "ping"}}],
+        reply="pong",
+    )
+
+    async def scenario():
+        assistant = await async_manager.create_assistant(model="gpt-4-1106-preview", instructions="Test", name="async")
+        async_manager.assistant_id = assistant.id
+        thread_id = await async_manager.setup_thread(input_thread_name="async chat")
+        return await async_manager.chat(thread_id, "hello")
+
+    assert asyncio.run(scenario()) == "pong"
+    assert mock_api.get_calls()["POST /threads/{id}/runs/{id}/submit_tool_outputs"] == 1
+
+
+def test_thread_registry_calls_run_off_the_event_loop(async_manager):
+    registry = async_manager.thread_registry
+    threads_used = []
+    get_id = registry.get_id
+
+    def recording_get_id(name):
+        threads_used.append(threading.get_ident())
+        return get_id(name)
+
+    registry.get_id = recording_get_id
+
+    async def scenario():
+        await async_manager.add_thread("named", "thread_1")
+        return threading.get_ident(), await async_manager.get_thread_id("named"), await async_manager.search_threads("na")
+
+    loop_thread, thread_id, matches = asyncio.run(scenario())
+    assert thread_id == "thread_1"
+    assert matches == [("named", "thread_1")]
+    assert threads_used and loop_thread not in threads_used
+
+
+def test_check_update_assistant_runs_queued_updates_once(async_manager):
+    async def scenario():
+        async_manager.swap_assistant("asst_new")
+        return await async_manager.check_update_assistant(), await async_manager.check_update_assistant()
+
+    first, second = asyncio.run(scenario())
+    assert first == {"change_assistant": "asst_new"}
+    assert second is None
+    assert async_manager.assistant_id == "asst_new"
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from assistant_manager.bulk_import import BulkImporter, ImportRecordError, index_records
+
+
+def write_records(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return str(path)
+
+
+def thread_texts(mock_api, thread_id):
+    return [message["content"][0]["text"]["value"] for message in mock_api.messages[thread_id]]
+
+
+def test_records_are_indexed_per_thread_in_file_order(tmp_path):
+    path = tmp_path / "records.jsonl"
+    path.write_text(
+        '{"thread_name": "a", "content": "1"}\n\n'
+        '{"thread_name": "b", "content": "2"}\n'
+        '{"thread_name": "a", "content": "3"}\n'
+    )
+    lanes = index_records(str(path))
+
+    assert [line_number for line_number, offset in lanes["a"]] == [1, 4]
+    assert [line_number for line_number, offset in lanes["b"]] == [3]
+
+
+def test_a_record_without_a_thread_name_names_its_line(tmp_path):
+    path = tmp_path / "records.jsonl"
+    path.write_text('{"thread_name": "a", "content": "1"}\n{"content": "2"}\n')
+    with pytest.raises(ImportRecordError, match="Line 2"):
+        index_records(str(path))
+
+
+def test_a_new_thread_is_created_with_its_first_batch(manager, mock_api, tmp_path):
+    path = write_records(tmp_path / "records.jsonl", [{"thread_name": "a", "content": str(i)} for i in range(5)])
+    result = BulkImporter(manager, batch_size=3, checkpoint_path=":memory:").run(path)
+
+    thread_id = manager.thread_registry.get_id("a")
+    assert thread_texts(mock_api, thread_id) == ["0", "1", "2", "3", "4"]
+    assert result["messages_batched"] == 3
+    assert result["messages_created"] == 2
+    assert mock_api.get_calls()["POST /threads"] == 1
+    assert mock_api.get_calls()["POST /threads/{id}/messages"] == 2
+
+
+def test_a_rerun_resumes_after_the_last_checkpointed_message(manager, mock_api, tmp_path, monkeypatch):
+    records = [{"thread_name": "a", "content": str(i)} for i in range(6)]
+    records += [{"thread_name": "b", "content": "b0"}]
+    path = write_records(tmp_path / "records.jsonl", records)
+    checkpoint_path = str(tmp_path / "checkpoint.sqlite3")
+    create_message = manager.create_message
+    created = []
+
+    def failing_create_message(**kwargs):
+        if len(created) == 2:
+            raise RuntimeError("connection reset")
+        created.append(kwargs["content"])
+        return create_message(**kwargs)
+
+    monkeypatch.setattr(manager, "create_message", failing_create_message)
+    first = BulkImporter(manager, batch_size=2, checkpoint_path=checkpoint_path).run(path)
+    assert first["failed"] == {"a": "connection reset"}
+    assert thread_texts(mock_api, manager.thread_registry.get_id("a")) == ["0", "1", "2", "3"]
+
+    monkeypatch.setattr(manager, "create_message", create_message)
+    mock_api.reset_calls()
+    second = BulkImporter(manager, batch_size=2, checkpoint_path=checkpoint_path).run(path)
+
+    assert second["failed"] == {}
+    assert second["threads_skipped"] == 1
+    assert second["threads_created"] == 0
+    assert second["messages_created"] == 2
+    assert thread_texts(mock_api, manager.thread_registry.get_id("a")) == ["0", "1", "2", "3", "4", "5"]
+    assert "POST /threads" not in mock_api.get_calls()
+
+
+def test_a_finished_import_makes_no_calls_when_rerun(manager, mock_api, tmp_path):
+    path = write_records(tmp_path / "records.jsonl", [{"thread_name": "a", "content": "hello", "metadata": {"source": "export"}}])
+    checkpoint_path = str(tmp_path / "checkpoint.sqlite3")
+    BulkImporter(manager, checkpoint_path=checkpoint_path).run(path)
+    mock_api.reset_calls()
+    result = BulkImporter(manager, checkpoint_path=checkpoint_path).run(path)
+
+    assert result["threads_skipped"] == 1
+    assert mock_api.get_calls() == {}
@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_sessions_keep_their_own_thread(manager, mock_api):
+    first, second = manager.new_session(), manager.new_session()
+    first_thread = first.setup_thread(input_thread_name="first session")
+    second_thread = second.setup_thread(input_thread_name="second session")
+
+    assert first.current_thread == first_thread
+    assert second.current_thread == second_thread
+    assert first_thread != second_thread
+    # The default session was not touched
+    assert manager.current_thread is None
+
+
+def test_sessions_inherit_the_default_assistant(manager):
+    assert manager.new_session().assistant_id == manager.assistant_id
+    assert manager.new_session(assistant_id="asst_other").assistant_id == "asst_other"
+
+
+def test_concurrent_sessions_run_side_by_side(manager, mock_api):
+    sessions = [manager.new_session() for _ in range(4)]
+
+    def converse(index):
+        session = sessions[index]
+        thread_id = session.setup_thread(input_thread_name=f"concurrent {index}")
+        manager.create_message(thread_id=thread_id, role="user", content=str(index))
+        session.perform_run()
+        return thread_id
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        thread_ids = list(executor.map(converse, range(4)))
+
+    assert manager.messages_to_user == ["assistant: Done."] * 4
+    assert [session.current_thread for session in sessions] == thread_ids
+
+
+def test_use_session_switches_the_manager_attributes(manager):
+    session = manager.new_session(thread_id="thread_session")
+    with manager.use_session(session):
+        assert manager.current_thread == "thread_session"
+        manager.current_thread = "thread_changed"
+    assert session.current_thread == "thread_changed"
+    assert manager.current_thread is None
@@ -0,0 +1,59 @@
+import inspect
+import os
+
+import pytest
+
+from assistant_manager.utils.dynamic_tools import DynamicToolLoader, get_parameters
+
+
+def test_parameters_are_read_without_running_the_code():
+    code = "raise SystemExit\ndef tool(city, days=3, *, units='metric', **extra):\n    pass\n"
+    name, parameters = get_parameters(code, "tool")
+
+    assert name == "tool"
+    assert [parameter["name"] for parameter in parameters] == ["city", "days", "units", "extra"]
+    assert parameters[1]["default"] == 3 and parameters[2]["kind"] == "KEYWORD_ONLY"
+
+
+@pytest.mark.parametrize("name", ["../escape", "two words", "", None, "os.path"])
+def test_tool_names_must_be_identifiers(tmp_path, name):
+    with pytest.raises(ValueError):
+        DynamicToolLoader(str(tmp_path)).add_tool(name, "def tool():\n    return 1\n")
+    assert os.listdir(tmp_path) == []
+
+
+def test_tools_are_listed_without_importing_them(tmp_path):
+    writer = DynamicToolLoader(str(tmp_path))
+    writer.add_tool("double", "def double(value, factor=2):\n    return value * factor\n")
+
+    loader = DynamicToolLoader(str(tmp_path))
+    tool = loader.get_tool("double")
+    assert loader.get_tool_names() == ["double"]
+    assert list(inspect.signature(tool).parameters) == ["value", "factor"]
+    assert loader.get_stats()["loaded"] == 0
+    assert tool(value=4) == 8
+    assert loader.get_stats()["loads"] == {"double": 1}
+
+
+def test_changed_tool_is_reimported_alone(tmp_path):
+    loader = DynamicToolLoader(str(tmp_path))
+    loader.add_tool("first", "def first():\n    return 1\n")
+    loader.add_tool("second", "def second():\n    return 2\n")
+    assert (loader.get_tool("first")(), loader.get_tool("second")()) == (1, 2)
+
+    loader.add_tool("first", "def first():\n    return 10\n")
+    assert (loader.get_tool("first")(), loader.get_tool("second")()) == (10, 2)
+    assert loader.get_stats()["loads"] == {"first": 2, "second": 1}
+
+
+def test_new_tool_resolves_through_the_registry(manager, tmp_path, monkeypatch):
+    loader = DynamicToolLoader(str(tmp_path))
+    registry = manager.get_tool_registry()
+    monkeypatch.setattr(registry, "dynamic_tools", loader)
+    registry.invalidate()
+    assert registry.resolve("triple") is None
+
+    loader.add_tool("triple", "def triple(value):\n    return value * 3\n")
+    entry = registry.resolve("triple")
+    assert entry.source == "dynamic_functions"
+    assert registry.call(entry, {"value": 2}) == 6
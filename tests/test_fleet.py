@@ -0,0 +1,78 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from assistant_manager.fleet import FleetReconciler, FleetSpecError, field_hash, load_fleet_spec
+
+
+def test_field_hashes_ignore_order_and_empty_text():
+    assert field_hash("file_ids", ["file_b", "file_a"]) == field_hash("file_ids", ["file_a", "file_b"])
+    assert field_hash("metadata", {"version": 2}) == field_hash("metadata", {"version": "2"})
+    assert field_hash("metadata", None) != field_hash("metadata", {})
+    for empty in ("", None):
+        assert field_hash("instructions", empty) == field_hash("instructions", None)
+        assert field_hash("description", empty) == field_hash("description", None)
+    assert field_hash("instructions", "Be brief.") != field_hash("instructions", None)
+
+
+def test_a_fleet_file_with_a_repeated_name_is_rejected(tmp_path):
+    path = tmp_path / "fleet.json"
+    path.write_text(json.dumps({"assistants": [{"name": "a", "model": "gpt-4"}, {"name": "a", "model": "gpt-4"}]}))
+    with pytest.raises(FleetSpecError, match="listed twice"):
+        load_fleet_spec(str(path))
+
+
+def test_only_the_changed_fields_are_planned(manager):
+    reconciler = FleetReconciler(manager)
+    live = SimpleNamespace(
+        id="asst_1", model="gpt-4", instructions=None, description=None,
+        tools=[{"type": "code_interpreter"}], file_ids=["file_b", "file_a"], metadata={},
+    )
+    entry = {
+        "name": "a", "model": "gpt-4", "instructions": "", "tools": ["code_interpreter"],
+        "file_ids": ["file_a", "file_b"], "metadata": {"team": "research"},
+    }
+    change = reconciler.diff(entry, live)
+
+    assert change.action == "update"
+    assert list(change.fields) == ["metadata"]
+
+
+def test_a_second_reconcile_makes_no_writes(manager, mock_api):
+    entries = [
+        {"name": "fleet-researcher", "model": "gpt-4-1106-preview", "instructions": "",
+         "tools": ["get_arxiv_papers", "code_interpreter"], "metadata": {"team": "research"}},
+        {"name": "fleet-writer", "model": "gpt-4-1106-preview", "instructions": "Write.", "file_ids": []},
+    ]
+    reconciler = FleetReconciler(manager)
+    first = reconciler.reconcile(entries)
+    assert sorted(first["created"]) == ["fleet-researcher", "fleet-writer"]
+    # The API hands empty instructions back as null
+    mock_api.assistants[first["created"]["fleet-researcher"]]["instructions"] = None
+
+    mock_api.reset_calls()
+    second = reconciler.reconcile(entries)
+
+    assert second["writes"] == 0
+    assert sorted(second["unchanged"]) == ["fleet-researcher", "fleet-writer"]
+    calls = mock_api.get_calls()
+    assert "POST /assistants" not in calls
+    assert "POST /assistants/{id}" not in calls
+
+
+def test_a_changed_entry_updates_only_its_assistant(manager, mock_api):
+    entries = [
+        {"name": "fleet-editor", "model": "gpt-4-1106-preview", "instructions": "Edit."},
+        {"name": "fleet-reviewer", "model": "gpt-4-1106-preview", "instructions": "Review."},
+    ]
+    reconciler = FleetReconciler(manager)
+    reconciler.reconcile(entries)
+    entries[0]["instructions"] = "Edit tersely."
+
+    mock_api.reset_calls()
+    result = reconciler.reconcile(entries)
+
+    assert list(result["updated"]) == ["fleet-editor"]
+    assert mock_api.get_calls().get("POST /assistants/{id}") == 1
+    assert mock_api.assistants[result["updated"]["fleet-editor"]]["instructions"] == "Edit tersely."
@@ -0,0 +1,42 @@
+import json
+
+from assistant_manager.utils.message_store import MessageStore
+
+
+def test_sync_fetches_only_messages_after_the_high_water_mark(manager, mock_api):
+    thread_id = manager.create_thread().id
+    for text in ("one", "two"):
+        manager.create_message(thread_id=thread_id, role="user", content=text)
+
+    assert len(manager.sync_thread_messages(thread_id)) == 2
+    manager.create_message(thread_id=thread_id, role="user", content="three")
+    assert [message.content[0].text.value for message in manager.sync_thread_messages(thread_id)] == ["three"]
+    assert [message.content[0].text.value for message in manager.message_store.get_messages(thread_id, limit=2)] == ["two", "three"]
+
+
+def test_stored_rows_load_without_strict_validation():
+    store = MessageStore(":memory:")
+    body = {
+        "id": "msg_old", "object": "thread.message", "created_at": 1, "thread_id": "thread_1", "role": "assistant",
+        "content": [{"type": "text", "text": {"value": "stored", "annotations": []}}], "file_ids": [], "metadata": {},
+    }
+    # A row written before messages had a status
+    store.connection.execute(
+        "INSERT INTO messages (thread_id, message_id, created_at, role, body) VALUES (?, ?, ?, ?, ?)",
+        ("thread_1", "msg_old", 1, "assistant", json.dumps(body)),
+    )
+
+    message = store.get_message("thread_1", "msg_old")
+    assert message.content[0].text.value == "stored"
+    assert [message.id for message in store.get_messages_after("thread_1", None)] == ["msg_old"]
+
+
+def test_thread_history_is_prepared_once_per_switch(manager, mock_api):
+    prepared = []
+    prepare_thread_history = manager.prepare_thread_history
+    manager.prepare_thread_history = lambda thread_id: prepared.append(thread_id) or prepare_thread_history(thread_id)
+
+    thread_id = manager.setup_thread(input_thread_name="once")
+    manager.setup_thread(input_thread_name="once")
+    manager.setup_thread(input_thread_id=thread_id)
+    assert prepared == [thread_id] * 3
@@ -0,0 +1,44 @@
+from assistant_manager.utils.metrics import Histogram, Metrics
+
+
+def test_histogram_quantiles_interpolate_inside_buckets():
+    histogram = Histogram(buckets=(1.0, 2.0))
+    for seconds in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(seconds)
+
+    assert histogram.counts == [1, 2, 1]
+    assert histogram.quantile(0.5) == 1.5
+    assert histogram.summary()["max_seconds"] == 3.0
+
+
+def test_errors_are_counted_by_status():
+    metrics = Metrics()
+    metrics.record_api_call("retrieve_run", 0.1)
+    metrics.record_api_call("retrieve_run", 0.2, status="429")
+
+    stats = metrics.get_api_stats("retrieve_run")
+    assert (stats["count"], stats["errors"]) == (2, {"429": 1})
+
+
+def test_openmetrics_export_ends_with_eof():
+    metrics = Metrics()
+    metrics.record_api_call("create_run", 0.01)
+    metrics.record_local_hit("retrieve_message")
+    text = metrics.to_openmetrics()
+
+    assert 'assistant_api_calls_total{operation="create_run"} 1' in text
+    assert 'assistant_local_hits_total{operation="retrieve_message"} 1' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_stored_messages_are_local_hits_not_api_calls(manager, mock_api):
+    manager.metrics = Metrics()
+    thread_id = manager.create_thread().id
+    message_id = manager.create_message(thread_id=thread_id, role="user", content="hi").id
+
+    # The first retrieve calls the API and stores the message, the second is served from the store
+    for _ in range(2):
+        assert manager.retrieve_message(thread_id, message_id).id == message_id
+    assert manager.metrics.get_api_stats("retrieve_message")["count"] == 1
+    assert manager.metrics.get_local_hits("retrieve_message") == 1
+    assert mock_api.get_calls()["GET /threads/{id}/messages/{id}"] == 1
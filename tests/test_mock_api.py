@@ -0,0 +1,57 @@
+import pytest
+from openai.types.beta import Assistant, Thread
+from openai.types.beta.threads import Message, Run
+
+from assistant_manager.utils.poll_scheduler import FixedPollScheduler
+from benchmarks import run_lifecycle
+from benchmarks.mock_assistants_api import MockAssistantsAPI, RunScript
+
+
+def test_objects_validate_strictly_against_the_sdk_models():
+    api = MockAssistantsAPI()
+    status, assistant = api.handle("POST", "/v1/assistants", {}, {"model": "gpt-4-1106-preview", "name": "strict"})
+    status, thread = api.handle("POST", "/v1/threads", {}, {"messages": [{"role": "user", "content": "hi"}]})
+    status, run = api.handle("POST", f"/v1/threads/{thread['id']}/runs", {}, {"assistant_id": assistant["id"]})
+    for _ in range(3):
+        status, run = api.handle("GET", f"/v1/threads/{thread['id']}/runs/{run['id']}", {}, {})
+    status, messages = api.handle("GET", f"/v1/threads/{thread['id']}/messages", {}, {})
+
+    Assistant.model_validate(assistant)
+    Thread.model_validate(thread)
+    Run.model_validate(run)
+    assert run["status"] == "completed"
+    assert [Message.model_validate(message).role for message in messages["data"]] == ["assistant", "user"]
+
+
+def test_runs_follow_their_script_and_wait_for_tool_outputs():
+    api = MockAssistantsAPI(RunScript(["queued", "requires_action", "completed"], tool_calls=[{"name": "echo", "arguments": {}}]))
+    status, thread = api.handle("POST", "/v1/threads", {}, {})
+    status, run = api.handle("POST", f"/v1/threads/{thread['id']}/runs", {}, {})
+    path = f"/v1/threads/{thread['id']}/runs/{run['id']}"
+
+    assert [api.handle("GET", path, {}, {})[1]["status"] for _ in range(2)] == ["requires_action", "requires_action"]
+    assert api.handle("POST", f"/v1/threads/{thread['id']}/runs", {}, {})[0] == 400
+    api.handle("POST", path + "/submit_tool_outputs", {}, {"tool_outputs": []})
+    assert api.handle("GET", path, {}, {})[1]["status"] == "completed"
+    assert api.get_calls()["GET /threads/{id}/runs/{id}"] == 3
+
+
+def test_injected_failures_are_counted():
+    api = MockAssistantsAPI(error_rate=1.0, error_status=429)
+    assert api.handle("GET", "/v1/assistants", {}, {})[0] == 429
+    assert api.get_calls() == {"GET /assistants": 1}
+
+
+@pytest.mark.parametrize("scenario", sorted(run_lifecycle.SCENARIOS))
+def test_benchmark_turns_complete(mock_server, mock_api, scenario):
+    api, base_url = mock_server
+    api.run_script = run_lifecycle.SCENARIOS[scenario]
+    manager = run_lifecycle.make_manager(base_url)
+    manager.poll_scheduler = FixedPollScheduler(0.0)
+    assistant_id = manager.create_assistant(model="gpt-4-1106-preview", instructions="Bench", name="bench").id
+
+    result = run_lifecycle.bench_turns(manager, api, assistant_id, turns=2)
+    assert result["latency"]["count"] == 2
+    assert result["api_calls_by_route"]["POST /threads/{id}/runs"] == 1
+    submits = result["api_calls_by_route"].get("POST /threads/{id}/runs/{id}/submit_tool_outputs", 0)
+    assert submits == (1 if api.run_script.tool_calls else 0)
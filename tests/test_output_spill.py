@@ -0,0 +1,69 @@
+import re
+
+import pytest
+
+from assistant_manager.utils.output_spill import OutputSpill
+
+
+@pytest.fixture
+def spill(tmp_path):
+    return OutputSpill(budget_chars=300, head_chars=20, tail_chars=10, artifact_dir=str(tmp_path))
+
+
+def read_all(spill, artifact_id, length):
+    text, offset = "", 0
+    while True:
+        chunk = spill.read_chunk(artifact_id, offset, length)
+        header, body = chunk.split("\n", 1)
+        assert len(body) <= spill.settings["budget_chars"]
+        text += body
+        match = re.search(r"continue at offset (\d+)", header)
+        if match is None:
+            return text
+        offset = int(match.group(1))
+
+
+def test_outputs_within_budget_are_not_spilled(spill):
+    assert spill.spill("tool", "x" * 300) is None
+
+
+def test_summary_has_the_head_tail_and_both_sizes(spill):
+    text = "é" * 400
+    artifact = spill.spill("tool", text, thread_id="thread_1")
+    summary = artifact.summary(300)
+
+    assert artifact.artifact_id.startswith("thread_1_tool_")
+    assert "400 characters (800 bytes)" in summary
+    assert artifact.head == "é" * 20 and artifact.tail == "é" * 10
+
+
+@pytest.mark.parametrize("length", [5, 7, 100])
+def test_chunks_never_split_a_character(spill, length):
+    text = "aé€😀" * 200
+    artifact = spill.spill("tool", text)
+    assert read_all(spill, artifact.artifact_id, length) == text
+
+
+def test_offset_inside_a_character_starts_at_that_character(spill):
+    artifact = spill.spill("tool", "€" * 400)
+    chunk = spill.read_chunk(artifact.artifact_id, offset=4, length=6)
+    assert chunk == "[bytes 3-9 of 1200, continue at offset 9]\n€€"
+
+
+def test_chunks_stay_within_the_budget(spill):
+    artifact = spill.spill("tool", "x" * 1000)
+    assert spill.read_chunk(artifact.artifact_id, 0, 10 ** 6).startswith("[bytes 0-100 of 1000")
+
+
+def test_artifact_ids_cannot_leave_the_artifact_dir(spill):
+    assert spill.read_chunk("../secrets.txt") == "No artifact '../secrets.txt'"
+    assert spill.get_path(".hidden") is None
+
+
+def test_oversized_tool_output_is_replaced_by_a_summary(manager, tmp_path, monkeypatch):
+    from assistant_manager.utils import output_spill
+    monkeypatch.setattr(output_spill, "shared_spill", OutputSpill(budget_chars=300, artifact_dir=str(tmp_path)))
+    output = manager.govern_output("echo", "y" * 1000)
+
+    assert output.startswith("[The output of echo was 1000 characters")
+    assert len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from assistant_manager.utils.pagination import aiter_items, iter_items, iter_pages
+
+
+class FakeEndpoint():
+    """
+    A list endpoint over n items that records every page request.
+    """
+
+    def __init__(self, count):
+        self.items = [SimpleNamespace(id=f"item_{index}") for index in range(count)]
+        self.requests = []
+
+    def __call__(self, limit, after=None):
+        self.requests.append(after)
+        start = 0 if after is None else [item.id for item in self.items].index(after) + 1
+        data = self.items[start:start + limit]
+        return SimpleNamespace(data=data, has_more=start + limit < len(self.items))
+
+
+def test_items_follow_the_cursor_across_pages():
+    endpoint = FakeEndpoint(5)
+    assert [item.id for item in iter_items(endpoint, limit=2)] == [f"item_{index}" for index in range(5)]
+    assert endpoint.requests == [None, "item_1", "item_3"]
+
+
+def test_next_page_is_fetched_while_the_current_one_is_consumed():
+    endpoint = FakeEndpoint(4)
+    pages = iter_pages(endpoint, limit=2)
+    next(pages)
+    # The first page is in the caller's hands, the second is already on its way
+    for _ in range(100):
+        if len(endpoint.requests) == 2:
+            break
+        threading.Event().wait(0.01)
+    assert endpoint.requests == [None, "item_1"]
+    pages.close()
+
+
+def test_until_stops_without_fetching_more_pages():
+    endpoint = FakeEndpoint(10)
+    items = list(iter_items(endpoint, limit=2, until=lambda item: item.id == "item_1", prefetch=False))
+    assert [item.id for item in items] == ["item_0", "item_1"]
+    assert endpoint.requests == [None]
+
+
+def test_async_items_follow_the_cursor():
+    endpoint = FakeEndpoint(5)
+
+    async def fetch_page(limit, after=None):
+        return endpoint(limit, after)
+
+    async def collect():
+        return [item.id async for item in aiter_items(fetch_page, limit=2)]
+
+    assert asyncio.run(collect()) == [f"item_{index}" for index in range(5)]
+
+
+def test_manager_iterates_messages_across_pages(manager, mock_api):
+    thread_id = manager.create_thread().id
+    for index in range(105):
+        manager.create_message(thread_id=thread_id, role="user", content=str(index))
+    mock_api.reset_calls()
+
+    assert [message.content[0].text.value for message in manager.iter_messages(thread_id)] == [str(index) for index in range(105)]
+    assert mock_api.get_calls()["GET /threads/{id}/messages"] == 2
@@ -0,0 +1,42 @@
+import pytest
+
+from assistant_manager.utils.poll_scheduler import FixedPollScheduler, PollScheduler, PollStats
+
+
+def test_delays_stay_fast_then_grow_to_the_cap():
+    scheduler = PollScheduler(initial_delay=0.25, factor=2, max_delay=1.0, jitter=0, fast_polls=2)
+    delays = scheduler.delays()
+    assert [next(delays) for _ in range(6)] == [0.25, 0.25, 0.5, 1.0, 1.0, 1.0]
+
+
+def test_jitter_never_exceeds_the_cap():
+    scheduler = PollScheduler(initial_delay=0.5, factor=2, max_delay=1.0, jitter=0.5, fast_polls=0)
+    assert all(scheduler.delay(poll) <= 1.0 for poll in range(200))
+
+
+def test_fixed_schedule_always_waits_the_interval():
+    assert {FixedPollScheduler(2.0).delay(poll) for poll in range(10)} == {2.0}
+
+
+@pytest.mark.parametrize("settings", [{"initial_delay": -1}, {"factor": 0.5}, {"jitter": 1.0}, {"initial_delay": 2, "max_delay": 1}])
+def test_invalid_settings_are_rejected(settings):
+    with pytest.raises(ValueError):
+        PollScheduler(**settings)
+
+
+def test_poll_stats_keep_the_newest_runs():
+    stats = PollStats(max_runs=2)
+    for index in range(3):
+        stats.record(f"run_{index}", polls=index + 1, seconds=0.1, status="completed")
+    assert stats.get("run_0") is None
+    assert stats.summary()["runs"] == 2
+
+
+def test_process_run_records_its_polls(manager, mock_api):
+    thread_id = manager.change_thread(thread_name="polls")
+    manager.create_message(thread_id=thread_id, role="user", content="hi")
+    run = manager.create_run(thread_id=thread_id, assistant_id=manager.assistant_id)
+    assert manager.process_run(thread_id, run.id) == "Done."
+    stats = manager.poll_stats.get(run.id)
+    assert stats["status"] == "completed"
+    assert stats["polls"] >= 1
@@ -0,0 +1,66 @@
+import pytest
+
+from assistant_manager.utils.python_workers import PythonWorkerPool, format_execution, run_cell
+
+
+@pytest.fixture
+def pool():
+    pool = PythonWorkerPool(max_workers=2, warm_workers=0, timeout=10.0)
+    yield pool
+    pool.shutdown()
+
+
+def test_cell_returns_output_and_trailing_expression():
+    reply = run_cell("print('hi')\n1 + 1", {}, 100)
+    assert (reply["output"], reply["result"], reply["error"]) == ("hi\n", "2", None)
+
+
+def test_cell_output_is_capped():
+    reply = run_cell("print('x' * 50)", {}, 10)
+    assert reply["output"] == "x" * 10
+    assert reply["dropped"] == 41
+    assert "41 more characters" in format_execution(reply)
+
+
+def test_cell_errors_are_reported():
+    assert "ZeroDivisionError" in run_cell("1 / 0", {}, 1000)["error"]
+    assert "SyntaxError" in run_cell("def", {}, 1000)["error"]
+
+
+def test_variables_persist_per_thread(pool):
+    pool.execute("value = 41", key="thread_1")
+    assert pool.execute("value + 1", key="thread_1")["result"] == "42"
+    assert "NameError" in pool.execute("value", key="thread_2")["error"]
+    assert pool.get_stats()["started"] == 2
+
+
+def test_idle_workers_are_evicted_when_the_pool_is_full(pool):
+    for key in ("thread_1", "thread_2", "thread_3"):
+        pool.execute("1", key=key)
+    assert pool.get_stats()["evicted"] == 1
+    assert pool.get_stats()["bound"] == 2
+
+
+def test_timed_out_worker_is_replaced(pool):
+    pool.execute("value = 1", key="thread_1")
+    reply = pool.execute("while True: pass", key="thread_1", timeout=0.5)
+
+    assert reply["timed_out"]
+    # The killed interpreter's state is gone with it
+    assert "NameError" in pool.execute("value", key="thread_1")["error"]
+    assert pool.get_stats()["timeouts"] == 1
+
+
+def test_workers_are_recycled_after_max_executions():
+    pool = PythonWorkerPool(max_workers=1, warm_workers=0, max_executions=2)
+    try:
+        for _ in range(3):
+            pool.execute("1", key="thread_1")
+        assert pool.get_stats()["recycled"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_unknown_settings_are_rejected():
+    with pytest.raises(ValueError):
+        PythonWorkerPool(max_worker=2)
@@ -0,0 +1,71 @@
+import httpx
+import pytest
+
+from assistant_manager.utils.rate_limiter import (
+    GovernedTransport, RateLimitGovernor, TokenBucket, endpoint_class, parse_duration, parse_retry_after,
+)
+
+
+def test_bucket_is_unlimited_until_the_api_reports_a_limit():
+    bucket = TokenBucket()
+    assert bucket.reserve(1000, now=0.0) == 0.0
+
+
+def test_debt_is_paid_off_at_the_refill_rate():
+    bucket = TokenBucket()
+    # 10 requests a minute, none left, full again in 6 seconds
+    bucket.update(10, 0, 6.0, now=0.0)
+    assert bucket.refill_per_second == pytest.approx(10 / 6)
+    assert bucket.reserve(1, now=0.0) == pytest.approx(0.6)
+    # Refilled enough by now to pay off the debt and take one more
+    assert bucket.reserve(1, now=1.2) == 0.0
+
+
+def test_taking_nothing_waits_while_the_bucket_is_empty():
+    bucket = TokenBucket()
+    bucket.update(100, 0, 10.0, now=0.0)
+    assert bucket.reserve(0, now=0.0) == pytest.approx(0.1)
+    bucket.update(100, 50, 10.0, now=0.0)
+    assert bucket.reserve(0, now=0.0) == 0.0
+
+
+def test_pause_holds_every_caller():
+    bucket = TokenBucket()
+    bucket.pause(2.0, now=10.0)
+    assert bucket.reserve(1, now=11.0) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("value, seconds", [("1s", 1.0), ("6m0s", 360.0), ("20ms", 0.02), ("1.5", 1.5), ("soon", None), (None, None)])
+def test_reset_durations(value, seconds):
+    assert parse_duration(value) == (pytest.approx(seconds) if seconds is not None else None)
+
+
+def test_retry_after_prefers_milliseconds():
+    assert parse_retry_after({"retry-after-ms": "250", "retry-after": "9"}) == 0.25
+    assert parse_retry_after({"retry-after": "3"}) == 3.0
+    assert parse_retry_after({}) is None
+
+
+def test_endpoint_class_is_the_deepest_collection():
+    assert endpoint_class("/v1/threads/thread_1/runs/run_1/submit_tool_outputs") == "runs"
+    assert endpoint_class("/v1/threads/thread_1/messages") == "messages"
+    assert endpoint_class("/v1/models") == "other"
+
+
+def test_retry_delays_grow_and_run_out():
+    governor = RateLimitGovernor(max_retries=3, base_delay=1.0, max_delay=3.0)
+    governor.get_buckets("runs")
+    for attempt, (low, high) in enumerate([(0.5, 1.0), (1.0, 2.0), (1.5, 3.0)]):
+        assert low <= governor.retry_delay("runs", attempt) <= high
+    assert governor.retry_delay("runs", 3) is None
+
+
+def test_429_is_retried_and_pauses_the_endpoint():
+    responses = iter([httpx.Response(429, headers={"retry-after-ms": "10"}), httpx.Response(200, json={})])
+    governor = RateLimitGovernor(base_delay=0.01)
+    transport = GovernedTransport(governor, httpx.MockTransport(lambda request: next(responses)))
+
+    with httpx.Client(transport=transport) as client:
+        assert client.get("http://api.test/v1/threads/thread_1/runs").status_code == 200
+    stats = governor.get_stats()["runs"]
+    assert (stats["requests"], stats["retries"], stats["rate_limited"]) == (2, 1, 1)
@@ -0,0 +1,101 @@
+import threading
+import time
+
+from assistant_manager.run_orchestrator import RunOrchestrator
+from assistant_manager.utils.tracing import Tracer
+from benchmarks.mock_assistants_api import RunScript
+
+
+class RecordingManager():
+    """
+    Stands in for a Run_Manager, recording the order runs start in and holding each until released.
+    """
+
+    def __init__(self):
+        self.tracer = Tracer()
+        self.started = []
+        self.active = set()
+        self.overlaps = []
+        self.lock = threading.Lock()
+        self.release = threading.Event()
+
+    def execute_run(self, thread_id, assistant_id=None, tag=None):
+        with self.lock:
+            if thread_id in self.active:
+                self.overlaps.append(thread_id)
+            self.active.add(thread_id)
+            self.started.append(tag)
+        self.release.wait(5)
+        with self.lock:
+            self.active.discard(thread_id)
+        return tag
+
+
+def test_runs_on_one_thread_run_in_order_one_at_a_time():
+    manager = RecordingManager()
+    orchestrator = RunOrchestrator(manager, max_in_flight=4)
+    futures = [orchestrator.submit("thread_1", tag=index) for index in range(5)]
+    manager.release.set()
+
+    assert [future.result(5) for future in futures] == list(range(5))
+    assert manager.started == list(range(5))
+    assert manager.overlaps == []
+
+
+def test_in_flight_runs_are_capped():
+    manager = RecordingManager()
+    orchestrator = RunOrchestrator(manager, max_in_flight=2)
+    futures = [orchestrator.submit(f"thread_{index}", tag=index) for index in range(5)]
+    time.sleep(0.05)
+
+    stats = orchestrator.get_stats()
+    assert (stats["in_flight"], stats["queued"]) == (2, 3)
+    manager.release.set()
+    assert [future.result(5) for future in futures] == list(range(5))
+
+
+def test_tenants_take_turns_for_free_slots():
+    manager = RecordingManager()
+    orchestrator = RunOrchestrator(manager, max_in_flight=1)
+    blocker = orchestrator.submit("thread_blocker", tenant="busy", tag="blocker")
+    busy = [orchestrator.submit(f"thread_busy_{index}", tenant="busy", tag=f"busy_{index}") for index in range(3)]
+    quiet = orchestrator.submit("thread_quiet", tenant="quiet", tag="quiet")
+    manager.release.set()
+
+    for future in [blocker, quiet] + busy:
+        future.result(5)
+    # The quiet tenant's only run does not wait behind all of the busy tenant's runs
+    assert manager.started.index("quiet") == 2
+
+
+def test_cancelled_requests_are_skipped():
+    manager = RecordingManager()
+    orchestrator = RunOrchestrator(manager, max_in_flight=1)
+    first = orchestrator.submit("thread_1", tag="first")
+    cancelled = orchestrator.submit("thread_1", tag="cancelled")
+    last = orchestrator.submit("thread_1", tag="last")
+    assert cancelled.cancel()
+    manager.release.set()
+
+    assert (first.result(5), last.result(5)) == ("first", "last")
+    assert manager.started == ["first", "last"]
+
+
+def test_perform_run_goes_through_the_orchestrator(manager, mock_api):
+    thread_id = manager.create_thread().id
+    manager.create_message(thread_id=thread_id, role="user", content="hi")
+    manager.perform_run(thread_id)
+
+    assert manager.get_run_orchestrator().get_stats()["completed"] == 1
+    assert manager.messages_to_user == ["assistant: Done."]
+
+
+def test_streamed_run_is_registered_while_it_streams(manager, mock_api):
+    thread_id = manager.create_thread().id
+    manager.create_message(thread_id=thread_id, role="user", content="hi")
+    runs_seen = []
+    manager.message_user_delta = lambda delta: runs_seen.append(list(manager.runs))
+
+    manager.execute_run(thread_id, stream=True)
+    assert runs_seen and all(len(run_ids) == 1 for run_ids in runs_seen)
+    assert manager.runs == {}
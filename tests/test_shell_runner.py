@@ -0,0 +1,66 @@
+import glob
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+from assistant_manager.utils.shell_runner import ShellRunner, format_shell_result, get_interpreter
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="Scripts run under /bin/sh")
+
+
+def test_interpreter_comes_from_the_shebang():
+    assert get_interpreter("echo hi", "/bin/sh") == ["/bin/sh"]
+    assert get_interpreter("#!/usr/bin/env python3 -u\nprint(1)", "/bin/sh") == ["/usr/bin/env", "python3", "-u"]
+
+
+def test_script_output_and_exit_status():
+    result = ShellRunner().run("echo out; echo err >&2; exit 3")
+    assert (result["stdout"], result["stderr"], result["exit_status"]) == ("out\n", "err\n", 3)
+    assert format_shell_result(result) == "out\n[stderr]\nerr\n[exit status 3]"
+
+
+def test_shebang_scripts_run_under_their_interpreter():
+    result = ShellRunner().run(f"#!{sys.executable}\nprint(6 * 7)")
+    assert result["stdout"] == "42\n"
+
+
+def test_reading_stdin_gets_end_of_file():
+    result = ShellRunner().run("cat; echo done", timeout=5)
+    assert (result["stdout"], result["timed_out"]) == ("done\n", False)
+
+
+def test_timed_out_scripts_are_killed_with_their_children():
+    started = time.monotonic()
+    result = ShellRunner().run("sleep 30 & sleep 30", timeout=0.5)
+    assert result["timed_out"] and result["exit_status"] is None
+    assert time.monotonic() - started < 5
+
+
+def test_output_is_capped():
+    result = ShellRunner(output_limit_bytes=10).run("printf '%050d' 0")
+    assert (len(result["stdout"]), result["stdout_dropped"]) == (10, 40)
+
+
+def test_concurrent_scripts_do_not_share_files():
+    runner = ShellRunner(max_concurrent=4)
+    results = [None] * 4
+
+    def run(index):
+        results[index] = runner.run(f"echo {index}")["stdout"]
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [f"{index}\n" for index in range(4)]
+    assert glob.glob(os.path.join(tempfile.gettempdir(), "exec_sh_*.script")) == []
+
+
+def test_missing_interpreter_is_reported_like_a_shell():
+    result = ShellRunner().run("#!/no/such/interpreter\n")
+    assert result["exit_status"] == 127
@@ -0,0 +1,41 @@
+from benchmarks.mock_assistants_api import RunScript
+
+
+def test_streamed_run_sends_the_reply_as_it_arrives(manager, mock_api):
+    thread_id = manager.change_thread(thread_name="stream")
+    manager.create_message(thread_id=thread_id, role="user", content="hi")
+    mock_api.run_script = RunScript(reply="Streamed.")
+
+    assert manager.execute_run(thread_id, stream=True) == "Streamed."
+    assert "".join(manager.deltas_to_user) == "assistant: Streamed.\n"
+    # No polling on the streamed path
+    assert "GET /threads/{id}/runs/{id}" not in mock_api.get_calls()
+
+
+def test_streamed_run_continues_after_tool_outputs(manager, mock_api):
+    thread_id = manager.change_thread(thread_name="stream tools")
+    manager.create_message(thread_id=thread_id, role="user", content="hi")
+    mock_api.run_script = RunScript(
+        ["queued", "in_progress", "requires_action", "in_progress", "completed"],
+        tool_calls=[{"name": "echo", "arguments": {"text": "ping"}}],
+        reply="pong",
+    )
+
+    assert manager.execute_run(thread_id, stream=True) == "pong"
+    assert mock_api.get_calls()["POST /threads/{id}/runs/{id}/submit_tool_outputs"] == 1
+
+
+def test_streamed_reply_is_not_fetched_again(manager, mock_api):
+    thread_id = manager.change_thread(thread_name="stream seen")
+    manager.create_message(thread_id=thread_id, role="user", content="hi")
+    manager.execute_run(thread_id, stream=True)
+
+    assert [message.content[0].text.value for message in manager.fetch_new_messages(thread_id) if message.role == "assistant"] == []
+
+
+def test_failed_streamed_run_returns_none(manager, mock_api):
+    thread_id = manager.change_thread(thread_name="stream failed")
+    manager.create_message(thread_id=thread_id, role="user", content="hi")
+    mock_api.run_script = RunScript(["queued", "in_progress", "failed"])
+
+    assert manager.execute_run(thread_id, stream=True) is None
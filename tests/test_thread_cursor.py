@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from assistant_manager.utils.thread_cursor import ThreadCursor
+from benchmarks.mock_assistants_api import RunScript
+from tests.conftest import make_test_manager
+
+
+def run_turn(manager, thread_id, text):
+    manager.create_message(thread_id=thread_id, role="user", content=text)
+    run = manager.create_run(thread_id=thread_id, assistant_id=manager.assistant_id)
+    return manager.process_run(thread_id, run.id)
+
+
+def test_cursor_skips_seen_messages_and_forgets_the_oldest():
+    cursor = ThreadCursor(max_seen=2)
+    cursor.mark_seen("msg_1")
+
+    unseen = cursor.take_unseen([SimpleNamespace(id="msg_1"), SimpleNamespace(id="msg_2"), SimpleNamespace(id="msg_3")])
+    assert [message.id for message in unseen] == ["msg_2", "msg_3"]
+    assert cursor.cursor == "msg_3"
+    assert cursor.list_seen() == ["msg_2", "msg_3"]
+
+
+def test_each_run_returns_only_its_own_reply(manager, mock_api):
+    thread_id = manager.create_thread().id
+    mock_api.run_script = RunScript(reply="first")
+    assert run_turn(manager, thread_id, "one") == "first"
+    mock_api.run_script = RunScript(reply="second")
+    assert run_turn(manager, thread_id, "two") == "second"
+
+
+@pytest.mark.parametrize("shared_store", [True, False])
+def test_cold_cursor_does_not_return_earlier_replies(manager, mock_api, shared_store):
+    from assistant_manager.assistant_manager import OAI_Assistant
+    thread_id = manager.create_thread().id
+    mock_api.run_script = RunScript(reply="earlier")
+    run_turn(manager, thread_id, "one")
+
+    # A fresh manager, e.g. after a restart, has no cursor for the thread
+    restarted = make_test_manager(OAI_Assistant)
+    restarted.assistant_id = manager.assistant_id
+    if shared_store:
+        restarted.message_store = manager.message_store
+    mock_api.run_script = RunScript(reply="latest")
+    assert run_turn(restarted, thread_id, "two") == "latest"
+
+
+def test_async_cold_cursor_does_not_return_earlier_replies(manager, async_manager, mock_api):
+    thread_id = manager.create_thread().id
+    mock_api.run_script = RunScript(reply="earlier")
+    run_turn(manager, thread_id, "one")
+    mock_api.run_script = RunScript(reply="latest")
+
+    async def scenario():
+        await async_manager.create_message(thread_id=thread_id, role="user", content="two")
+        run = await async_manager.create_run(thread_id=thread_id, assistant_id=manager.assistant_id)
+        return await async_manager.process_run(thread_id, run.id)
+
+    assert asyncio.run(scenario()) == "latest"
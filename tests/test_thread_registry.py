@@ -0,0 +1,46 @@
+import json
+
+from assistant_manager.utils.thread_registry import ThreadRegistry
+
+
+def test_names_and_ids_resolve_both_ways():
+    registry = ThreadRegistry(":memory:", legacy_path=None)
+    registry.add("first", "thread_1")
+    registry.add("first", "thread_2")
+
+    assert registry.get_id("first") == "thread_2"
+    assert registry.get_name("thread_2") == "first"
+    assert registry.get_name("thread_1") is None
+    assert registry.count() == 1
+
+
+def test_search_by_prefix_in_name_order():
+    registry = ThreadRegistry(":memory:", legacy_path=None)
+    for name in ("beta", "alpha two", "alpha one", "alphabet"):
+        registry.add(name, f"thread_{name}")
+
+    assert [name for name, _ in registry.search("alpha")] == ["alpha one", "alpha two", "alphabet"]
+    assert [name for name, _ in registry.search("", limit=1)] == ["alphabet"]
+
+
+def test_legacy_file_is_imported_once(tmp_path):
+    legacy_path = tmp_path / "thread_ids.json"
+    legacy_path.write_text(json.dumps({"old": "thread_old", "kept": "thread_legacy"}))
+    path = str(tmp_path / "threads.sqlite3")
+
+    registry = ThreadRegistry(path, legacy_path=None)
+    registry.add("kept", "thread_new")
+    assert registry.import_legacy(str(legacy_path)) == 2
+    assert registry.import_legacy(str(legacy_path)) == 0
+    registry.close()
+
+    # Reopening does not import the file again
+    reopened = ThreadRegistry(path, legacy_path=str(legacy_path))
+    assert reopened.get_all() == {"old": "thread_old", "kept": "thread_new"}
+
+
+def test_named_thread_is_created_once(manager, mock_api):
+    thread_id = manager.change_thread(thread_name="registered")
+    assert manager.change_thread(thread_name="registered") == thread_id
+    assert manager.get_thread_name(thread_id) == "registered"
+    assert mock_api.get_calls()["POST /threads"] == 1
@@ -0,0 +1,74 @@
+import time
+
+from assistant_manager.utils.tool_cache import CachePolicy, ToolCache, make_key
+
+
+def counting_call(calls, output):
+    def call():
+        calls.append(1)
+        return output
+    return call
+
+
+def test_normalized_arguments_share_a_key():
+    policy = CachePolicy(normalize={"lowercase": ["query"], "round": {"latitude": 2}, "ignore": ["request_id"]})
+    first = make_key("search", {"query": " Cats ", "latitude": 51.5012, "request_id": 1}, policy)
+    second = make_key("search", {"query": "cats", "latitude": 51.4999, "request_id": 2}, policy)
+    assert first == second
+    assert make_key("search", {"query": "dogs", "latitude": 51.5}, policy) != first
+
+
+def test_defaults_are_filled_in_before_hashing():
+    def tool(query, limit=10):
+        return query
+
+    policy = CachePolicy()
+    assert make_key("tool", {"query": "a"}, policy, tool) == make_key("tool", {"query": "a", "limit": 10}, policy, tool)
+
+
+def test_outputs_expire_after_the_ttl():
+    cache, calls = ToolCache(disk_path=None), []
+    policy = CachePolicy(ttl=0.05)
+    for _ in range(2):
+        assert cache.call("tool", {"a": 1}, policy, None, counting_call(calls, "out")) == "out"
+    time.sleep(0.06)
+    cache.call("tool", {"a": 1}, policy, None, counting_call(calls, "out"))
+
+    assert len(calls) == 2
+    assert cache.get_stats("tool")["hits"] == 1
+
+
+def test_least_recently_used_outputs_are_evicted():
+    cache, calls = ToolCache(disk_path=None), []
+    policy = CachePolicy(max_entries=2)
+    for argument in (1, 2, 1, 3, 1, 2):
+        cache.call("tool", {"a": argument}, policy, None, counting_call(calls, argument))
+
+    # 2 was the least recently used when 3 came in, 1 never left
+    assert len(calls) == 4
+    assert cache.get_stats("tool")["evictions"] == 2
+
+
+def test_none_outputs_are_not_cached():
+    cache, calls = ToolCache(disk_path=None), []
+    for _ in range(2):
+        cache.call("tool", {}, CachePolicy(), None, counting_call(calls, None))
+    assert len(calls) == 2
+
+
+def test_disk_tier_is_shared_between_caches(tmp_path):
+    path = str(tmp_path / "tool_cache.sqlite3")
+    policy, calls = CachePolicy(disk=True), []
+    ToolCache(path).call("tool", {"a": 1}, policy, None, counting_call(calls, {"value": 1}))
+
+    other = ToolCache(path)
+    assert other.call("tool", {"a": 1}, policy, None, counting_call(calls, {"value": 2})) == {"value": 1}
+    assert other.get_stats("tool")["disk_hits"] == 1
+    other.invalidate("tool")
+    assert other.call("tool", {"a": 1}, policy, None, counting_call(calls, {"value": 3})) == {"value": 3}
+
+
+def test_policy_comes_from_tool_metadata():
+    assert CachePolicy.from_metadata({"tool_name": "plain"}) is None
+    assert CachePolicy.from_metadata({"tool_cache": True}).ttl == 300.0
+    assert CachePolicy.from_metadata({"tool_cache": {"ttl": 10, "disk": True}}).disk is True
@@ -0,0 +1,41 @@
+import json
+import os
+
+from assistant_manager.utils.tool_catalog import DEFAULT_METADATA_PATHS, ToolCatalog, make_function_tool
+
+
+def test_default_catalog_loads_from_any_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    catalog = ToolCatalog()
+
+    assert all(os.path.isabs(path) for path in DEFAULT_METADATA_PATHS)
+    assert catalog.get_tool_names()
+
+
+def test_catalog_reloads_only_when_a_file_changes(tmp_path):
+    path = tmp_path / "metadata.json"
+    path.write_text(json.dumps({"one": {"tool_name": "one", "tool_description": "First", "tool_required": [], "tool_properties": {}}}))
+    catalog = ToolCatalog([str(path)])
+
+    assert catalog.get_tool_names() == ["one"]
+    catalog.get_tool("one")
+    assert catalog.loads == 1
+
+    path.write_text(json.dumps({"two": {"tool_name": "two", "tool_description": "Second", "tool_required": [], "tool_properties": {}}}))
+    os.utime(path, ns=(0, 10 ** 18))
+    assert catalog.get_tool_names() == ["two"]
+    assert catalog.loads == 2
+
+
+def test_missing_files_are_skipped(tmp_path):
+    catalog = ToolCatalog([str(tmp_path / "missing.json")])
+    assert catalog.get_tool_names() == []
+
+
+def test_function_tool_rendering():
+    tool = {"tool_name": "echo", "tool_description": "Echoes", "tool_required": ["text"], "tool_properties": {"text": {"type": "string"}}}
+    rendered = make_function_tool(tool)
+
+    assert rendered["type"] == "function"
+    assert rendered["function"]["name"] == "echo"
+    assert rendered["function"]["parameters"]["required"] == ["text"]
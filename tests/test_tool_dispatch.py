@@ -0,0 +1,42 @@
+import contextvars
+import time
+
+from openai.types.beta.threads.required_action_function_tool_call import Function, RequiredActionFunctionToolCall
+
+from benchmarks.mock_assistants_api import RunScript
+
+
+def make_tool_call(call_id, name, arguments):
+    return RequiredActionFunctionToolCall(id=call_id, type="function", function=Function(name=name, arguments=arguments))
+
+
+def test_tool_calls_run_concurrently_in_call_order(manager):
+    tool_calls = [make_tool_call(f"call_{index}", "wait", f'{{"seconds": 0.3, "text": "{index}"}}') for index in range(3)]
+    started = time.monotonic()
+    outputs = manager.run_tool_calls(tool_calls)
+
+    assert time.monotonic() - started < 0.6
+    assert outputs == [{"tool_call_id": f"call_{index}", "output": str(index)} for index in range(3)]
+
+
+def test_context_variables_follow_tool_calls_into_the_workers(manager):
+    request_id = contextvars.ContextVar("request_id", default=None)
+    seen = []
+    manager.get_tool_registry().get_entries()["echo"].function = lambda text: seen.append(request_id.get()) or text
+    request_id.set("req_1")
+
+    manager.run_tool_calls([make_tool_call("call_1", "echo", '{"text": "a"}'), make_tool_call("call_2", "echo", '{"text": "b"}')])
+    assert seen == ["req_1", "req_1"]
+
+
+def test_run_submits_every_output_at_once(manager, mock_api):
+    thread_id = manager.change_thread(thread_name="tools")
+    manager.create_message(thread_id=thread_id, role="user", content="hi")
+    mock_api.run_script = RunScript(
+        ["queued", "requires_action", "completed"],
+        tool_calls=[{"name": "echo", "arguments": {"text": "a"}}, {"name": "wait", "arguments": {"seconds": 0, "text": "b"}}],
+        reply="both",
+    )
+
+    assert manager.execute_run(thread_id) == "both"
+    assert mock_api.get_calls()["POST /threads/{id}/runs/{id}/submit_tool_outputs"] == 1
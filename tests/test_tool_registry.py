@@ -0,0 +1,18 @@
+from assistant_manager.tool_registry import module_routines
+from assistant_manager.utils import file_operations
+
+
+def test_registry_resolves_each_source_once(manager):
+    registry = manager.get_tool_registry()
+    echo = registry.resolve("echo")
+
+    assert (echo.source, echo.needs_assistant, echo.parameters) == ("self", False, ["text"])
+    assert registry.resolve("no_such_tool") is None
+    assert registry.resolve("echo") is echo
+
+
+def test_module_routines_leave_out_imported_helpers():
+    names = dict(module_routines(file_operations))
+    assert names
+    assert all(function.__module__ == file_operations.__name__ for function in names.values())
+    assert "json" not in names and "os" not in names
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from assistant_manager.utils.tracing import Tracer, current_span
+from benchmarks.mock_assistants_api import RunScript
+
+
+def test_nested_spans_share_a_trace():
+    tracer = Tracer()
+    with tracer.span("turn") as turn:
+        with tracer.span("run", thread_id="thread_1") as run:
+            pass
+
+    assert run.trace_id == turn.trace_id
+    assert run.parent_id == turn.span_id
+    assert [span.name for span in tracer.get_spans()] == ["run", "turn"]
+
+
+def test_failed_span_records_the_error():
+    tracer = Tracer()
+    with pytest.raises(ValueError):
+        with tracer.span("tool"):
+            raise ValueError("boom")
+    assert tracer.get_spans()[0].error == "ValueError: boom"
+    assert tracer.to_otel()[0]["status"] == {"code": 2, "message": "ValueError: boom"}
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    with tracer.span("turn") as span:
+        assert span is None
+    assert tracer.get_spans() == []
+
+
+def test_chrome_trace_export(tmp_path):
+    tracer = Tracer()
+    with tracer.span("turn", thread_id="thread_1"):
+        pass
+    path = tmp_path / "trace.json"
+    tracer.export_chrome_trace(str(path))
+
+    event = json.loads(path.read_text())["traceEvents"][0]
+    assert (event["name"], event["ph"], event["args"]["thread_id"]) == ("turn", "X", "thread_1")
+
+
+def test_turn_trace_covers_polling_and_tool_calls(manager, mock_api):
+    manager.tracer = Tracer()
+    thread_id = manager.create_thread().id
+    manager.create_message(thread_id=thread_id, role="user", content="hi")
+    mock_api.run_script = RunScript(
+        ["queued", "requires_action", "completed"],
+        tool_calls=[{"name": "echo", "arguments": {"text": "a"}}, {"name": "echo", "arguments": {"text": "b"}}],
+    )
+    manager.perform_run(thread_id)
+
+    spans = manager.tracer.get_last_trace("turn")
+    by_id = {span.span_id: span for span in spans}
+    names = {span.name for span in spans}
+    assert {"turn", "queued_run", "run", "tool_calls", "tool", "submit_tool_outputs", "fetch_messages"} <= names
+    # Tool spans run on worker threads but still hang off the tool_calls span
+    tools = [span for span in spans if span.name == "tool"]
+    assert len(tools) == 2
+    assert all(by_id[span.parent_id].name == "tool_calls" for span in tools)
+    assert current_span.get() is None
@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+from assistant_manager.utils import transport
+from tests.conftest import make_test_manager
+
+
+def test_managers_share_one_connection_pool(manager):
+    from assistant_manager.assistant_manager import OAI_Assistant
+    other = make_test_manager(OAI_Assistant)
+    assert other.open_ai._client is manager.open_ai._client is transport.get_http_client()
+
+
+def test_unknown_settings_are_rejected():
+    with pytest.raises(ValueError):
+        transport.configure_transport(max_conections=10)
+
+
+def test_async_manager_works_across_event_loops(async_manager, mock_api):
+    # Each asyncio.run has its own loop, connections of an earlier loop must not be reused
+    for _ in range(3):
+        assistants = asyncio.run(async_manager.list_assistants())
+        assert assistants is not None